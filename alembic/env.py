@@ -1,3 +1,4 @@
+import re
 from logging.config import fileConfig
 
 from sqlalchemy import engine_from_config, pool
@@ -5,7 +6,7 @@ from sqlmodel import SQLModel
 
 from alembic import context
 from app.core.settings import settings
-from app.database.models import Project, Session  # noqa
+from app.database.models import ArchiveEntry, Project, Session, Snapshot  # noqa
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -24,6 +25,15 @@ config.set_main_option("sqlalchemy.url", settings.database_settings.DATABASE_URL
 # target_metadata = mymodel.Base.metadata
 target_metadata = SQLModel.metadata
 
+# Partitions of partitioned tables are created by migrations and at runtime (app/database/partitions.py),
+# not declared as models, so autogenerate must not try to drop them
+PARTITION_PATTERN = re.compile(r"^session_(default|y\d{4}m\d{2})$")
+
+
+def include_object(object, name, type_, reflected, compare_to) -> bool:
+    return not (type_ == "table" and reflected and compare_to is None and PARTITION_PATTERN.match(name))
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -46,6 +56,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -68,7 +79,7 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(connection=connection, target_metadata=target_metadata, include_object=include_object)
 
         with context.begin_transaction():
             context.run_migrations()
@@ -0,0 +1,32 @@
+"""add project node_id
+
+Revision ID: 3b7c1e9a4d21
+Revises: f858620f00c0
+Create Date: 2026-10-19 10:12:41.518302
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+import sqlmodel
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3b7c1e9a4d21"
+down_revision: Union[str, Sequence[str], None] = "f858620f00c0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("project", sa.Column("node_id", sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.create_index(op.f("ix_project_node_id"), "project", ["node_id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_project_node_id"), table_name="project")
+    op.drop_column("project", "node_id")
@@ -0,0 +1,118 @@
+"""partition session and add archive
+
+Revision ID: 5d2a7c3e1f48
+Revises: 8e4f2a6c9b13
+Create Date: 2026-10-19 15:40:52.118302
+
+"""
+
+from datetime import datetime
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+import sqlmodel
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5d2a7c3e1f48"
+down_revision: Union[str, Sequence[str], None] = "8e4f2a6c9b13"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 3
+SESSION_COLUMNS = "id, created_at, updated_at, is_deleted, project_id, name, messages"
+
+
+def _add_months(value: datetime, months: int) -> datetime:
+    month_index = value.month - 1 + months
+    return value.replace(year=value.year + month_index // 12, month=month_index % 12 + 1)
+
+
+def _create_session_partitions(first: datetime) -> None:
+    month = first.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    last = _add_months(datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0), MONTHS_AHEAD)
+    while month <= last:
+        upper = _add_months(month, 1)
+        op.execute(
+            f'CREATE TABLE "session_y{month.year}m{month.month:02d}" PARTITION OF "session" '
+            f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{upper:%Y-%m-%d}')"
+        )
+        month = upper
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "archiveentry",
+        sa.Column("id", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("is_deleted", sa.Boolean(), nullable=False),
+        sa.Column("kind", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("project_id", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("reason", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("path", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("size_bytes", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_archiveentry_kind"), "archiveentry", ["kind"], unique=False)
+    op.create_index(op.f("ix_archiveentry_project_id"), "archiveentry", ["project_id"], unique=False)
+
+    # A partitioned table's unique keys must include the partition column, so nothing can reference
+    # session.id alone any more
+    op.drop_constraint("snapshot_session_id_fkey", "snapshot", type_="foreignkey")
+
+    op.execute('ALTER TABLE "session" RENAME TO "session_unpartitioned"')
+    op.execute('ALTER TABLE "session_unpartitioned" RENAME CONSTRAINT "session_pkey" TO "session_unpartitioned_pkey"')
+    op.execute(
+        """
+        CREATE TABLE "session" (
+            id VARCHAR NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            is_deleted BOOLEAN NOT NULL,
+            project_id VARCHAR NOT NULL REFERENCES project (id),
+            name VARCHAR NOT NULL,
+            messages JSON,
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.execute('CREATE TABLE "session_default" PARTITION OF "session" DEFAULT')
+
+    first = op.get_bind().execute(sa.text('SELECT min(created_at) FROM "session_unpartitioned"')).scalar()
+    _create_session_partitions(first or datetime.now())
+
+    op.execute(f'INSERT INTO "session" ({SESSION_COLUMNS}) SELECT {SESSION_COLUMNS} FROM "session_unpartitioned"')
+    op.drop_table("session_unpartitioned")
+    op.create_index(op.f("ix_session_project_id"), "session", ["project_id"], unique=False)
+    op.create_index("ix_session_updated_at", "session", ["updated_at"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('ALTER TABLE "session" RENAME TO "session_partitioned"')
+    op.create_table(
+        "session",
+        sa.Column("id", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("is_deleted", sa.Boolean(), nullable=False),
+        sa.Column("project_id", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("name", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("messages", sa.JSON(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["project_id"],
+            ["project.id"],
+        ),
+        sa.PrimaryKeyConstraint("id", name="session_pkey_new"),
+    )
+    op.execute(f'INSERT INTO "session" ({SESSION_COLUMNS}) SELECT {SESSION_COLUMNS} FROM "session_partitioned"')
+    op.execute('DROP TABLE "session_partitioned" CASCADE')
+    op.execute('ALTER TABLE "session" RENAME CONSTRAINT "session_pkey_new" TO "session_pkey"')
+    op.create_foreign_key("snapshot_session_id_fkey", "snapshot", "session", ["session_id"], ["id"])
+
+    op.drop_index(op.f("ix_archiveentry_project_id"), table_name="archiveentry")
+    op.drop_index(op.f("ix_archiveentry_kind"), table_name="archiveentry")
+    op.drop_table("archiveentry")
@@ -0,0 +1,54 @@
+"""add snapshot table
+
+Revision ID: 8e4f2a6c9b13
+Revises: 3b7c1e9a4d21
+Create Date: 2026-10-19 11:02:17.204519
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+import sqlmodel
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8e4f2a6c9b13"
+down_revision: Union[str, Sequence[str], None] = "3b7c1e9a4d21"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "snapshot",
+        sa.Column("id", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("is_deleted", sa.Boolean(), nullable=False),
+        sa.Column("project_id", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("session_id", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("parent_id", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("turn", sa.Integer(), nullable=False),
+        sa.Column("manifest_hash", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("file_count", sa.Integer(), nullable=False),
+        sa.Column("total_size", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["project_id"],
+            ["project.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["session_id"],
+            ["session.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_snapshot_project_id"), "snapshot", ["project_id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_snapshot_project_id"), table_name="snapshot")
+    op.drop_table("snapshot")
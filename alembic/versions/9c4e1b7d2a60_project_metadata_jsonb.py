@@ -0,0 +1,65 @@
+"""project metadata jsonb
+
+Revision ID: 9c4e1b7d2a60
+Revises: 5d2a7c3e1f48
+Create Date: 2026-10-19 17:05:13.284610
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9c4e1b7d2a60"
+down_revision: Union[str, Sequence[str], None] = "5d2a7c3e1f48"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column(
+        "project",
+        "project_metadata",
+        type_=postgresql.JSONB(),
+        existing_type=sa.JSON(),
+        existing_nullable=True,
+        postgresql_using="project_metadata::jsonb",
+    )
+    op.create_index(
+        "ix_project_metadata",
+        "project",
+        ["project_metadata"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"project_metadata": "jsonb_path_ops"},
+    )
+    op.add_column(
+        "project",
+        sa.Column(
+            "sandbox_status",
+            sa.String(),
+            sa.Computed("project_metadata ->> 'sandbox_status'", persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index(op.f("ix_project_sandbox_status"), "project", ["sandbox_status"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_project_sandbox_status"), table_name="project")
+    op.drop_column("project", "sandbox_status")
+    op.drop_index("ix_project_metadata", table_name="project", postgresql_using="gin")
+    op.alter_column(
+        "project",
+        "project_metadata",
+        type_=sa.JSON(),
+        existing_type=postgresql.JSONB(),
+        existing_nullable=True,
+        postgresql_using="project_metadata::json",
+    )
@@ -2,7 +2,25 @@ from celery import Celery
 
 from app.core.settings import settings
 
+worker_settings = settings.worker_settings
+
 app = Celery("tasks", broker=settings.database_settings.REDIS_URL, backend=settings.database_settings.REDIS_URL)
+app.conf.update(
+    task_default_queue=worker_settings.DEFAULT_QUEUE,
+    task_routes={"agent.*": {"queue": worker_settings.AGENT_QUEUE}},
+    worker_prefetch_multiplier=worker_settings.WORKER_PREFETCH_MULTIPLIER,
+    worker_concurrency=worker_settings.WORKER_CONCURRENCY,
+    beat_schedule={
+        "compact-archive": {
+            "task": "maintenance.compact_archive",
+            "schedule": settings.archive_settings.ARCHIVE_INTERVAL_SECONDS,
+        },
+        "ensure-partitions": {
+            "task": "maintenance.ensure_partitions",
+            "schedule": 24 * 3600,
+        },
+    },
+)
 app.autodiscover_tasks(["app.tasks"])
 
-from app.tasks import example_tasks  # noqa
+from app.tasks import agent_tasks, example_tasks, maintenance_tasks  # noqa
@@ -0,0 +1,15 @@
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class ArchiveSettings(BaseSettings):
+    ARCHIVE_ENABLED: bool = True
+    ARCHIVE_DIR: str = "sandbox/archive"
+    ARCHIVE_ZSTD_LEVEL: int = 10
+    ARCHIVE_DELETED_AFTER_DAYS: int = 7
+    ARCHIVE_INACTIVE_AFTER_DAYS: int = 90
+    ARCHIVE_BATCH_SIZE: int = 200
+    ARCHIVE_INTERVAL_SECONDS: int = 3600
+
+    PARTITION_MONTHS_AHEAD: int = 3
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
@@ -0,0 +1,14 @@
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class AssetSettings(BaseSettings):
+    ASSET_PIPELINE_ENABLED: bool = True
+    ASSET_MIN_COMPRESS_BYTES: int = 256
+    ASSET_MAX_FILE_BYTES: int = 10 * 1024 * 1024
+    ASSET_GZIP_LEVEL: int = 9
+    ASSET_BROTLI_QUALITY: int = 11
+    ASSET_WRITE_GZIP_LEVEL: int = 1
+    ASSET_WRITE_BROTLI_QUALITY: int = 4
+    ASSET_IMMUTABLE_MAX_AGE: int = 31536000
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
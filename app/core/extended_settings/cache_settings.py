@@ -0,0 +1,14 @@
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class CacheSettings(BaseSettings):
+    CACHE_ENABLED: bool = True
+    CACHE_KEY_PREFIX: str = "app:cache"
+    CACHE_TTL_SECONDS: int = 300
+    CACHE_TTL_JITTER_SECONDS: int = 30
+    CACHE_NEGATIVE_TTL_SECONDS: int = 15
+    CACHE_LOCK_TIMEOUT_MS: int = 2000
+    CACHE_LOCK_WAIT_MS: int = 500
+    CACHE_MAX_ENTRY_BYTES: int = 256 * 1024
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
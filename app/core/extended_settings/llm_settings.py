@@ -6,3 +6,14 @@ class LLMSettings(BaseSettings):
 
     OPENAI_API_KEY: str = "sk-not-provided"
     OPENAI_BASE_URL: str = "https://api.openai.com/v1/"
+
+    TOOL_MAX_PARALLEL_IO: int = 8
+    TOOL_RESULT_MAX_CHARS: int = 20000
+    TOOL_BATCH_RESULT_MAX_CHARS: int = 60000
+    PARALLEL_TOOL_CALLS: bool = True
+
+    CONTEXT_MANIFEST_ENABLED: bool = True
+    CONTEXT_MANIFEST_MAX_ENTRIES: int = 500
+
+    BUILD_MAX_CONCURRENCY: int = 4
+    BUILD_MAX_WORK_ITEMS: int = 8
@@ -1,5 +1,9 @@
+import sys
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from app.utils.log_utils import HotPathSampler, json_formatter
+
 
 class LoggerSettings(BaseSettings):
     level: str = "INFO"
@@ -8,15 +12,25 @@ class LoggerSettings(BaseSettings):
     file_rotation: str = "10 MB"
     file_retention: str = "30 days"
     file_compression: str | None = None
+    file_json: bool = False
     console_enabled: bool = True
     console_colorize: bool = True
+    console_json: bool = False
     format_file: str = "{time:YYYY-MM-DD HH:mm:ss} | {level} | {name}:{function}:{line} | {message}"
     format_console: str = "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level}</level> | <cyan>{name}:{function}:{line}</cyan> | {message}"
     backtrace: bool = True
-    diagnose: bool = True
-    enqueue: bool = False
+    diagnose: bool = False
+    enqueue: bool = True
     catch: bool = True
 
+    hot_path_loggers: list[str] = [
+        "app.services.sandbox.port_manager",
+        "app.services.sandbox.sandbox_manager",
+        "app.services.sandbox.server_manager",
+    ]
+    hot_path_rate_limit: float = 20.0
+    hot_path_sample_rate: float = 1.0
+
     model_config = SettingsConfigDict(
         env_prefix="LOGGER_",
         env_file=".env",
@@ -25,19 +39,28 @@ class LoggerSettings(BaseSettings):
         extra="ignore",
     )
 
-    def get_file_config(self) -> dict | None:
+    def get_hot_path_filter(self) -> HotPathSampler:
+        return HotPathSampler(
+            logger_names=self.hot_path_loggers,
+            rate_limit=self.hot_path_rate_limit,
+            sample_rate=self.hot_path_sample_rate,
+        )
+
+    def get_file_config(self, debug: bool = False, sampler: HotPathSampler | None = None) -> dict | None:
         if not self.file_enabled:
             return None
 
         config = {
             "sink": self.file_path,
             "level": self.level,
-            "format": self.format_file,
+            "format": json_formatter if self.file_json else self.format_file,
+            "filter": sampler or self.get_hot_path_filter(),
             "rotation": self.file_rotation,
             "retention": self.file_retention,
             "backtrace": self.backtrace,
-            "diagnose": self.diagnose,
+            "diagnose": self.diagnose and debug,
             "enqueue": self.enqueue,
+            "catch": self.catch,
         }
 
         if self.file_compression:
@@ -45,30 +68,40 @@ class LoggerSettings(BaseSettings):
 
         return config
 
-    def get_console_config(self) -> dict | None:
+    def get_console_config(self, debug: bool = False, sampler: HotPathSampler | None = None) -> dict | None:
         if not self.console_enabled:
             return None
 
         return {
-            "sink": lambda msg: print(msg, end=""),
+            "sink": sys.stdout,
             "level": self.level,
-            "format": self.format_console,
-            "colorize": self.console_colorize,
+            "format": json_formatter if self.console_json else self.format_console,
+            "filter": sampler or self.get_hot_path_filter(),
+            "colorize": self.console_colorize and not self.console_json,
             "backtrace": self.backtrace,
-            "diagnose": self.diagnose,
+            "diagnose": self.diagnose and debug,
             "enqueue": self.enqueue,
+            "catch": self.catch,
         }
 
-    def setup_logger(self) -> None:
-        """Configure loguru logger with file and console handlers."""
+    def setup_logger(self, debug: bool = False) -> None:
+        """
+        Configure loguru logger with file and console handlers.
+
+        With `enqueue` enabled (the default) records are pushed onto a queue and written by
+        loguru's background thread, so request handlers never block on sink I/O. `diagnose`
+        only takes effect when `debug` is true, keeping variable values out of production logs.
+        Queued records are flushed by `logger.complete()` at shutdown.
+        """
         from loguru import logger
 
         logger.remove()
 
-        file_config = self.get_file_config()
+        sampler = self.get_hot_path_filter()
+        file_config = self.get_file_config(debug, sampler)
         if file_config:
             logger.add(**file_config)
 
-        console_config = self.get_console_config()
+        console_config = self.get_console_config(debug, sampler)
         if console_config:
             logger.add(**console_config)
@@ -0,0 +1,14 @@
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class ProfilingSettings(BaseSettings):
+    PROFILING_ENABLED: bool = False
+    PROFILING_HEADER: str = "X-Profile"
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_INTERVAL_SECONDS: float = 0.001
+    PROFILING_DIR: str = "logs/profiles"
+    PROFILING_MAX_PROFILES: int = 200
+    PROFILING_MAX_BYTES: int = 200 * 1024 * 1024
+    PROFILING_ADMIN_TOKEN: str = ""
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
@@ -0,0 +1,16 @@
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class ResourceSettings(BaseSettings):
+    SANDBOX_CGROUP_ENABLED: bool = True
+    SANDBOX_CGROUP_ROOT: str = "/sys/fs/cgroup/sandboxes"
+    SANDBOX_CPU_WEIGHT: int = 100
+    SANDBOX_CPU_MAX_PERCENT: int = 50
+    SANDBOX_MEMORY_HIGH_MB: int = 192
+    SANDBOX_MEMORY_MAX_MB: int = 256
+    SANDBOX_PIDS_MAX: int = 64
+    SANDBOX_MONITOR_ENABLED: bool = True
+    SANDBOX_MONITOR_INTERVAL_SECONDS: int = 30
+    SANDBOX_MAX_RESTARTS: int = 3
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
@@ -0,0 +1,38 @@
+import os
+import socket
+from typing import Literal
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+# Placeholder secret; node agents refuse to start until NODE_AGENT_TOKEN is changed from it
+DEFAULT_NODE_AGENT_TOKEN = "change-me"
+
+
+class SandboxSettings(BaseSettings):
+    SANDBOX_MODE: Literal["local", "cluster"] = "local"
+    SANDBOX_ROOT: str = "sandbox"
+    SANDBOX_TEMPLATES_DIR: str = "sandbox/templates"
+    SANDBOX_TEMPLATE_STORE_DIR: str = "sandbox/template_store"
+    SANDBOX_DEFAULT_TEMPLATE: str = "static-html"
+    SANDBOX_TEMPLATE_LINK_MODE: Literal["auto", "copy"] = "auto"
+    SANDBOX_MANIFEST_DIR: str = "sandbox/manifests"
+    SANDBOX_MANIFEST_CACHE_SIZE: int = 64
+    SANDBOX_MANIFEST_IGNORE: list[str] = ["node_modules", ".git", ".assets"]
+    SANDBOX_PUBLIC_HOST: str = "localhost"
+    PORT_RANGE_MIN: int = 3000
+    PORT_RANGE_MAX: int = 4000
+
+    NODE_ID: str = socket.gethostname()
+    NODE_URL: str = "http://localhost:9100"
+    NODE_AGENT_TOKEN: str = DEFAULT_NODE_AGENT_TOKEN
+    NODE_MAX_SANDBOXES: int = 200
+    NODE_MIN_FREE_MEMORY_MB: int = 256
+    NODE_HEARTBEAT_SECONDS: int = 5
+    NODE_TTL_SECONDS: int = 15
+    NODE_REQUEST_TIMEOUT_SECONDS: float = 30.0
+
+    @property
+    def PROJECTS_DIR(self) -> str:
+        return os.path.join(self.SANDBOX_ROOT, "projects")
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
@@ -0,0 +1,12 @@
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class SearchSettings(BaseSettings):
+    SEARCH_INDEX_DIR: str = "sandbox/indexes"
+    SEARCH_INDEX_CACHE_SIZE: int = 64
+    SEARCH_MAX_FILE_BYTES: int = 1024 * 1024
+    SEARCH_MAX_RESULTS: int = 50
+    SEARCH_MAX_MATCHES_PER_FILE: int = 5
+    SEARCH_IGNORE: list[str] = ["node_modules", ".git", ".assets"]
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
@@ -0,0 +1,11 @@
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class SnapshotSettings(BaseSettings):
+    SNAPSHOT_ENABLED: bool = True
+    SNAPSHOT_STORE_DIR: str = "sandbox/objects"
+    SNAPSHOT_CHUNK_SIZE: int = 256 * 1024
+    SNAPSHOT_ZSTD_LEVEL: int = 3
+    SNAPSHOT_IGNORE: list[str] = ["node_modules", ".git", ".assets"]
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
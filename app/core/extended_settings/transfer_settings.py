@@ -0,0 +1,12 @@
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class TransferSettings(BaseSettings):
+    TRANSFER_CHUNK_SIZE: int = 1024 * 1024
+    TRANSFER_ZSTD_LEVEL: int = 3
+    TRANSFER_IGNORE: list[str] = ["node_modules", ".git", ".assets"]
+    IMPORT_MAX_BYTES: int = 2 * 1024 * 1024 * 1024
+    IMPORT_MAX_FILES: int = 50000
+    IMPORT_MAX_ROWS_BYTES: int = 64 * 1024 * 1024
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
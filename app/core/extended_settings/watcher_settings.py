@@ -0,0 +1,15 @@
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class WatcherSettings(BaseSettings):
+    WATCHER_ENABLED: bool = True
+    WATCHER_DEBOUNCE_MS: int = 400
+    WATCHER_STEP_MS: int = 50
+    WATCHER_IGNORE: list[str] = ["node_modules", ".git", ".assets"]
+
+    CHANGE_FEED_HEARTBEAT_SECONDS: int = 15
+
+    LIVE_RELOAD_ENABLED: bool = True
+    LIVE_RELOAD_API_URL: str = "http://localhost:8000"
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
@@ -0,0 +1,24 @@
+from typing import Literal
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class WorkerSettings(BaseSettings):
+    AGENT_EXECUTION_MODE: Literal["inline", "celery"] = "inline"
+
+    DEFAULT_QUEUE: str = "celery"
+    AGENT_QUEUE: str = "agent"
+    WORKER_PREFETCH_MULTIPLIER: int = 1
+    WORKER_CONCURRENCY: int = 4
+    AGENT_WORKER_CONCURRENCY: int = 32
+
+    AGENT_STREAM_TTL_SECONDS: int = 3600
+    AGENT_STREAM_MAXLEN: int = 10000
+    AGENT_RUN_IDLE_TIMEOUT_SECONDS: int = 300
+
+    AGENT_RUN_MAX_SECONDS: int = 900
+    AGENT_RUN_MAX_TOKENS: int = 500000
+    AGENT_RUN_CANCEL_ON_DISCONNECT: bool = True
+    AGENT_RUN_CANCEL_POLL_SECONDS: float = 0.5
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
@@ -1,16 +1,38 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 from app.core.extended_settings.app_settings import AppSettings
+from app.core.extended_settings.archive_settings import ArchiveSettings
+from app.core.extended_settings.asset_settings import AssetSettings
+from app.core.extended_settings.cache_settings import CacheSettings
 from app.core.extended_settings.database_settings import DatabaseSettings
 from app.core.extended_settings.llm_settings import LLMSettings
 from app.core.extended_settings.logger_settings import LoggerSettings
+from app.core.extended_settings.profiling_settings import ProfilingSettings
+from app.core.extended_settings.resource_settings import ResourceSettings
+from app.core.extended_settings.sandbox_settings import SandboxSettings
+from app.core.extended_settings.search_settings import SearchSettings
+from app.core.extended_settings.snapshot_settings import SnapshotSettings
+from app.core.extended_settings.transfer_settings import TransferSettings
+from app.core.extended_settings.watcher_settings import WatcherSettings
+from app.core.extended_settings.worker_settings import WorkerSettings
 
 
 class Settings(BaseSettings):
     app_settings: AppSettings = AppSettings()
     database_settings: DatabaseSettings = DatabaseSettings()
+    cache_settings: CacheSettings = CacheSettings()
     llm_settings: LLMSettings = LLMSettings()
     logger: LoggerSettings = LoggerSettings()
+    profiling_settings: ProfilingSettings = ProfilingSettings()
+    sandbox_settings: SandboxSettings = SandboxSettings()
+    resource_settings: ResourceSettings = ResourceSettings()
+    asset_settings: AssetSettings = AssetSettings()
+    snapshot_settings: SnapshotSettings = SnapshotSettings()
+    archive_settings: ArchiveSettings = ArchiveSettings()
+    transfer_settings: TransferSettings = TransferSettings()
+    search_settings: SearchSettings = SearchSettings()
+    watcher_settings: WatcherSettings = WatcherSettings()
+    worker_settings: WorkerSettings = WorkerSettings()
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
@@ -1,7 +1,10 @@
+from datetime import datetime
 from enum import Enum
 from typing import List, Optional
 
+from sqlalchemy import Column, Computed, Index, String
 from sqlalchemy import Enum as SQLEnum
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlmodel import JSON, Field, Relationship
 
 from app.core.models import BaseModel
@@ -13,19 +16,61 @@ class ProjectStatus(str, Enum):
 
 
 class Project(BaseModel, table=True):
+    __table_args__ = (
+        # jsonb_path_ops only serves containment (@>), which is all the metadata filters use, at a smaller size
+        Index(
+            "ix_project_metadata",
+            "project_metadata",
+            postgresql_using="gin",
+            postgresql_ops={"project_metadata": "jsonb_path_ops"},
+        ),
+    )
+
     name: str = Field(default="App Project")
     description: Optional[str] = None
     port: int = Field(unique=True)
     server_pid: Optional[int] = Field(default=None)
+    node_id: Optional[str] = Field(default=None, index=True)
     status: ProjectStatus = Field(
         default=ProjectStatus.ACTIVE, sa_type=SQLEnum("active", "inactive", name="projectstatus")
     )
-    project_metadata: Optional[dict] = Field(default_factory=dict, sa_type=JSON)
+    project_metadata: Optional[dict] = Field(default_factory=dict, sa_type=JSONB)
+    # Generated from project_metadata so fleet queries on the sandbox state can use a btree index
+    sandbox_status: Optional[str] = Field(
+        default=None,
+        sa_column=Column(String, Computed("project_metadata ->> 'sandbox_status'", persisted=True), index=True),
+    )
     sessions: List["Session"] = Relationship(back_populates="project", cascade_delete=True)
 
 
 class Session(BaseModel, table=True):
-    project_id: str = Field(foreign_key="project.id")
+    # Partitioned by month of created_at in the database (see the partition_session migration), whose
+    # primary key must include the partition column; look sessions up by id with a query, not session.get
+    __table_args__ = (Index("ix_session_updated_at", "updated_at"),)
+
+    created_at: datetime = Field(default_factory=datetime.now, primary_key=True)
+    project_id: str = Field(foreign_key="project.id", index=True)
     name: str = Field(default="Example Model")
     messages: Optional[List[str]] = Field(default=None, sa_type=JSON)
     project: Project = Relationship(back_populates="sessions")
+
+
+class Snapshot(BaseModel, table=True):
+    project_id: str = Field(foreign_key="project.id", index=True)
+    # Not a foreign key: `session` is partitioned by created_at, so its id alone is not unique
+    session_id: Optional[str] = Field(default=None)
+    parent_id: Optional[str] = Field(default=None)
+    turn: int = Field(default=0)
+    manifest_hash: str
+    file_count: int = Field(default=0)
+    total_size: int = Field(default=0)
+
+
+class ArchiveEntry(BaseModel, table=True):
+    """Index of a project or session moved to cold storage; `id` is the archived entity's id."""
+
+    kind: str = Field(index=True)
+    project_id: Optional[str] = Field(default=None, index=True)
+    reason: str
+    path: str
+    size_bytes: int = Field(default=0)
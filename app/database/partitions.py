@@ -0,0 +1,44 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Connection, text
+
+
+def month_start(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    month_index = value.month - 1 + months
+    return value.replace(year=value.year + month_index // 12, month=month_index % 12 + 1)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    return f"{table}_y{month.year}m{month.month:02d}"
+
+
+def ensure_monthly_partitions(
+    connection: Connection, table: str, months_ahead: int, start: Optional[datetime] = None
+) -> list[str]:
+    """
+    Create the missing monthly range partitions of `table` from `start` up to `months_ahead` months out.
+
+    Partitions must exist before rows for their month arrive; otherwise rows land in the default
+    partition and that month can no longer be attached without moving them.
+    """
+    month = month_start(start or datetime.now())
+    last = add_months(month_start(datetime.now()), months_ahead)
+    created = []
+    while month <= last:
+        name = partition_name(table, month)
+        exists = connection.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar()
+        if exists is None:
+            connection.execute(
+                text(
+                    f'CREATE TABLE "{name}" PARTITION OF "{table}" '
+                    f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{add_months(month, 1):%Y-%m-%d}')"
+                )
+            )
+            created.append(name)
+        month = add_months(month, 1)
+    return created
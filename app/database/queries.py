@@ -0,0 +1,9 @@
+from typing import Iterable
+
+from sqlalchemy import String, any_, literal
+from sqlalchemy.dialects.postgresql import ARRAY
+
+
+def id_in(column, ids: Iterable[str]):
+    """Build a `column = ANY(:ids)` predicate that binds the ids as a single array parameter."""
+    return column == any_(literal(list(ids), type_=ARRAY(String)))
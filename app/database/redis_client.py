@@ -0,0 +1,7 @@
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+
+from app.core.settings import settings
+
+redis_client = Redis.from_url(settings.database_settings.REDIS_URL)
+async_redis_client = AsyncRedis.from_url(settings.database_settings.REDIS_URL)
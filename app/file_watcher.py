@@ -0,0 +1,10 @@
+import asyncio
+
+from app.core.settings import settings
+from app.services.sandbox.file_watcher import watch_projects
+
+settings.logger.setup_logger(debug=settings.app_settings.DEBUG)
+
+
+if __name__ == "__main__":
+    asyncio.run(watch_projects())
@@ -1,18 +1,46 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from loguru import logger
 from scalar_fastapi import scalar_fastapi
 
 from app.core.settings import settings
+from app.router.cache_router import cache_router
+from app.router.change_router import change_router
+from app.router.debug_router import debug_router
 from app.router.project_router import project_router
+from app.router.search_router import search_router
 from app.router.session_router import session_router
+from app.router.snapshot_router import snapshot_router
+from app.router.template_router import template_router
+from app.services.sandbox.resource_monitor import monitor_sandboxes
+
+settings.logger.setup_logger(debug=settings.app_settings.DEBUG)
+
 
-settings.logger.setup_logger()
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    tasks = []
+    if settings.sandbox_settings.SANDBOX_MODE == "local" and settings.resource_settings.SANDBOX_MONITOR_ENABLED:
+        tasks.append(asyncio.create_task(monitor_sandboxes()))
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+        # Flush records still queued for the sinks (enqueue=True) before the process exits
+        await logger.complete()
 
 
 app = FastAPI(
     title=settings.app_settings.APP_NAME,
     version=settings.app_settings.VERSION,
     description=settings.app_settings.DESCRIPTION,
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -23,8 +51,20 @@ app.add_middleware(
     allow_headers=settings.app_settings.ALLOW_HEADERS,
 )
 
+if settings.profiling_settings.PROFILING_ENABLED:
+    from app.services.profiling.middleware import ProfilingMiddleware
+
+    # Added last so it is outermost and the profile covers every other middleware too
+    app.add_middleware(ProfilingMiddleware)
+
 app.include_router(project_router)
 app.include_router(session_router)
+app.include_router(snapshot_router)
+app.include_router(template_router)
+app.include_router(search_router)
+app.include_router(change_router)
+app.include_router(cache_router)
+app.include_router(debug_router)
 
 if settings.app_settings.DEBUG:
     from fastapi.staticfiles import StaticFiles
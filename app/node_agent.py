@@ -0,0 +1,50 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+from loguru import logger
+
+from app.core.extended_settings.sandbox_settings import DEFAULT_NODE_AGENT_TOKEN
+from app.core.settings import settings
+from app.router.node_agent_router import node_agent_router
+from app.services.sandbox.node_registry import mark_node_down, register_node
+from app.services.sandbox.node_state import collect_node_info, prune_tracked_pids
+
+settings.logger.setup_logger(debug=settings.app_settings.DEBUG)
+
+if settings.sandbox_settings.NODE_AGENT_TOKEN == DEFAULT_NODE_AGENT_TOKEN:
+    raise RuntimeError("NODE_AGENT_TOKEN is still the default; set a shared secret before starting a node agent")
+
+
+async def heartbeat() -> None:
+    while True:
+        try:
+            await asyncio.to_thread(lambda: register_node(collect_node_info()))
+        except Exception as e:
+            logger.warning("Node heartbeat failed: {}", e)
+        await asyncio.sleep(settings.sandbox_settings.NODE_HEARTBEAT_SECONDS)
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    # Sandboxes started before a restart are still tracked; drop the ones that exited meanwhile
+    running = await asyncio.to_thread(prune_tracked_pids)
+    logger.info("Sandbox node {} tracks {} running sandboxes", settings.sandbox_settings.NODE_ID, running)
+    task = asyncio.create_task(heartbeat())
+    logger.info("Sandbox node {} serving at {}", settings.sandbox_settings.NODE_ID, settings.sandbox_settings.NODE_URL)
+    try:
+        yield
+    finally:
+        task.cancel()
+        mark_node_down(settings.sandbox_settings.NODE_ID)
+
+
+app = FastAPI(
+    title=f"{settings.app_settings.APP_NAME} Node Agent",
+    version=settings.app_settings.VERSION,
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
+
+app.include_router(node_agent_router)
@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+
+from app.services.cache.entity_cache import get_cache_stats
+
+cache_router = APIRouter(
+    prefix="/cache",
+    tags=["Cache"],
+)
+
+
+@cache_router.get("/stats")
+def cache_stats() -> dict:
+    """Hit/miss counters and hit rate of the project and session caches for this process"""
+    return get_cache_stats()
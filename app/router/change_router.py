@@ -0,0 +1,34 @@
+import asyncio
+
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session, select
+
+from app.database.engine import engine
+from app.database.models import Project
+from app.services.sandbox.change_feed import subscribe_changes
+
+change_router = APIRouter(
+    prefix="/projects/{project_id}/changes",
+    tags=["Changes"],
+)
+
+
+def _project_exists(project_id: str) -> bool:
+    with Session(engine) as session:
+        statement = select(Project.id).where(Project.id == project_id, Project.is_deleted == False)  # noqa: E712
+        return session.exec(statement).first() is not None
+
+
+@change_router.get("/")
+async def stream_changes(project_id: str) -> StreamingResponse:
+    """Server-sent events with the paths and content hashes of changed project files"""
+    # Looked up in a thread with its own short session, not one held open for the whole stream
+    if not await asyncio.to_thread(_project_exists, project_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+
+    return StreamingResponse(
+        subscribe_changes(project_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
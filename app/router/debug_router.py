@@ -0,0 +1,39 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import FileResponse
+
+from app.core.settings import settings
+from app.services.profiling.profile_store import profile_store
+
+
+def verify_debug_access(x_admin_token: Optional[str] = Header(None)) -> None:
+    if settings.app_settings.DEBUG:
+        return
+    token = settings.profiling_settings.PROFILING_ADMIN_TOKEN
+    if not token or x_admin_token != token:
+        # Outside DEBUG the debug endpoints do not exist for anyone without the admin token
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+
+debug_router = APIRouter(
+    prefix="/debug",
+    tags=["Debug"],
+    dependencies=[Depends(verify_debug_access)],
+    include_in_schema=False,
+)
+
+
+@debug_router.get("/profiles")
+def list_profiles() -> list[dict]:
+    """List stored request profiles, newest first"""
+    return profile_store.list()
+
+
+@debug_router.get("/profiles/{profile_id}")
+def get_profile(profile_id: str) -> FileResponse:
+    """Get the HTML report of a stored profile"""
+    path = profile_store.html_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return FileResponse(path, media_type="text/html")
@@ -0,0 +1,122 @@
+import hmac
+import os
+import re
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Path, Query, status
+
+from app.core.settings import settings
+from app.schema.node_schema import (
+    FileManifestResponse,
+    FileReadResponse,
+    FileWriteRequest,
+    NodeInfo,
+    SandboxCreateRequest,
+    SandboxCreateResponse,
+    SandboxStopRequest,
+    SandboxStopResponse,
+)
+from app.schema.search_schema import SearchResponse
+from app.services.sandbox.file_manifest import file_manifest
+from app.services.sandbox.node_state import collect_node_info, is_tracked, track_pid, untrack_pid
+from app.services.sandbox.paths import project_file
+from app.services.sandbox.sandbox_gateway import purge_sandbox_files, write_project_file
+from app.services.sandbox.sandbox_manager import setup_sandbox
+from app.services.sandbox.server_manager import stop_server
+from app.services.search.code_index import SearchMode, code_index
+from app.utils.generate_ids import ID_PATTERN
+
+# Every endpoint maps the id onto a directory, so anything but a generated id is rejected up front
+ProjectId = Annotated[str, Path(pattern=ID_PATTERN)]
+
+
+def verify_node_token(x_node_token: str = Header(...)) -> None:
+    if not hmac.compare_digest(x_node_token.encode(), settings.sandbox_settings.NODE_AGENT_TOKEN.encode()):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid node token")
+
+
+node_agent_router = APIRouter(
+    tags=["Node Agent"],
+    dependencies=[Depends(verify_node_token)],
+)
+
+
+@node_agent_router.get("/capacity", response_model=NodeInfo)
+def get_capacity() -> NodeInfo:
+    """Current free capacity of this node"""
+    return collect_node_info()
+
+
+@node_agent_router.post("/sandboxes", response_model=SandboxCreateResponse)
+def create_sandbox(request: SandboxCreateRequest) -> SandboxCreateResponse:
+    """Create and start a sandbox on this node"""
+    message, pid = setup_sandbox(request.project_id, request.port, request.template)
+    if pid:
+        track_pid(pid)
+    return SandboxCreateResponse(message=message, pid=pid)
+
+
+@node_agent_router.post("/sandboxes/stop", response_model=SandboxStopResponse)
+def stop_sandbox(request: SandboxStopRequest) -> SandboxStopResponse:
+    """Stop a sandbox server process running on this node"""
+    # Only processes this agent started may be stopped, never an arbitrary PID on the host
+    if not is_tracked(request.pid):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sandbox process not found")
+    stopped = stop_server(request.pid)
+    untrack_pid(request.pid)
+    return SandboxStopResponse(stopped=stopped)
+
+
+@node_agent_router.delete("/sandboxes/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_sandbox(project_id: ProjectId) -> None:
+    """Remove a sandbox directory and its derived state from this node"""
+    purge_sandbox_files(None, project_id)
+
+
+def _resolve(project_id: str, path: str) -> str:
+    try:
+        return project_file(project_id, path)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@node_agent_router.get("/sandboxes/{project_id}/files", response_model=FileReadResponse)
+def read_sandbox_file(project_id: ProjectId, path: str = Query(...)) -> FileReadResponse:
+    """Read a file from a sandbox on this node"""
+    return FileReadResponse(path=path, content=_read_text(project_id, path))
+
+
+def _read_text(project_id: str, path: str) -> str:
+    file_path = _resolve(project_id, path)
+    if not os.path.isfile(file_path):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
+    with open(file_path, "r") as f:
+        return f.read()
+
+
+@node_agent_router.put("/sandboxes/{project_id}/files", status_code=status.HTTP_204_NO_CONTENT)
+def write_sandbox_file(project_id: ProjectId, request: FileWriteRequest) -> None:
+    """Write a file into a sandbox on this node"""
+    _resolve(project_id, request.path)
+    write_project_file(None, project_id, request.path, request.content)
+
+
+@node_agent_router.get("/sandboxes/{project_id}/manifest", response_model=FileManifestResponse)
+def get_sandbox_manifest(project_id: ProjectId) -> FileManifestResponse:
+    """File manifest of a sandbox on this node"""
+    return FileManifestResponse(files=file_manifest.get(project_id))
+
+
+@node_agent_router.get("/sandboxes/{project_id}/search", response_model=SearchResponse)
+def search_sandbox(
+    project_id: ProjectId,
+    q: str = Query(..., min_length=1),
+    mode: SearchMode = Query("auto"),
+    limit: Optional[int] = Query(None, ge=1, le=200),
+) -> SearchResponse:
+    """Search a sandbox on this node through its index"""
+    try:
+        used_mode, hits = code_index.search(project_id, q, lambda path: _read_text(project_id, path), mode, limit)
+    except re.error as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid regular expression: {e}")
+    return SearchResponse(query=q, mode=used_mode, hits=hits)
@@ -1,16 +1,48 @@
-from typing import List, Sequence
+from datetime import datetime
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+import anyio
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from sqlalchemy import func, update
+from sqlalchemy.orm import selectinload
 from sqlmodel import Session, select
 
+from app.core.settings import settings
 from app.database.engine import db_session
-from app.database.models import Project
+from app.database.models import Project, ProjectStatus
 from app.database.models import Session as SessionModel
-from app.schema.project_schema import ProjectCreateRequest, ProjectResponse
+from app.database.queries import id_in
+from app.schema.bulk_schema import BulkIdsRequest, BulkItemResult
+from app.schema.project_schema import (
+    ProjectBatchResponse,
+    ProjectBuildRequest,
+    ProjectCreateRequest,
+    ProjectResponse,
+    ProjectStatsResponse,
+)
+from app.services.archive.archiver import ArchiveError, restore_project
+from app.services.archive.project_transfer import (
+    ArchiveFormat,
+    ProjectImportError,
+    RequestBodyReader,
+    export_rows,
+    import_project,
+    iter_project_export,
+)
+from app.services.cache.entity_cache import project_cache
+from app.services.cache.loaders import load_project_payload
+from app.services.llm.build_orchestrator import stream_parallel_build
+from app.services.llm.dataclasses.project_info import ProjectInfo
 from app.services.llm.generations.create_app import generate_app_info
+from app.services.llm.run_control import RunControl, resolve_budget
 from app.services.sandbox.port_manager import generate_available_port
-from app.services.sandbox.sandbox_manager import setup_sandbox
-from app.services.sandbox.server_manager import stop_server
+from app.services.sandbox.resource_monitor import get_usage
+from app.services.sandbox.sandbox_gateway import provision_sandbox, teardown_sandbox, teardown_sandboxes
+from app.services.sandbox.template_registry import TemplateNotFoundError, template_registry
+from app.utils.generate_ids import generate_id
+from app.utils.serialization import dumps_line
 
 project_router = APIRouter(
     prefix="/projects",
@@ -18,12 +50,147 @@ project_router = APIRouter(
 )
 
 
+def _parse_metadata_filter(metadata: Optional[str]) -> Optional[dict]:
+    if metadata is None:
+        return None
+    try:
+        value = orjson.loads(metadata)
+    except orjson.JSONDecodeError:
+        value = None
+    if not isinstance(value, dict):
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="metadata must be a JSON object")
+    return value
+
+
 @project_router.get("/", response_model=List[ProjectResponse])
-def list_projects(session: Session = Depends(db_session)) -> Sequence[Project]:
-    """List all projects"""
-    statement = select(Project).where(Project.is_deleted == False)  # noqa: E712
+def list_projects(
+    sandbox_status: Optional[str] = None,
+    node_id: Optional[str] = None,
+    project_status: Optional[ProjectStatus] = Query(None, alias="status"),
+    metadata: Optional[str] = Query(None, description="JSON object the project metadata must contain"),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    session: Session = Depends(db_session),
+) -> ORJSONResponse:
+    """List all projects, optionally filtered by sandbox status, node, status or metadata"""
+    statement = (
+        select(Project)
+        .where(Project.is_deleted == False)  # noqa: E712
+        .options(selectinload(Project.sessions))
+        .order_by(Project.created_at, Project.id)
+        .offset(offset)
+        .limit(limit)
+    )
+    if sandbox_status is not None:
+        statement = statement.where(Project.sandbox_status == sandbox_status)
+    if node_id is not None:
+        statement = statement.where(Project.node_id == node_id)
+    if project_status is not None:
+        statement = statement.where(Project.status == project_status.value)
+    metadata_filter = _parse_metadata_filter(metadata)
+    if metadata_filter:
+        # Containment (@>) is answered by the GIN index on project_metadata
+        statement = statement.where(Project.project_metadata.contains(metadata_filter))
     projects = session.exec(statement).all()
-    return projects
+    return ORJSONResponse([ProjectResponse.dump_orm(project) for project in projects])
+
+
+@project_router.get("/stats", response_model=ProjectStatsResponse)
+def project_stats(session: Session = Depends(db_session)) -> ProjectStatsResponse:
+    """Fleet-wide project counts and status breakdowns, aggregated in the database"""
+    live = Project.is_deleted == False  # noqa: E712
+    total, deleted, running = session.exec(
+        select(
+            func.count().filter(live),
+            func.count().filter(Project.is_deleted == True),  # noqa: E712
+            func.count().filter(live, Project.server_pid.is_not(None)),
+        )
+    ).one()
+
+    # One pass over the live projects produces all three breakdowns; GROUPING() tells the sets apart
+    rows = session.exec(
+        select(
+            Project.status,
+            Project.sandbox_status,
+            Project.node_id,
+            func.grouping(Project.status),
+            func.grouping(Project.sandbox_status),
+            func.count(),
+        )
+        .where(live)
+        .group_by(func.grouping_sets(Project.status, Project.sandbox_status, Project.node_id))
+    ).all()
+
+    by_status: dict[str, int] = {}
+    by_sandbox_status: dict[str, int] = {}
+    by_node: dict[str, int] = {}
+    for project_status, sandbox_status, node_id, status_grouped, sandbox_grouped, count in rows:
+        if status_grouped == 0:
+            by_status[project_status] = count
+        elif sandbox_grouped == 0:
+            by_sandbox_status[sandbox_status or "unknown"] = count
+        else:
+            by_node[node_id or "local"] = count
+
+    return ProjectStatsResponse(
+        total=total,
+        deleted=deleted,
+        running=running,
+        by_status=by_status,
+        by_sandbox_status=by_sandbox_status,
+        by_node=by_node,
+    )
+
+
+@project_router.post("/batch", response_model=ProjectBatchResponse)
+def batch_get_projects(request: BulkIdsRequest, session: Session = Depends(db_session)) -> ORJSONResponse:
+    """Fetch several projects by ID in one query"""
+    statement = (
+        select(Project)
+        .where(id_in(Project.id, request.ids), Project.is_deleted == False)  # noqa: E712
+        .options(selectinload(Project.sessions))
+    )
+    projects = session.exec(statement).all()
+    found_ids = {project.id for project in projects}
+    return ORJSONResponse(
+        {
+            "items": [ProjectResponse.dump_orm(project) for project in projects],
+            "missing": [project_id for project_id in dict.fromkeys(request.ids) if project_id not in found_ids],
+        }
+    )
+
+
+@project_router.post("/bulk-delete", response_model=List[BulkItemResult])
+def bulk_delete_projects(request: BulkIdsRequest, session: Session = Depends(db_session)) -> List[BulkItemResult]:
+    """Soft delete several projects in one statement and stop their servers in parallel"""
+    ids = list(dict.fromkeys(request.ids))
+    targets = (
+        select(Project.id, Project.server_pid, Project.node_id)
+        .where(id_in(Project.id, ids), Project.is_deleted == False)  # noqa: E712
+        .with_for_update()
+        .cte("targets")
+    )
+    statement = (
+        update(Project)
+        .where(Project.id == targets.c.id)
+        .values(is_deleted=True, server_pid=None, updated_at=datetime.now())
+        .returning(Project.id, targets.c.server_pid, targets.c.node_id)
+    )
+    deleted = {project_id: (pid, node_id) for project_id, pid, node_id in session.execute(statement).all()}
+    session.commit()
+    project_cache.invalidate(deleted.keys())
+
+    stopped = teardown_sandboxes([(node_id, pid) for pid, node_id in deleted.values() if pid])
+
+    results = []
+    for project_id in ids:
+        if project_id not in deleted:
+            results.append(BulkItemResult(id=project_id, status="not_found", detail="Project not found"))
+            continue
+        pid, node_id = deleted[project_id]
+        detail = None if not pid or stopped.get((node_id, pid)) else f"Server process {pid} could not be stopped"
+        results.append(BulkItemResult(id=project_id, status="deleted", detail=detail))
+    return results
 
 
 @project_router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -36,29 +203,111 @@ def delete_project(project_id: str, session: Session = Depends(db_session)) -> N
 
     # Stop the server process if it's running
     if project.server_pid:
-        stop_server(project.server_pid)
+        teardown_sandbox(project.node_id, project.server_pid)
         project.server_pid = None
 
     project.is_deleted = True
+    project.updated_at = datetime.now()
     session.add(project)
     session.commit()
+    project_cache.invalidate([project_id])
 
 
 @project_router.get("/{project_id}", response_model=ProjectResponse)
-def get_project(project_id: str, session: Session = Depends(db_session)) -> Project:
+def get_project(project_id: str, session: Session = Depends(db_session)) -> Response:
     """Get a specific project by ID"""
-    statement = select(Project).where(Project.id == project_id, Project.is_deleted == False)  # noqa: E712
-    project = session.exec(statement).first()
-    if not project:
+    payload = project_cache.get_or_load(project_id, lambda: load_project_payload(session, project_id))
+    if payload is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    return Response(content=payload, media_type="application/json")
+
+
+@project_router.get("/{project_id}/usage", response_model=dict)
+def get_project_usage(project_id: str) -> dict:
+    """Latest resource usage sample of a project's locally hosted sandbox"""
+    usage = get_usage(project_id)
+    if usage is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No recent usage sample")
+    return usage
+
+
+@project_router.post("/{project_id}/restore", response_model=ProjectResponse)
+def restore_archived_project(project_id: str, session: Session = Depends(db_session)) -> Project:
+    """Restore an archived project with its sessions and restart its sandbox"""
+    try:
+        project = restore_project(session, project_id)
+    except ArchiveError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    if project is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Archived project not found")
     return project
 
 
+@project_router.get("/{project_id}/export")
+def export_project(
+    project_id: str,
+    archive_format: ArchiveFormat = Query(ArchiveFormat.TAR_ZST, alias="format"),
+    session: Session = Depends(db_session),
+) -> StreamingResponse:
+    """Download a project's files with its project and session rows as an archive streamed on the fly"""
+    project = session.exec(
+        select(Project).where(Project.id == project_id, Project.is_deleted == False)  # noqa: E712
+    ).first()
+    if not project:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    if project.node_id is not None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="Export is only available for locally hosted sandboxes"
+        )
+
+    sessions = session.exec(
+        select(SessionModel).where(
+            SessionModel.project_id == project_id,
+            SessionModel.is_deleted == False,  # noqa: E712
+        )
+    ).all()
+    media_types = {
+        ArchiveFormat.TAR_ZST: "application/zstd",
+        ArchiveFormat.TAR: "application/x-tar",
+        ArchiveFormat.ZIP: "application/zip",
+    }
+    return StreamingResponse(
+        iter_project_export(project_id, export_rows(project, sessions), archive_format),
+        media_type=media_types[archive_format],
+        headers={"Content-Disposition": f'attachment; filename="{project_id}.{archive_format.value}"'},
+    )
+
+
+@project_router.post("/import", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
+async def import_project_archive(
+    request: Request,
+    archive_format: ArchiveFormat = Query(ArchiveFormat.TAR_ZST, alias="format"),
+    session: Session = Depends(db_session),
+) -> Project:
+    """Create a project from an exported archive streamed in the request body and start its sandbox"""
+    if settings.sandbox_settings.SANDBOX_MODE != "local":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="Import is only available for locally hosted sandboxes"
+        )
+
+    body = RequestBodyReader(request.stream(), settings.transfer_settings.IMPORT_MAX_BYTES)
+    try:
+        project_id = await anyio.to_thread.run_sync(import_project, body, archive_format)
+    except ProjectImportError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return session.get(Project, project_id)
+
+
 @project_router.post("/", response_model=ProjectResponse)
 async def create_project(
     project_data: ProjectCreateRequest, db_session_dep: Session = Depends(db_session)
 ) -> Project | None:
     """Create a new project"""
+    try:
+        template = template_registry.get(project_data.template)
+    except TemplateNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
     project_info = generate_app_info(project_data.description)
     project_dict = project_info.model_dump()
 
@@ -79,21 +328,20 @@ async def create_project(
         name=project_dict["name"],
         description=project_dict["description"],
         port=port,
-        project_metadata={},  # Initialize empty metadata dict
+        # Keep the execution plan so a parallel build can split it into work items later; the template
+        # version is pinned so restarts and restores materialise the same files
+        project_metadata={"execution_plan": project_dict["execution_plan"], "template": template.ref},
     )
     db_session_dep.add(project)
-    db_session_dep.commit()
-    db_session_dep.refresh(project)
 
     # Create the initial session
     initial_session = SessionModel(project_id=project.id, name="Initial Session", messages=[])
     db_session_dep.add(initial_session)
-    db_session_dep.commit()
-    db_session_dep.refresh(initial_session)
 
     # Initialize sandbox
     try:
-        sandbox_result, server_pid = setup_sandbox(project.id, port)
+        sandbox_result, server_pid, node_id = provision_sandbox(project.id, port, template.ref)
+        project.node_id = node_id
         if server_pid:
             project.server_pid = server_pid
             if project.project_metadata is None:
@@ -111,9 +359,60 @@ async def create_project(
         project.project_metadata["sandbox_status"] = "failed"
         project.project_metadata["sandbox_error"] = str(e)
 
-    # Final commit for sandbox updates
-    db_session_dep.add(project)
+    # Project, initial session and sandbox state are persisted in a single transaction
     db_session_dep.commit()
     db_session_dep.refresh(project)
 
     return project
+
+
+@project_router.post("/{project_id}/build", response_model=List[dict])
+async def build_project(
+    project_id: str, build_data: ProjectBuildRequest, session: Session = Depends(db_session)
+) -> StreamingResponse:
+    """Build a project from its execution plan with parallel sub-agents and stream their progress"""
+    project = session.exec(
+        select(Project).where(Project.id == project_id, Project.is_deleted == False)  # noqa: E712
+    ).first()
+    if not project:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+
+    execution_plan = (project.project_metadata or {}).get("execution_plan")
+    if not execution_plan:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Project has no execution plan")
+
+    statement = select(SessionModel).where(
+        SessionModel.project_id == project_id,
+        SessionModel.is_deleted == False,  # noqa: E712
+    )
+    if build_data.session_id:
+        statement = statement.where(SessionModel.id == build_data.session_id)
+    else:
+        statement = statement.order_by(SessionModel.created_at)
+    session_obj = session.exec(statement).first()
+    if not session_obj:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
+
+    project_info = ProjectInfo(id=project.id, name=project.name, port=project.port, node_id=project.node_id)
+    # The whole build is one run, cancelled through POST /sessions/{id}/runs/{run_id}/cancel
+    control = RunControl(
+        generate_id(),
+        max_seconds=resolve_budget(build_data.max_seconds, settings.worker_settings.AGENT_RUN_MAX_SECONDS),
+        max_tokens=resolve_budget(build_data.max_tokens, settings.worker_settings.AGENT_RUN_MAX_TOKENS),
+    )
+    stream = (
+        dumps_line(chunk)
+        async for chunk in stream_parallel_build(
+            session_obj.id,
+            project_info,
+            session_obj.messages or [],
+            execution_plan,
+            control,
+            build_data.max_concurrency,
+        )
+    )
+    return StreamingResponse(
+        stream,
+        media_type="application/json",
+        headers={"Cache-Control": "no-cache", "Connection": "keep-alive", "X-Run-Id": control.run_id},
+    )
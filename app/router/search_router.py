@@ -0,0 +1,38 @@
+import re
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlmodel import Session, select
+
+from app.database.engine import db_session
+from app.database.models import Project
+from app.schema.search_schema import SearchResponse
+from app.services.sandbox.sandbox_gateway import search_project as search_project_files
+from app.services.search.code_index import SearchMode
+
+search_router = APIRouter(
+    prefix="/projects/{project_id}/search",
+    tags=["Search"],
+)
+
+
+@search_router.get("/", response_model=SearchResponse)
+def search_project(
+    project_id: str,
+    q: str = Query(..., min_length=1, description="Literal text, regular expression or keywords"),
+    mode: SearchMode = Query("auto", description="grep, regex, bm25, or auto (grep falling back to bm25)"),
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    session: Session = Depends(db_session),
+) -> SearchResponse:
+    """Search a project's files through its incremental index"""
+    statement = select(Project).where(Project.id == project_id, Project.is_deleted == False)  # noqa: E712
+    project = session.exec(statement).first()
+    if not project:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+
+    try:
+        used_mode, hits = search_project_files(project.node_id, project_id, q, mode, limit)
+    except re.error as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid regular expression: {e}")
+
+    return SearchResponse(query=q, mode=used_mode, hits=hits)
@@ -1,16 +1,39 @@
-import json
-from typing import List, Optional, Sequence
+import asyncio
+from dataclasses import asdict
+from datetime import datetime
+from typing import List, Optional
 
+import orjson
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from fastapi.responses import StreamingResponse
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from sqlalchemy import update
 from sqlmodel import Session, select
 
-from app.database.engine import db_session
+from app.core.settings import settings
+from app.database.engine import db_session, engine
 from app.database.models import Project
 from app.database.models import Session as SessionModel
-from app.schema.session_schema import SessionCreateRequest, SessionResponse, SessionUpdateRequest
+from app.database.queries import id_in
+from app.schema.bulk_schema import BulkIdsRequest, BulkItemResult
+from app.schema.session_schema import (
+    RunCancelResponse,
+    SessionBatchResponse,
+    SessionBulkCreateRequest,
+    SessionCreateRequest,
+    SessionQueryRequest,
+    SessionResponse,
+    SessionUpdateRequest,
+)
+from app.services.archive.archiver import ArchiveError, restore_session
+from app.services.cache.entity_cache import project_cache, session_cache
+from app.services.cache.loaders import load_project_payload, load_session_payload
+from app.services.llm.agent_runs import stream_inline_run
 from app.services.llm.dataclasses.project_info import ProjectInfo
-from app.services.llm.llm_agents import running_agent
+from app.services.llm.run_control import RunControl, register_run, request_cancel, resolve_budget
+from app.services.profiling.profile_context import current_profile_id
+from app.services.relay.run_relay import subscribe_run
+from app.tasks.agent_tasks import run_agent_task
+from app.utils.generate_ids import generate_id
 
 session_router = APIRouter(
     prefix="/sessions",
@@ -22,31 +45,103 @@ session_router = APIRouter(
 def list_sessions(
     project_id: Optional[str] = Query(None, description="Filter sessions by project ID"),
     session: Session = Depends(db_session),
-) -> Sequence[SessionModel]:
+) -> ORJSONResponse:
     """List all sessions, optionally filtered by project ID"""
-    statement = select(SessionModel).where(not SessionModel.is_deleted)
+    statement = select(SessionModel).where(SessionModel.is_deleted == False)  # noqa: E712
 
     if project_id:
         statement = statement.where(SessionModel.project_id == project_id)
 
     sessions = session.exec(statement).all()
-    return sessions
+    return ORJSONResponse([SessionResponse.dump_orm(session_obj) for session_obj in sessions])
+
+
+@session_router.post("/batch", response_model=SessionBatchResponse)
+def batch_get_sessions(request: BulkIdsRequest, session: Session = Depends(db_session)) -> ORJSONResponse:
+    """Fetch several sessions by ID in one query"""
+    statement = select(SessionModel).where(
+        id_in(SessionModel.id, request.ids),
+        SessionModel.is_deleted == False,  # noqa: E712
+    )
+    sessions = session.exec(statement).all()
+    found_ids = {session_obj.id for session_obj in sessions}
+    return ORJSONResponse(
+        {
+            "items": [SessionResponse.dump_orm(session_obj) for session_obj in sessions],
+            "missing": [session_id for session_id in dict.fromkeys(request.ids) if session_id not in found_ids],
+        }
+    )
+
+
+@session_router.post("/bulk", response_model=List[BulkItemResult])
+def bulk_create_sessions(
+    request: SessionBulkCreateRequest, session: Session = Depends(db_session)
+) -> List[BulkItemResult]:
+    """Create several sessions in a single transaction"""
+    project_ids = {item.project_id for item in request.sessions}
+    project_statement = select(Project.id).where(
+        id_in(Project.id, project_ids),
+        Project.is_deleted == False,  # noqa: E712
+    )
+    existing_project_ids = set(session.exec(project_statement).all())
+
+    results = []
+    session_objs = []
+    for item in request.sessions:
+        if item.project_id not in existing_project_ids:
+            results.append(BulkItemResult(id=None, status="not_found", detail=f"Project {item.project_id} not found"))
+            continue
+        session_obj = SessionModel(project_id=item.project_id, name=item.name, messages=item.messages or [])
+        session_objs.append(session_obj)
+        results.append(BulkItemResult(id=session_obj.id, status="created"))
+
+    if session_objs:
+        session.add_all(session_objs)
+        session.commit()
+        project_cache.invalidate({session_obj.project_id for session_obj in session_objs})
+
+    return results
+
+
+@session_router.post("/bulk-delete", response_model=List[BulkItemResult])
+def bulk_delete_sessions(request: BulkIdsRequest, session: Session = Depends(db_session)) -> List[BulkItemResult]:
+    """Soft delete several sessions in one statement"""
+    ids = list(dict.fromkeys(request.ids))
+    statement = (
+        update(SessionModel)
+        .where(id_in(SessionModel.id, ids), SessionModel.is_deleted == False)  # noqa: E712
+        .values(is_deleted=True, updated_at=datetime.now())
+        .returning(SessionModel.id, SessionModel.project_id)
+    )
+    deleted = dict(session.execute(statement).all())
+    session.commit()
+    session_cache.invalidate(deleted.keys())
+    project_cache.invalidate(set(deleted.values()))
+
+    return [
+        BulkItemResult(id=session_id, status="deleted")
+        if session_id in deleted
+        else BulkItemResult(id=session_id, status="not_found", detail="Session not found")
+        for session_id in ids
+    ]
 
 
 @session_router.get("/{session_id}", response_model=SessionResponse)
-def get_session(session_id: str, session: Session = Depends(db_session)) -> SessionModel:
+def get_session(session_id: str, session: Session = Depends(db_session)) -> Response:
     """Get a specific session by ID"""
-    statement = select(SessionModel).where(SessionModel.id == session_id, not SessionModel.is_deleted)
-    session_obj = session.exec(statement).first()
-    if not session_obj:
+    payload = session_cache.get_or_load(session_id, lambda: load_session_payload(session, session_id))
+    if payload is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
-    return session_obj
+    return Response(content=payload, media_type="application/json")
 
 
 @session_router.post("/", response_model=SessionResponse)
 def create_session(session_data: SessionCreateRequest, session: Session = Depends(db_session)) -> SessionModel:
     """Create a new session"""
-    project_statement = select(Project).where(Project.id == session_data.project_id, not Project.is_deleted)
+    project_statement = select(Project).where(
+        Project.id == session_data.project_id,
+        Project.is_deleted == False,  # noqa: E712
+    )
     project = session.exec(project_statement).first()
     if not project:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
@@ -59,6 +154,7 @@ def create_session(session_data: SessionCreateRequest, session: Session = Depend
     session.add(session_obj)
     session.commit()
     session.refresh(session_obj)
+    project_cache.invalidate([session_obj.project_id])
 
     return session_obj
 
@@ -68,7 +164,10 @@ def update_session(
     session_id: str, session_data: SessionUpdateRequest, session: Session = Depends(db_session)
 ) -> SessionModel:
     """Update a specific session by ID"""
-    statement = select(SessionModel).where(SessionModel.id == session_id, not SessionModel.is_deleted)
+    statement = select(SessionModel).where(
+        SessionModel.id == session_id,
+        SessionModel.is_deleted == False,  # noqa: E712
+    )
     session_obj = session.exec(statement).first()
     if not session_obj:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
@@ -77,9 +176,12 @@ def update_session(
         session_obj.name = session_data.name
     if session_data.messages is not None:
         session_obj.messages = session_data.messages
+    session_obj.updated_at = datetime.now()
     session.add(session_obj)
     session.commit()
     session.refresh(session_obj)
+    session_cache.invalidate([session_id])
+    project_cache.invalidate([session_obj.project_id])
 
     return session_obj
 
@@ -87,64 +189,102 @@ def update_session(
 @session_router.delete("/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_session(session_id: str, session: Session = Depends(db_session)) -> None:
     """Delete a session (soft delete)"""
-    statement = select(SessionModel).where(SessionModel.id == session_id, not SessionModel.is_deleted)
+    statement = select(SessionModel).where(
+        SessionModel.id == session_id,
+        SessionModel.is_deleted == False,  # noqa: E712
+    )
     session_obj = session.exec(statement).first()
     if not session_obj:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
 
     session_obj.is_deleted = True
+    session_obj.updated_at = datetime.now()
     session.add(session_obj)
     session.commit()
+    session_cache.invalidate([session_id])
+    project_cache.invalidate([session_obj.project_id])
+
+
+@session_router.post("/{session_id}/restore", response_model=SessionResponse)
+def restore_archived_session(session_id: str, session: Session = Depends(db_session)) -> SessionModel:
+    """Restore an archived session (undeleting it if it was deleted)"""
+    try:
+        session_obj = restore_session(session, session_id, undelete=True)
+    except ArchiveError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    if session_obj is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Archived session not found")
+    return session_obj
+
+
+def _load_query_context(session_id: str) -> tuple[dict, dict]:
+    """Resolve the session and its project through the cache; blocking, so run it off the event loop."""
+    # The DB session is only needed to resolve the session and project, not for the whole stream
+    with Session(engine) as session:
+        session_payload = session_cache.get_or_load(session_id, lambda: load_session_payload(session, session_id))
+        if session_payload is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
+        session_data = orjson.loads(session_payload)
+        project_id = session_data["project_id"]
+
+        project_payload = project_cache.get_or_load(project_id, lambda: load_project_payload(session, project_id))
+        if project_payload is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
+    return session_data, orjson.loads(project_payload)
 
 
 @session_router.post("/{session_id}/query", response_model=List[dict])
-async def query_session(
-    session_id: str,
-    query_data: SessionCreateRequest,
-    session: Session = Depends(db_session),
-) -> StreamingResponse:
+async def query_session(session_id: str, query_data: SessionQueryRequest) -> StreamingResponse:
     """Query a specific session by ID using LLM agent with streaming response"""
-    statement = (
-        select(SessionModel, Project)
-        .join(Project, SessionModel.project_id == Project.id)
-        .where(SessionModel.id == session_id, not SessionModel.is_deleted)
+    # Cache misses may wait on another request's fill lock, which must not stall the event loop
+    session_data, project_data = await asyncio.to_thread(_load_query_context, session_id)
+    project_info = ProjectInfo(
+        id=project_data["id"],
+        name=project_data["name"],
+        port=project_data["port"],
+        node_id=project_data.get("node_id"),
     )
-    result = session.exec(statement).first()
-    if not result:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
-
-    session_obj, project_obj = result
-    project_info = ProjectInfo(id=project_obj.id, name=project_obj.name, port=project_obj.port)
 
     # Get existing messages from session or initialize with empty list
-    existing_messages = session_obj.messages or []
+    existing_messages = session_data["messages"] or []
 
     # Add user message to the conversation
     user_message = {"role": "user", "content": query_data.input}
     message_for_agent = existing_messages + [user_message]
 
-    # Store assistant response content
-    assistant_content = ""
-
-    async def generate_stream():
-        nonlocal assistant_content
-        async for chunk in running_agent(message_for_agent, project_info):
-            # Collect assistant message response content
-            if chunk.get("type") == "message_output":
-                assistant_content = chunk.get("output", "")
-            yield json.dumps(chunk) + "\n"
+    run_id = generate_id()
+    max_seconds = resolve_budget(query_data.max_seconds, settings.worker_settings.AGENT_RUN_MAX_SECONDS)
+    max_tokens = resolve_budget(query_data.max_tokens, settings.worker_settings.AGENT_RUN_MAX_TOKENS)
+    await register_run(run_id, session_id)
 
-        # After streaming is complete, update session with both messages
-        assistant_message = {"role": "assistant", "content": assistant_content}
-        updated_messages = message_for_agent + [assistant_message]
-
-        # Update session in database
-        session_obj.messages = updated_messages
-        session.add(session_obj)
-        session.commit()
+    if settings.worker_settings.AGENT_EXECUTION_MODE == "celery":
+        run_agent_task.delay(
+            run_id,
+            session_id,
+            asdict(project_info),
+            message_for_agent,
+            query_data.verbose,
+            max_seconds,
+            max_tokens,
+            current_profile_id.get(),
+        )
+        stream = subscribe_run(run_id)
+    else:
+        control = RunControl(run_id, max_seconds=max_seconds, max_tokens=max_tokens)
+        stream = stream_inline_run(session_id, project_info, message_for_agent, control, verbose=query_data.verbose)
 
     return StreamingResponse(
-        generate_stream(),
+        stream,
         media_type="application/json",
-        headers={"Cache-Control": "no-cache", "Connection": "keep-alive"},
+        headers={"Cache-Control": "no-cache", "Connection": "keep-alive", "X-Run-Id": run_id},
     )
+
+
+@session_router.post(
+    "/{session_id}/runs/{run_id}/cancel", response_model=RunCancelResponse, status_code=status.HTTP_202_ACCEPTED
+)
+async def cancel_run(session_id: str, run_id: str) -> RunCancelResponse:
+    """Cancel a running agent run of a session"""
+    if not await request_cancel(run_id, session_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Run not found or already finished")
+    return RunCancelResponse(run_id=run_id, status="cancelling")
@@ -0,0 +1,106 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse
+from sqlmodel import Session, select
+
+from app.database.engine import db_session
+from app.database.models import Project, Snapshot
+from app.schema.snapshot_schema import SnapshotDiffResponse, SnapshotResponse, SnapshotRestoreResponse
+from app.services.snapshots.snapshot_manager import (
+    create_snapshot,
+    diff_manifests,
+    load_manifest,
+    restore_snapshot,
+    unified_patch,
+)
+
+snapshot_router = APIRouter(
+    prefix="/projects/{project_id}/snapshots",
+    tags=["Snapshots"],
+)
+
+
+def get_local_project(project_id: str, session: Session) -> Project:
+    statement = select(Project).where(Project.id == project_id, Project.is_deleted == False)  # noqa: E712
+    project = session.exec(statement).first()
+    if not project:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    if project.node_id is not None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="Snapshots are only available for locally hosted sandboxes"
+        )
+    return project
+
+
+def get_snapshot(project_id: str, snapshot_id: str, session: Session) -> Snapshot:
+    statement = select(Snapshot).where(
+        Snapshot.id == snapshot_id,
+        Snapshot.project_id == project_id,
+        Snapshot.is_deleted == False,  # noqa: E712
+    )
+    snapshot = session.exec(statement).first()
+    if not snapshot:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Snapshot not found")
+    return snapshot
+
+
+@snapshot_router.get("/", response_model=List[SnapshotResponse])
+def list_snapshots(
+    project_id: str,
+    session_id: Optional[str] = Query(None, description="Filter snapshots by session ID"),
+    session: Session = Depends(db_session),
+) -> ORJSONResponse:
+    """List the snapshots of a project, newest first"""
+    statement = (
+        select(Snapshot)
+        .where(Snapshot.project_id == project_id, Snapshot.is_deleted == False)  # noqa: E712
+        .order_by(Snapshot.created_at.desc())
+    )
+    if session_id:
+        statement = statement.where(Snapshot.session_id == session_id)
+
+    snapshots = session.exec(statement).all()
+    return ORJSONResponse([SnapshotResponse.dump_orm(snapshot) for snapshot in snapshots])
+
+
+@snapshot_router.post("/", response_model=SnapshotResponse)
+def take_snapshot(project_id: str, session: Session = Depends(db_session)) -> ORJSONResponse:
+    """Record a snapshot of the project's current files"""
+    get_local_project(project_id, session)
+    snapshot = create_snapshot(session, project_id)
+    return ORJSONResponse(SnapshotResponse.dump_orm(snapshot))
+
+
+@snapshot_router.get("/{snapshot_id}/diff", response_model=SnapshotDiffResponse)
+def diff_snapshot(
+    project_id: str,
+    snapshot_id: str,
+    against: Optional[str] = Query(None, description="Snapshot to compare with, defaults to the parent"),
+    patch: bool = Query(False, description="Include unified diffs of changed text files"),
+    session: Session = Depends(db_session),
+) -> SnapshotDiffResponse:
+    """Files added, removed and modified between two snapshots"""
+    snapshot = get_snapshot(project_id, snapshot_id, session)
+    base_id = against or snapshot.parent_id
+    base_manifest = load_manifest(get_snapshot(project_id, base_id, session).manifest_hash) if base_id else {}
+    manifest = load_manifest(snapshot.manifest_hash)
+
+    changes = diff_manifests(base_manifest, manifest)
+    return SnapshotDiffResponse(
+        base_id=base_id,
+        snapshot_id=snapshot.id,
+        patches=unified_patch(base_manifest, manifest, changes) if patch else None,
+        **changes,
+    )
+
+
+@snapshot_router.post("/{snapshot_id}/restore", response_model=SnapshotRestoreResponse)
+def restore_project_snapshot(
+    project_id: str, snapshot_id: str, session: Session = Depends(db_session)
+) -> SnapshotRestoreResponse:
+    """Restore the project's files to a snapshot, rewriting only the files that differ"""
+    get_local_project(project_id, session)
+    snapshot = get_snapshot(project_id, snapshot_id, session)
+    changes = restore_snapshot(session, snapshot)
+    return SnapshotRestoreResponse(snapshot_id=snapshot.id, **changes)
@@ -0,0 +1,26 @@
+from typing import List
+
+from fastapi import APIRouter
+
+from app.schema.template_schema import TemplateResponse
+from app.services.sandbox.template_registry import template_registry
+
+template_router = APIRouter(
+    prefix="/templates",
+    tags=["Templates"],
+)
+
+
+@template_router.get("/", response_model=List[TemplateResponse])
+def list_templates() -> List[TemplateResponse]:
+    """List the project templates available to new projects"""
+    return [
+        TemplateResponse(
+            name=template.name,
+            version=template.version,
+            ref=template.ref,
+            description=template.description,
+            files=sorted(template.files),
+        )
+        for template in template_registry.list()
+    ]
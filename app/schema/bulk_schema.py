@@ -0,0 +1,15 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+MAX_BULK_ITEMS = 1000
+
+
+class BulkIdsRequest(BaseModel):
+    ids: List[str] = Field(min_length=1, max_length=MAX_BULK_ITEMS)
+
+
+class BulkItemResult(BaseModel):
+    id: Optional[str]
+    status: str
+    detail: Optional[str] = None
@@ -0,0 +1,54 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from app.utils.generate_ids import ID_PATTERN
+
+
+class NodeInfo(BaseModel):
+    node_id: str
+    url: str
+    running_sandboxes: int
+    max_sandboxes: int
+    free_ports: int
+    mem_available_mb: int
+    load_avg: float
+    updated_at: float
+
+
+class SandboxCreateRequest(BaseModel):
+    project_id: str = Field(pattern=ID_PATTERN)
+    port: int
+    template: Optional[str] = None
+
+
+class SandboxCreateResponse(BaseModel):
+    message: str
+    pid: Optional[int]
+
+
+class SandboxStopRequest(BaseModel):
+    pid: int
+
+
+class SandboxStopResponse(BaseModel):
+    stopped: bool
+
+
+class FileWriteRequest(BaseModel):
+    path: str
+    content: str
+
+
+class FileReadResponse(BaseModel):
+    path: str
+    content: str
+
+
+class FileManifestEntry(BaseModel):
+    size: int
+    hash: str
+
+
+class FileManifestResponse(BaseModel):
+    files: dict[str, FileManifestEntry]
@@ -1,13 +1,21 @@
 from datetime import datetime
-from typing import Optional
+from typing import Any, List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from app.schema.session_schema import SessionResponse
 
 
 class ProjectCreateRequest(BaseModel):
     description: str
+    template: Optional[str] = Field(default=None, description="Template as name or name@version")
+
+
+class ProjectBuildRequest(BaseModel):
+    session_id: Optional[str] = None
+    max_concurrency: Optional[int] = Field(default=None, ge=1, le=16)
+    max_seconds: Optional[int] = Field(default=None, ge=1)
+    max_tokens: Optional[int] = Field(default=None, ge=1)
 
 
 class ProjectInfo(BaseModel):
@@ -16,6 +24,7 @@ class ProjectInfo(BaseModel):
     description: Optional[str]
     port: int
     server_pid: Optional[int]
+    node_id: Optional[str]
     project_metadata: Optional[dict]
     created_at: datetime
     updated_at: datetime
@@ -31,6 +40,7 @@ class ProjectResponse(BaseModel):
     description: Optional[str]
     port: int
     server_pid: Optional[int]
+    node_id: Optional[str]
     project_metadata: Optional[dict]
     created_at: datetime
     updated_at: datetime
@@ -39,3 +49,26 @@ class ProjectResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+    @classmethod
+    def dump_orm(cls, project: Any, include_sessions: bool = True) -> dict:
+        """Build the response payload straight from an ORM row, skipping revalidation."""
+        data = {name: getattr(project, name) for name in cls.model_fields if name != "sessions"}
+        data["sessions"] = (
+            [SessionResponse.dump_orm(session) for session in project.sessions] if include_sessions else None
+        )
+        return data
+
+
+class ProjectBatchResponse(BaseModel):
+    items: List[ProjectResponse]
+    missing: List[str]
+
+
+class ProjectStatsResponse(BaseModel):
+    total: int
+    deleted: int
+    running: int
+    by_status: dict[str, int]
+    by_sandbox_status: dict[str, int]
+    by_node: dict[str, int]
@@ -0,0 +1,20 @@
+from typing import List, Literal
+
+from pydantic import BaseModel
+
+
+class SearchMatch(BaseModel):
+    line: int
+    text: str
+
+
+class SearchHit(BaseModel):
+    path: str
+    score: float
+    matches: List[SearchMatch]
+
+
+class SearchResponse(BaseModel):
+    query: str
+    mode: Literal["grep", "regex", "bm25"]
+    hits: List[SearchHit]
@@ -1,7 +1,9 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from app.schema.bulk_schema import MAX_BULK_ITEMS
 
 
 class SessionCreateRequest(BaseModel):
@@ -10,6 +12,10 @@ class SessionCreateRequest(BaseModel):
     messages: Optional[List[dict]] = None
 
 
+class SessionBulkCreateRequest(BaseModel):
+    sessions: List[SessionCreateRequest] = Field(min_length=1, max_length=MAX_BULK_ITEMS)
+
+
 class SessionUpdateRequest(BaseModel):
     name: Optional[str] = None
     messages: Optional[List[dict]] = None
@@ -17,6 +23,14 @@ class SessionUpdateRequest(BaseModel):
 
 class SessionQueryRequest(BaseModel):
     input: str
+    verbose: bool = False
+    max_seconds: Optional[int] = Field(default=None, ge=1)
+    max_tokens: Optional[int] = Field(default=None, ge=1)
+
+
+class RunCancelResponse(BaseModel):
+    run_id: str
+    status: str
 
 
 class SessionResponse(BaseModel):
@@ -30,3 +44,13 @@ class SessionResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+    @classmethod
+    def dump_orm(cls, session: Any) -> dict:
+        """Build the response payload straight from an ORM row, skipping revalidation."""
+        return {name: getattr(session, name) for name in cls.model_fields}
+
+
+class SessionBatchResponse(BaseModel):
+    items: List[SessionResponse]
+    missing: List[str]
@@ -0,0 +1,40 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+
+
+class SnapshotResponse(BaseModel):
+    id: str
+    project_id: str
+    session_id: Optional[str]
+    parent_id: Optional[str]
+    turn: int
+    manifest_hash: str
+    file_count: int
+    total_size: int
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+    @classmethod
+    def dump_orm(cls, snapshot: Any) -> dict:
+        """Build the response payload straight from an ORM row, skipping revalidation."""
+        return {name: getattr(snapshot, name) for name in cls.model_fields}
+
+
+class SnapshotDiffResponse(BaseModel):
+    base_id: Optional[str]
+    snapshot_id: str
+    added: List[str]
+    removed: List[str]
+    modified: List[str]
+    patches: Optional[Dict[str, str]] = None
+
+
+class SnapshotRestoreResponse(BaseModel):
+    snapshot_id: str
+    added: List[str]
+    removed: List[str]
+    modified: List[str]
@@ -0,0 +1,11 @@
+from typing import List
+
+from pydantic import BaseModel
+
+
+class TemplateResponse(BaseModel):
+    name: str
+    version: str
+    ref: str
+    description: str
+    files: List[str]
@@ -0,0 +1,256 @@
+import os
+import tempfile
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+import orjson
+import zstandard
+from loguru import logger
+from sqlmodel import Session, select
+
+from app.core.settings import settings
+from app.database.engine import engine
+from app.database.models import ArchiveEntry, Project, Snapshot
+from app.database.models import Session as SessionModel
+from app.services.cache.entity_cache import project_cache, session_cache
+from app.services.sandbox.port_manager import generate_available_port
+from app.services.sandbox.sandbox_gateway import provision_sandbox, purge_sandbox_files
+from app.services.snapshots.snapshot_manager import latest_snapshot, restore_snapshot
+
+archive_settings = settings.archive_settings
+
+
+class ArchiveError(Exception):
+    pass
+
+
+def _archive_path(kind: str, entity_id: str) -> str:
+    return os.path.join(archive_settings.ARCHIVE_DIR, f"{kind}s", entity_id[:2], f"{entity_id}.json.zst")
+
+
+def write_archive(kind: str, entity_id: str, payload: dict) -> tuple[str, int]:
+    """Write a zstd-compressed JSON document atomically, returning its path and compressed size."""
+    path = _archive_path(kind, entity_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    data = zstandard.ZstdCompressor(level=archive_settings.ARCHIVE_ZSTD_LEVEL).compress(orjson.dumps(payload))
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return path, len(data)
+
+
+def read_archive(path: str) -> dict:
+    with open(path, "rb") as f:
+        return orjson.loads(zstandard.ZstdDecompressor().decompress(f.read()))
+
+
+def _dump_row(row) -> dict:
+    return row.model_dump()
+
+
+def _load_row(model, data: dict):
+    """Rebuild an ORM row from its archived dump; table models are not validated, so parse dates here."""
+    # Generated columns are recomputed by the database and cannot be inserted
+    computed = {column.name for column in model.__table__.columns if column.computed is not None}
+    values = {name: value for name, value in data.items() if name not in computed}
+    for name in ("created_at", "updated_at"):
+        values[name] = datetime.fromisoformat(values[name])
+    return model(**values)
+
+
+def _remove_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def archive_sessions(session: Session, sessions: Iterable[SessionModel], reason: str) -> int:
+    """Move sessions (with their message history) to cold storage and out of the hot table."""
+    archived = []
+    for session_obj in sessions:
+        path, size = write_archive("session", session_obj.id, {"kind": "session", "row": _dump_row(session_obj)})
+        session.add(
+            ArchiveEntry(
+                id=session_obj.id,
+                kind="session",
+                project_id=session_obj.project_id,
+                reason=reason,
+                path=path,
+                size_bytes=size,
+            )
+        )
+        session.delete(session_obj)
+        archived.append(session_obj)
+    session.commit()
+
+    session_cache.invalidate(session_obj.id for session_obj in archived)
+    project_cache.invalidate({session_obj.project_id for session_obj in archived})
+    return len(archived)
+
+
+def archive_project(session: Session, project: Project, reason: str) -> None:
+    """Move a project with all its sessions and snapshot records to cold storage, then purge its files."""
+    sessions = session.exec(select(SessionModel).where(SessionModel.project_id == project.id)).all()
+    snapshots = session.exec(select(Snapshot).where(Snapshot.project_id == project.id)).all()
+    payload = {
+        "kind": "project",
+        "row": _dump_row(project),
+        "sessions": [_dump_row(session_obj) for session_obj in sessions],
+        "snapshots": [_dump_row(snapshot) for snapshot in snapshots],
+    }
+    path, size = write_archive("project", project.id, payload)
+
+    session.add(
+        ArchiveEntry(id=project.id, kind="project", project_id=project.id, reason=reason, path=path, size_bytes=size)
+    )
+    for row in [*snapshots, *sessions]:
+        session.delete(row)
+    session.flush()
+    session.delete(project)
+    session.commit()
+
+    session_cache.invalidate(session_obj.id for session_obj in sessions)
+    project_cache.invalidate([project.id])
+
+    # Snapshot contents stay in the content store, so the files can be brought back on restore
+    try:
+        purge_sandbox_files(project.node_id, project.id)
+    except Exception as e:
+        logger.warning("Failed to purge sandbox files of archived project {}: {}", project.id, e)
+
+
+def compact() -> dict[str, int]:
+    """
+    Archive one batch of stale data: deleted projects, deleted sessions and long-inactive sessions.
+
+    Each category is limited to ARCHIVE_BATCH_SIZE rows per run so the job never holds long
+    transactions; the beat schedule works through any backlog over successive runs.
+    """
+    now = datetime.now()
+    deleted_cutoff = now - timedelta(days=archive_settings.ARCHIVE_DELETED_AFTER_DAYS)
+    inactive_cutoff = now - timedelta(days=archive_settings.ARCHIVE_INACTIVE_AFTER_DAYS)
+    limit = archive_settings.ARCHIVE_BATCH_SIZE
+    counts = {"projects": 0, "deleted_sessions": 0, "inactive_sessions": 0}
+
+    with Session(engine) as session:
+        projects = session.exec(
+            select(Project)
+            .where(Project.is_deleted == True, Project.updated_at < deleted_cutoff)  # noqa: E712
+            .limit(limit)
+        ).all()
+        for project in projects:
+            try:
+                archive_project(session, project, "deleted")
+                counts["projects"] += 1
+            except Exception as e:
+                session.rollback()
+                logger.error("Failed to archive project {}: {}", project.id, e)
+
+        live_session = select(SessionModel).join(Project, Project.id == SessionModel.project_id)
+        live_session = live_session.where(Project.is_deleted == False)  # noqa: E712
+        deleted_sessions = session.exec(
+            live_session.where(
+                SessionModel.is_deleted == True,  # noqa: E712
+                SessionModel.updated_at < deleted_cutoff,
+            ).limit(limit)
+        ).all()
+        counts["deleted_sessions"] = archive_sessions(session, deleted_sessions, "deleted")
+
+        inactive_sessions = session.exec(
+            live_session.where(
+                SessionModel.is_deleted == False,  # noqa: E712
+                SessionModel.updated_at < inactive_cutoff,
+            ).limit(limit)
+        ).all()
+        counts["inactive_sessions"] = archive_sessions(session, inactive_sessions, "inactive")
+
+    logger.info("Archive compaction finished: {}", counts)
+    return counts
+
+
+def restore_session(
+    session: Session, session_id: str, undelete: bool = False, reasons: Optional[tuple[str, ...]] = None
+) -> Optional[SessionModel]:
+    """
+    Bring an archived session back into the hot table.
+
+    Returns None when the session is not archived (or was archived for a reason outside `reasons`).
+    Raises ArchiveError when its project is no longer live.
+    """
+    entry = session.get(ArchiveEntry, session_id)
+    if entry is None or entry.kind != "session" or (reasons and entry.reason not in reasons):
+        return None
+
+    project = session.get(Project, entry.project_id)
+    if project is None or project.is_deleted:
+        raise ArchiveError(f"Project {entry.project_id} of session {session_id} must be restored first")
+
+    session_obj = _load_row(SessionModel, read_archive(entry.path)["row"])
+    # A fresh updated_at keeps the next compaction run from archiving it straight away
+    session_obj.updated_at = datetime.now()
+    if undelete:
+        session_obj.is_deleted = False
+    session.add(session_obj)
+    session.delete(entry)
+    session.commit()
+    session.refresh(session_obj)
+    _remove_file(entry.path)
+
+    session_cache.invalidate([session_id])
+    project_cache.invalidate([session_obj.project_id])
+    logger.info("Restored session {} from the archive", session_id)
+    return session_obj
+
+
+def restore_project(session: Session, project_id: str) -> Optional[Project]:
+    """
+    Bring an archived project back: rows are reinserted, a sandbox is provisioned and, in local mode,
+    the files are restored from the project's latest snapshot. Returns None when it is not archived.
+    """
+    entry = session.get(ArchiveEntry, project_id)
+    if entry is None or entry.kind != "project":
+        return None
+
+    payload = read_archive(entry.path)
+    project = _load_row(Project, payload["row"])
+    project.is_deleted = False
+    project.server_pid = None
+    project.updated_at = datetime.now()
+
+    # The archived port may have been handed to another project in the meantime
+    if session.exec(select(Project.id).where(Project.port == project.port)).first():
+        port = generate_available_port()
+        if port is None:
+            raise ArchiveError("Unable to generate available port")
+        project.port = port
+
+    session.add(project)
+    session.flush()
+    session.add_all([_load_row(SessionModel, row) for row in payload["sessions"]])
+    session.add_all([_load_row(Snapshot, row) for row in payload["snapshots"]])
+    session.delete(entry)
+    session.commit()
+    _remove_file(entry.path)
+
+    template = (project.project_metadata or {}).get("template")
+    message, pid, node_id = provision_sandbox(project.id, project.port, template)
+    project.node_id = node_id
+    project.server_pid = pid
+    project.project_metadata = {
+        **(project.project_metadata or {}),
+        "sandbox_status": "initialized" if pid else "failed",
+        "sandbox_error": message,
+    }
+    session.add(project)
+    session.commit()
+
+    snapshot = latest_snapshot(session, project.id)
+    if snapshot is not None and node_id is None:
+        restore_snapshot(session, snapshot)
+
+    session.refresh(project)
+    project_cache.invalidate([project.id])
+    logger.info("Restored project {} from the archive", project.id)
+    return project
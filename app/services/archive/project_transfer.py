@@ -0,0 +1,337 @@
+import io
+import os
+import tarfile
+import zipfile
+from enum import Enum
+from typing import AsyncIterator, Iterator, Optional, Union
+
+import anyio.from_thread
+import orjson
+import zstandard
+from loguru import logger
+from sqlmodel import Session
+
+from app.core.settings import settings
+from app.database.engine import engine
+from app.database.models import Project
+from app.database.models import Session as SessionModel
+from app.services.sandbox.paths import project_dir, project_file
+from app.services.sandbox.port_manager import generate_available_port
+from app.services.sandbox.sandbox_manager import purge_sandbox, setup_sandbox
+from app.services.sandbox.server_manager import stop_server
+from app.services.snapshots.snapshot_manager import create_snapshot
+from app.utils.generate_ids import generate_id
+
+transfer_settings = settings.transfer_settings
+
+EXPORT_VERSION = 1
+# Archive layout: the rows first, then every project file under FILES_PREFIX
+ROWS_ENTRY = "project.json"
+FILES_PREFIX = "files/"
+TAR_BLOCK = tarfile.BLOCKSIZE
+
+Chunk = Union[bytes, memoryview]
+
+
+class ArchiveFormat(str, Enum):
+    TAR_ZST = "tar.zst"
+    TAR = "tar"
+    ZIP = "zip"
+
+
+class ProjectImportError(Exception):
+    pass
+
+
+def export_rows(project: Project, sessions: list[SessionModel]) -> dict:
+    return {
+        "version": EXPORT_VERSION,
+        "project": project.model_dump(),
+        "sessions": [session_obj.model_dump() for session_obj in sessions],
+    }
+
+
+def _project_files(project_id: str) -> Iterator[tuple[str, str]]:
+    """(absolute path, archive name) of every regular file of a project; symlinks are never followed."""
+    root = project_dir(project_id)
+    ignored = set(transfer_settings.TRANSFER_IGNORE)
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(name for name in dirnames if name not in ignored)
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            if os.path.islink(path) or not os.path.isfile(path):
+                continue
+            yield path, FILES_PREFIX + os.path.relpath(path, root).replace(os.sep, "/")
+
+
+def _read_chunks(f, size: int, buffer: bytearray) -> Iterator[memoryview]:
+    """
+    Yield exactly `size` bytes of `f` as views into one reused buffer, zero-filling if the file shrank.
+
+    Each view is only valid until the next one is requested; consumers must send or copy it first.
+    """
+    view = memoryview(buffer)
+    remaining = size
+    while remaining:
+        read = f.readinto(view[: min(len(view), remaining)])
+        if not read:
+            break
+        remaining -= read
+        yield view[:read]
+    while remaining:
+        fill = min(len(view), remaining)
+        remaining -= fill
+        yield memoryview(bytes(fill))
+
+
+def _tar_member(name: str, size: int, mtime: float, mode: int = 0o644) -> bytes:
+    info = tarfile.TarInfo(name)
+    info.size = size
+    info.mtime = int(mtime)
+    info.mode = mode
+    return info.tobuf(format=tarfile.PAX_FORMAT)
+
+
+def _iter_tar(project_id: str, rows: bytes) -> Iterator[Chunk]:
+    """
+    Write a tar stream by hand: headers via TarInfo, file data straight from the file in fixed chunks.
+
+    tarfile itself would copy each member into its output object before we could send it; producing
+    the blocks directly keeps memory at one chunk regardless of file sizes.
+    """
+    yield _tar_member(ROWS_ENTRY, len(rows), 0)
+    yield rows + bytes(-len(rows) % TAR_BLOCK)
+
+    buffer = bytearray(transfer_settings.TRANSFER_CHUNK_SIZE)
+    for path, name in _project_files(project_id):
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            yield _tar_member(name, stat.st_size, stat.st_mtime, stat.st_mode & 0o777)
+            yield from _read_chunks(f, stat.st_size, buffer)
+        yield bytes(-stat.st_size % TAR_BLOCK)
+
+    yield bytes(2 * TAR_BLOCK)
+
+
+class _ChunkSink:
+    """Write-only file object collecting what zipfile writes, drained after every chunk."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _iter_zip(project_id: str, rows: bytes) -> Iterator[Chunk]:
+    # The sink cannot seek, so zipfile writes data descriptors after each member instead of patching headers
+    sink = _ChunkSink()
+    buffer = bytearray(transfer_settings.TRANSFER_CHUNK_SIZE)
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(ROWS_ENTRY, rows)
+        yield sink.drain()
+
+        for path, name in _project_files(project_id):
+            info = zipfile.ZipInfo.from_file(path, name)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            force_zip64 = info.file_size > zipfile.ZIP64_LIMIT
+            with open(path, "rb") as f, archive.open(info, "w", force_zip64=force_zip64) as dest:
+                for chunk in _read_chunks(f, info.file_size, buffer):
+                    dest.write(chunk)
+                    if data := sink.drain():
+                        yield data
+            yield sink.drain()
+    yield sink.drain()
+
+
+def _zstd_stream(chunks: Iterator[Chunk]) -> Iterator[bytes]:
+    compressor = zstandard.ZstdCompressor(level=transfer_settings.TRANSFER_ZSTD_LEVEL).compressobj()
+    for chunk in chunks:
+        if data := compressor.compress(chunk):
+            yield data
+    yield compressor.flush()
+
+
+def iter_project_export(project_id: str, rows: dict, archive_format: ArchiveFormat) -> Iterator[Chunk]:
+    """
+    Stream a project as an archive built on the fly: no temporary files, memory bounded by one chunk.
+
+    The archive holds `project.json` (the project and session rows) followed by the project files
+    under `files/`. Meant to be consumed from a worker thread, e.g. by a StreamingResponse.
+    """
+    rows_data = orjson.dumps(rows)
+    if archive_format == ArchiveFormat.ZIP:
+        chunks = _iter_zip(project_id, rows_data)
+    else:
+        chunks = _iter_tar(project_id, rows_data)
+        if archive_format == ArchiveFormat.TAR_ZST:
+            chunks = _zstd_stream(chunks)
+
+    for chunk in chunks:
+        if chunk:
+            yield chunk
+    logger.info("Exported project {} as {}", project_id, archive_format.value)
+
+
+class RequestBodyReader(io.RawIOBase):
+    """
+    Blocking file object over an async request body, for parsers running in a worker thread.
+
+    Chunks are pulled from the event loop on demand (anyio.from_thread), so only the chunk being
+    parsed is held in memory. Raises ProjectImportError once more than `max_bytes` were received.
+    """
+
+    def __init__(self, chunks: AsyncIterator[bytes], max_bytes: int) -> None:
+        self._chunks = chunks
+        self._pending = memoryview(b"")
+        self._received = 0
+        self._max_bytes = max_bytes
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            try:
+                chunk = anyio.from_thread.run(self._chunks.__anext__)
+            except StopAsyncIteration:
+                return 0
+            self._received += len(chunk)
+            if self._received > self._max_bytes:
+                raise ProjectImportError(f"Archive is larger than {self._max_bytes} bytes")
+            self._pending = memoryview(chunk)
+
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+def _extract_tar(archive: tarfile.TarFile, project_id: str) -> Optional[dict]:
+    """Write the members of a streamed tar into the project directory and return the parsed rows."""
+    rows = None
+    file_count = 0
+    total_size = 0
+    buffer = bytearray(transfer_settings.TRANSFER_CHUNK_SIZE)
+
+    for member in archive:
+        if member.name == ROWS_ENTRY and member.isfile():
+            # Parsed in memory, so it gets a limit of its own on top of counting toward the total
+            if member.size > transfer_settings.IMPORT_MAX_ROWS_BYTES:
+                raise ProjectImportError(f"{ROWS_ENTRY} is larger than {transfer_settings.IMPORT_MAX_ROWS_BYTES} bytes")
+            total_size += member.size
+            rows = orjson.loads(archive.extractfile(member).read())
+            continue
+        # Links, devices and anything outside files/ are never materialised
+        if not member.isfile() or not member.name.startswith(FILES_PREFIX):
+            continue
+
+        file_count += 1
+        total_size += member.size
+        if file_count > transfer_settings.IMPORT_MAX_FILES:
+            raise ProjectImportError(f"Archive holds more than {transfer_settings.IMPORT_MAX_FILES} files")
+        if total_size > transfer_settings.IMPORT_MAX_BYTES:
+            raise ProjectImportError(f"Archive expands to more than {transfer_settings.IMPORT_MAX_BYTES} bytes")
+
+        try:
+            path = project_file(project_id, member.name[len(FILES_PREFIX) :])
+        except ValueError as e:
+            raise ProjectImportError(str(e))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        source = archive.extractfile(member)
+        with open(path, "wb") as f:
+            for chunk in _read_chunks(source, member.size, buffer):
+                f.write(chunk)
+        os.utime(path, (member.mtime, member.mtime))
+
+    return rows
+
+
+def import_project(body: io.RawIOBase, archive_format: ArchiveFormat) -> str:
+    """
+    Create a new project from an exported archive and start its sandbox, returning the new project id.
+
+    Files are written into the new project directory while the archive is being received. The rows
+    are inserted afterwards with fresh ids, a fresh port and the sandbox state reset; sessions keep
+    their names and messages. Anything left behind by a failed import is removed again.
+    """
+    if archive_format == ArchiveFormat.ZIP:
+        raise ProjectImportError("zip archives cannot be imported as a stream; use tar or tar.zst")
+
+    project_id = generate_id()
+    reader = io.BufferedReader(body, buffer_size=transfer_settings.TRANSFER_CHUNK_SIZE)
+    if archive_format == ArchiveFormat.TAR_ZST:
+        reader = zstandard.ZstdDecompressor().stream_reader(reader)
+
+    pid = None
+    try:
+        with tarfile.open(fileobj=reader, mode="r|") as archive:
+            rows = _extract_tar(archive, project_id)
+        if not rows or rows.get("version") != EXPORT_VERSION:
+            raise ProjectImportError(f"Archive has no version {EXPORT_VERSION} {ROWS_ENTRY}")
+
+        port = generate_available_port()
+        if port is None:
+            raise ProjectImportError("Unable to generate available port")
+
+        source = rows["project"]
+        metadata = {
+            key: value
+            for key, value in (source.get("project_metadata") or {}).items()
+            if key not in ("sandbox_status", "sandbox_error")
+        }
+        message, pid = setup_sandbox(project_id, port, metadata.get("template"))
+        metadata["sandbox_status"] = "initialized" if pid else "failed"
+        metadata["sandbox_error"] = message
+        metadata["imported_from"] = source["id"]
+
+        with Session(engine) as session:
+            session.add(
+                Project(
+                    id=project_id,
+                    name=source["name"],
+                    description=source.get("description"),
+                    port=port,
+                    server_pid=pid,
+                    status=source.get("status", "active"),
+                    project_metadata=metadata,
+                )
+            )
+            session.flush()
+            session.add_all(
+                SessionModel(project_id=project_id, name=row["name"], messages=row.get("messages"))
+                for row in rows["sessions"]
+                if not row.get("is_deleted")
+            )
+            session.commit()
+    except (tarfile.TarError, zstandard.ZstdError, orjson.JSONDecodeError, KeyError) as e:
+        _discard(project_id, pid)
+        raise ProjectImportError(f"Invalid project archive: {e}")
+    except BaseException:
+        _discard(project_id, pid)
+        raise
+
+    logger.info("Imported project {} from an export of {}", project_id, rows["project"]["id"])
+
+    if settings.snapshot_settings.SNAPSHOT_ENABLED:
+        try:
+            with Session(engine) as session:
+                create_snapshot(session, project_id)
+        except Exception as e:
+            logger.error("Failed to snapshot imported project {}: {}", project_id, e)
+    return project_id
+
+
+def _discard(project_id: str, pid: Optional[int]) -> None:
+    if pid:
+        stop_server(pid)
+    purge_sandbox(project_id)
@@ -0,0 +1,157 @@
+import random
+import threading
+import time
+from collections import Counter
+from typing import Callable, Iterable, Optional
+
+from loguru import logger
+from redis import Redis, RedisError
+
+from app.core.settings import settings
+from app.database.redis_client import redis_client
+from app.utils.serialization import dumps
+
+NEGATIVE_MARKER = b"\x00"
+
+
+class EntityCache:
+    """
+    Read-through Redis cache of serialized entity payloads keyed by id.
+
+    Every entity has a version counter; data keys embed the version, so a write only has to bump
+    the counter to make every cached copy unreachable. Misses for unknown ids are cached briefly
+    (negative caching) and concurrent misses for the same key are collapsed behind a short lock so
+    only one request hits the database.
+    """
+
+    def __init__(self, kind: str, client: Redis = redis_client) -> None:
+        self.kind = kind
+        self.client = client
+        self.config = settings.cache_settings
+        self.stats: Counter[str] = Counter()
+        self._stats_lock = threading.Lock()
+
+    def _version_key(self, entity_id: str) -> str:
+        return f"{self.config.CACHE_KEY_PREFIX}:{self.kind}:{entity_id}:ver"
+
+    def _data_key(self, entity_id: str, version: int) -> str:
+        return f"{self.config.CACHE_KEY_PREFIX}:{self.kind}:{entity_id}:{version}"
+
+    def _record(self, name: str) -> None:
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def _ttl(self) -> int:
+        return self.config.CACHE_TTL_SECONDS + random.randint(0, self.config.CACHE_TTL_JITTER_SECONDS)
+
+    def _read(self, entity_id: str) -> tuple[int, Optional[bytes]]:
+        version = int(self.client.get(self._version_key(entity_id)) or 0)
+        return version, self.client.get(self._data_key(entity_id, version))
+
+    def _fill(self, entity_id: str, version: int, payload: Optional[bytes]) -> None:
+        if payload is None:
+            value, ttl = NEGATIVE_MARKER, self.config.CACHE_NEGATIVE_TTL_SECONDS
+        elif len(payload) > self.config.CACHE_MAX_ENTRY_BYTES:
+            self._record("oversize")
+            return
+        else:
+            value, ttl = payload, self._ttl()
+
+        pipe = self.client.pipeline(transaction=False)
+        pipe.set(self._data_key(entity_id, version), value, ex=ttl)
+        # The version key must outlive every data key written under it, otherwise an expired
+        # counter would restart at 0 and expose stale entries.
+        pipe.expire(self._version_key(entity_id), self.config.CACHE_TTL_SECONDS * 10)
+        pipe.execute()
+        self._record("fills")
+
+    def _unpack(self, cached: bytes) -> Optional[bytes]:
+        if cached == NEGATIVE_MARKER:
+            self._record("negative_hits")
+            return None
+        self._record("hits")
+        return cached
+
+    def get_or_load(self, entity_id: str, loader: Callable[[], Optional[dict]]) -> Optional[bytes]:
+        """
+        Return the JSON payload for `entity_id`, calling `loader` on a miss.
+
+        `loader` returns the payload dict or None when the entity does not exist. Returns None for
+        missing entities. Redis errors are logged and fall through to the loader.
+        """
+        if not self.config.CACHE_ENABLED:
+            return self._load(loader)
+
+        try:
+            version, cached = self._read(entity_id)
+            if cached is not None:
+                return self._unpack(cached)
+
+            self._record("misses")
+            lock_key = f"{self._data_key(entity_id, version)}:lock"
+            if not self.client.set(lock_key, 1, nx=True, px=self.config.CACHE_LOCK_TIMEOUT_MS):
+                cached = self._wait_for_fill(entity_id, version)
+                if cached is not None:
+                    return self._unpack(cached)
+                self._record("lock_timeouts")
+                return self._load(loader)
+
+            try:
+                payload = self._load(loader)
+                self._fill(entity_id, version, payload)
+                return payload
+            finally:
+                self.client.delete(lock_key)
+
+        except RedisError as e:
+            self._record("errors")
+            logger.warning("Cache unavailable for {} {}: {}", self.kind, entity_id, e)
+            return self._load(loader)
+
+    def _wait_for_fill(self, entity_id: str, version: int) -> Optional[bytes]:
+        deadline = time.monotonic() + self.config.CACHE_LOCK_WAIT_MS / 1000
+        data_key = self._data_key(entity_id, version)
+        while time.monotonic() < deadline:
+            time.sleep(0.025)
+            cached = self.client.get(data_key)
+            if cached is not None:
+                return cached
+        return None
+
+    @staticmethod
+    def _load(loader: Callable[[], Optional[dict]]) -> Optional[bytes]:
+        data = loader()
+        return dumps(data) if data is not None else None
+
+    def invalidate(self, entity_ids: Iterable[Optional[str]]) -> None:
+        """Bump the version of every given entity so cached copies are no longer read."""
+        ids = [entity_id for entity_id in entity_ids if entity_id]
+        if not ids or not self.config.CACHE_ENABLED:
+            return
+
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for entity_id in ids:
+                pipe.incr(self._version_key(entity_id))
+                pipe.expire(self._version_key(entity_id), self.config.CACHE_TTL_SECONDS * 10)
+            pipe.execute()
+            self._record("invalidations")
+        except RedisError as e:
+            self._record("errors")
+            logger.warning("Failed to invalidate {} cache for {}: {}", self.kind, ids, e)
+
+    def get_stats(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        lookups = stats.get("hits", 0) + stats.get("negative_hits", 0) + stats.get("misses", 0)
+        hits = stats.get("hits", 0) + stats.get("negative_hits", 0)
+        stats["hit_rate"] = hits / lookups if lookups else 0.0
+        return stats
+
+
+project_cache = EntityCache("project")
+session_cache = EntityCache("session")
+
+
+def get_cache_stats() -> dict:
+    return {cache.kind: cache.get_stats() for cache in (project_cache, session_cache)}
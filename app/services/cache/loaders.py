@@ -0,0 +1,31 @@
+from typing import Optional
+
+from loguru import logger
+from sqlmodel import Session, select
+
+from app.database.models import Project
+from app.database.models import Session as SessionModel
+from app.schema.project_schema import ProjectResponse
+from app.schema.session_schema import SessionResponse
+from app.services.archive.archiver import ArchiveError, restore_session
+
+
+def load_project_payload(session: Session, project_id: str) -> Optional[dict]:
+    statement = select(Project).where(Project.id == project_id, Project.is_deleted == False)  # noqa: E712
+    project = session.exec(statement).first()
+    return ProjectResponse.dump_orm(project) if project else None
+
+
+def load_session_payload(session: Session, session_id: str) -> Optional[dict]:
+    statement = select(SessionModel).where(
+        SessionModel.id == session_id,
+        SessionModel.is_deleted == False,  # noqa: E712
+    )
+    session_obj = session.exec(statement).first()
+    if session_obj is None:
+        # Inactive sessions live in cold storage until they are read again
+        try:
+            session_obj = restore_session(session, session_id, reasons=("inactive",))
+        except ArchiveError as e:
+            logger.warning("Could not restore archived session {}: {}", session_id, e)
+    return SessionResponse.dump_orm(session_obj) if session_obj else None
@@ -0,0 +1,164 @@
+import asyncio
+import inspect
+from datetime import datetime
+from typing import AsyncIterator, Optional
+
+from loguru import logger
+from sqlmodel import Session, select
+
+from app.core.settings import settings
+from app.database.engine import engine
+from app.database.models import Session as SessionModel
+from app.services.cache.entity_cache import project_cache, session_cache
+from app.services.llm.context_assembler import assemble_agent_input, estimate_prefix_tokens
+from app.services.llm.dataclasses.project_info import ProjectInfo
+from app.services.llm.dataclasses.stream_events import (
+    ErrorEvent,
+    MessageOutputEvent,
+    RunStartedEvent,
+    RunStoppedEvent,
+    StreamEvent,
+    UsageEvent,
+)
+from app.services.llm.llm_agents import running_agent
+from app.services.llm.run_control import RunControl, unregister_run
+from app.services.snapshots.snapshot_manager import record_turn_snapshot
+from app.utils.serialization import dumps_line
+
+# Strong references to runs that outlive their request (AGENT_RUN_CANCEL_ON_DISCONNECT=false)
+_detached_runs: set[asyncio.Task] = set()
+
+
+def save_session_messages(session_id: str, project_id: str, messages: list) -> None:
+    with Session(engine) as session:
+        session_obj = session.exec(select(SessionModel).where(SessionModel.id == session_id)).first()
+        if session_obj is None:
+            return
+        session_obj.messages = messages
+        # Compaction archives sessions by updated_at, so every turn counts as activity
+        session_obj.updated_at = datetime.now()
+        session.add(session_obj)
+        session.commit()
+
+    session_cache.invalidate([session_id])
+    project_cache.invalidate([project_id])
+
+
+def finish_turn(session_id: str, project: ProjectInfo, messages: list, run_id: Optional[str]) -> None:
+    save_session_messages(session_id, project.id, messages)
+
+    # Snapshots are taken from the local filesystem, so only sandboxes hosted here are recorded
+    if settings.snapshot_settings.SNAPSHOT_ENABLED and project.node_id is None:
+        record_turn_snapshot(project.id, session_id)
+
+    if run_id:
+        unregister_run(run_id)
+
+
+def _abandon_turn(session_id: str, project_id: str, messages: list, run_id: str) -> None:
+    save_session_messages(session_id, project_id, messages + [stopped_reply("", None)])
+    unregister_run(run_id)
+
+
+def stopped_reply(content: str, stop_reason: Optional[str]) -> dict:
+    return {"role": "assistant", "content": f"{content}\n\n[Run stopped: {stop_reason or 'interrupted'}]".lstrip()}
+
+
+async def stream_agent_turn(
+    session_id: str,
+    project: ProjectInfo,
+    messages: list,
+    verbose: bool = False,
+    control: Optional[RunControl] = None,
+) -> AsyncIterator[StreamEvent]:
+    """
+    Run one agent turn over `messages` and store the assistant reply on the session once it finishes.
+
+    A run that is stopped or abandoned part-way still stores what it produced, marked with the
+    reason it stopped, so the transcript matches the files the agent already changed.
+    """
+    agent_input = await asyncio.to_thread(assemble_agent_input, project, messages)
+
+    assistant_content = ""
+    stop_reason = None
+    completed = False
+    try:
+        async for chunk in running_agent(agent_input, project, verbose=verbose, control=control):
+            if isinstance(chunk, MessageOutputEvent):
+                assistant_content = chunk.content
+            elif isinstance(chunk, RunStoppedEvent):
+                stop_reason = chunk.reason
+                assistant_content = chunk.partial_content or assistant_content
+            elif isinstance(chunk, UsageEvent):
+                chunk.prefix_tokens = estimate_prefix_tokens(agent_input)
+                logger.info(
+                    "Run usage for session {}: input={} cached={} ({:.0%}) prefix~{} output={}",
+                    session_id,
+                    chunk.input_tokens,
+                    chunk.cached_tokens,
+                    chunk.cache_hit_ratio,
+                    chunk.prefix_tokens,
+                    chunk.output_tokens,
+                )
+            yield chunk
+        completed = True
+    finally:
+        if stop_reason or not completed:
+            assistant_message = stopped_reply(assistant_content, stop_reason)
+        else:
+            assistant_message = {"role": "assistant", "content": assistant_content}
+        run_id = control.run_id if control else None
+        # Shielded so the transcript is still written when the request task is being cancelled
+        await asyncio.shield(
+            asyncio.to_thread(finish_turn, session_id, project, messages + [assistant_message], run_id)
+        )
+
+
+async def stream_inline_run(
+    session_id: str,
+    project: ProjectInfo,
+    messages: list,
+    control: RunControl,
+    verbose: bool = False,
+) -> AsyncIterator[bytes]:
+    """
+    Run an agent turn in this process and yield its NDJSON chunks.
+
+    With AGENT_RUN_CANCEL_ON_DISCONNECT the run is tied to the response, so a disconnect closes it.
+    Otherwise it runs in a detached task that finishes (within its budgets) even if nobody listens.
+    """
+    turn = stream_agent_turn(session_id, project, messages, verbose=verbose, control=control)
+    task = None
+    try:
+        yield dumps_line(RunStartedEvent(run_id=control.run_id))
+
+        if settings.worker_settings.AGENT_RUN_CANCEL_ON_DISCONNECT:
+            async for chunk in turn:
+                yield dumps_line(chunk)
+            return
+
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def drain() -> None:
+            try:
+                async for chunk in turn:
+                    await queue.put(chunk)
+            except Exception as e:
+                logger.exception("Agent run {} failed", control.run_id)
+                await queue.put(ErrorEvent(message=str(e)))
+            finally:
+                await queue.put(None)
+
+        task = asyncio.create_task(drain())
+        _detached_runs.add(task)
+        task.add_done_callback(_detached_runs.discard)
+
+        while (chunk := await queue.get()) is not None:
+            yield dumps_line(chunk)
+    finally:
+        if task is None and inspect.getasyncgenstate(turn) == inspect.AGEN_CREATED:
+            # Closed before the turn ever started, so its own cleanup never runs: store the user
+            # message and release the run here instead
+            await asyncio.shield(asyncio.to_thread(_abandon_turn, session_id, project.id, messages, control.run_id))
+        if task is None:
+            await turn.aclose()
@@ -0,0 +1,214 @@
+import asyncio
+import os
+from dataclasses import replace
+from typing import AsyncIterator, Optional
+
+from loguru import logger
+
+from app.core.settings import settings
+from app.services.llm.agent_runs import finish_turn, stopped_reply
+from app.services.llm.context_assembler import assemble_agent_input
+from app.services.llm.dataclasses.project_info import ProjectInfo
+from app.services.llm.dataclasses.stream_events import (
+    BuildPlanEvent,
+    MessageOutputEvent,
+    RunStartedEvent,
+    RunStoppedEvent,
+    StreamEvent,
+    SubAgentEvent,
+    WorkItemEvent,
+)
+from app.services.llm.generations.plan_work_items import WorkItem, plan_work_items
+from app.services.llm.llm_agents import running_agent
+from app.services.llm.run_control import RunControl, register_run
+from app.services.sandbox.sandbox_gateway import render_project_manifest
+
+INTEGRATION_ITEM = "integration"
+
+WORK_ITEM_PROMPT = """You are one of several engineers building this project at the same time.
+
+Project execution plan:
+{plan}
+
+Your work item: {title}
+{instructions}
+
+You own these files and may only write to them: {files}
+Other engineers own the remaining files; read them if you need to, but do not try to change them."""
+
+INTEGRATION_PROMPT = """Several engineers have just built this project in parallel from this execution plan:
+{plan}
+
+Their reports:
+{reports}
+
+Review the project as a whole: make sure every file references the others consistently (element ids, class names,
+function names, file paths), fix anything that does not fit together and finish whatever is still missing."""
+
+
+def assign_file_ownership(items: list[WorkItem]) -> dict[str, list[str]]:
+    """Map each work item to the files it may write; a file claimed twice stays with the first item."""
+    owners: dict[str, str] = {}
+    for item in items:
+        for path in item.files:
+            path = os.path.normpath(path)
+            if path in owners:
+                logger.warning("File {} claimed by {} is already owned by {}", path, item.id, owners[path])
+                continue
+            owners[path] = item.id
+
+    ownership: dict[str, list[str]] = {item.id: [] for item in items}
+    for path, item_id in owners.items():
+        ownership[item_id].append(path)
+    return ownership
+
+
+async def _run_work_item(
+    item: WorkItem,
+    project: ProjectInfo,
+    plan: str,
+    files: list[str],
+    queue: asyncio.Queue,
+    semaphore: asyncio.Semaphore,
+    reports: dict[str, str],
+    control: RunControl,
+) -> None:
+    async with semaphore:
+        # The build may have been stopped while this item waited for a slot
+        if control.stop_reason:
+            await queue.put(WorkItemEvent(work_item=item.id, status="stopped", detail=control.stop_reason))
+            return
+
+        await queue.put(WorkItemEvent(work_item=item.id, status="started"))
+        sub_project = replace(project, writable_files=files)
+        prompt = WORK_ITEM_PROMPT.format(plan=plan, title=item.title, instructions=item.instructions, files=files)
+        agent_input = await asyncio.to_thread(assemble_agent_input, project, [{"role": "user", "content": prompt}])
+
+        item_control = control.spawn()
+        try:
+            async for event in running_agent(agent_input, sub_project, use_mcp_servers=False, control=item_control):
+                if isinstance(event, MessageOutputEvent):
+                    reports[item.id] = event.content
+                elif isinstance(event, RunStoppedEvent):
+                    reports[item.id] = event.partial_content or reports.get(item.id, "")
+                await queue.put(SubAgentEvent(work_item=item.id, event=event))
+        except Exception as e:
+            logger.error("Work item {} of project {} failed: {}", item.id, project.id, e)
+            reports[item.id] = f"Failed: {e}"
+            await queue.put(WorkItemEvent(work_item=item.id, status="failed", detail=str(e)))
+            return
+
+        if item_control.stop_reason:
+            await queue.put(WorkItemEvent(work_item=item.id, status="stopped", detail=item_control.stop_reason))
+            return
+        await queue.put(WorkItemEvent(work_item=item.id, status="completed"))
+
+
+async def _run_work_items(
+    items: list[WorkItem],
+    ownership: dict[str, list[str]],
+    project: ProjectInfo,
+    plan: str,
+    max_concurrency: int,
+    reports: dict[str, str],
+    control: RunControl,
+) -> AsyncIterator[StreamEvent]:
+    """Run every work item under a concurrency cap and yield their events as they arrive."""
+    queue: asyncio.Queue = asyncio.Queue()
+    semaphore = asyncio.Semaphore(max_concurrency)
+    tasks = [
+        asyncio.create_task(_run_work_item(item, project, plan, ownership[item.id], queue, semaphore, reports, control))
+        for item in items
+    ]
+
+    async def close_queue() -> None:
+        await asyncio.gather(*tasks)
+        await queue.put(None)
+
+    closer = asyncio.create_task(close_queue())
+    try:
+        while (event := await queue.get()) is not None:
+            yield event
+    finally:
+        # The consumer may go away (client disconnect); do not leave sub-agents running
+        for task in [*tasks, closer]:
+            task.cancel()
+
+
+def _integration_message(items: list[WorkItem], execution_plan: str, reports: dict[str, str]) -> dict:
+    report_text = "\n\n".join(f"[{item.title}]\n{reports.get(item.id, 'No report')}" for item in items)
+    return {"role": "user", "content": INTEGRATION_PROMPT.format(plan=execution_plan, reports=report_text)}
+
+
+async def stream_parallel_build(
+    session_id: str,
+    project: ProjectInfo,
+    history: list,
+    execution_plan: str,
+    control: RunControl,
+    max_concurrency: Optional[int] = None,
+) -> AsyncIterator[StreamEvent]:
+    """
+    Build a project from its execution plan with several sub-agents working at once.
+
+    The plan is split into work items that own disjoint sets of files, the items run concurrently
+    (at most `max_concurrency` at a time) and a final integration pass with full write access ties
+    the results together. The build is one run: every agent gets a control spawned from `control`,
+    so a cancel request, the wall-clock deadline and the token budget stop all of them. The
+    integration reply is stored on the session like a regular turn, marked with the stop reason
+    when the build is stopped or abandoned part-way.
+    """
+    max_concurrency = max_concurrency or settings.llm_settings.BUILD_MAX_CONCURRENCY
+    await register_run(control.run_id, session_id)
+
+    items: list[WorkItem] = []
+    reports: dict[str, str] = {}
+    assistant_content = ""
+    completed = False
+    try:
+        yield RunStartedEvent(run_id=control.run_id)
+
+        manifest = await asyncio.to_thread(
+            render_project_manifest, project.node_id, project.id, settings.llm_settings.CONTEXT_MANIFEST_MAX_ENTRIES
+        )
+        work_plan = await asyncio.to_thread(
+            plan_work_items, execution_plan, manifest, settings.llm_settings.BUILD_MAX_WORK_ITEMS, {INTEGRATION_ITEM}
+        )
+        items = work_plan.items[: settings.llm_settings.BUILD_MAX_WORK_ITEMS]
+        ownership = assign_file_ownership(items)
+        yield BuildPlanEvent(
+            items=[{"id": item.id, "title": item.title, "files": ownership[item.id]} for item in items]
+        )
+
+        async for event in _run_work_items(
+            items, ownership, project, execution_plan, max_concurrency, reports, control
+        ):
+            yield event
+
+        logger.info("Parallel build of project {} finished {} work items", project.id, len(items))
+        if control.stop_reason:
+            return
+
+        messages = history + [_integration_message(items, execution_plan, reports)]
+        agent_input = await asyncio.to_thread(assemble_agent_input, project, messages)
+
+        yield WorkItemEvent(work_item=INTEGRATION_ITEM, status="started")
+        async for event in running_agent(agent_input, project, control=control.spawn()):
+            if isinstance(event, MessageOutputEvent):
+                assistant_content = event.content
+            elif isinstance(event, RunStoppedEvent):
+                assistant_content = event.partial_content or assistant_content
+            yield SubAgentEvent(work_item=INTEGRATION_ITEM, event=event)
+        if control.stop_reason:
+            yield WorkItemEvent(work_item=INTEGRATION_ITEM, status="stopped", detail=control.stop_reason)
+            return
+        yield WorkItemEvent(work_item=INTEGRATION_ITEM, status="completed")
+        completed = True
+    finally:
+        if completed:
+            assistant_message = {"role": "assistant", "content": assistant_content}
+        else:
+            assistant_message = stopped_reply(assistant_content, control.stop_reason)
+        messages = history + [_integration_message(items, execution_plan, reports), assistant_message]
+        # Shielded so the transcript is still written when the request task is being cancelled
+        await asyncio.shield(asyncio.to_thread(finish_turn, session_id, project, messages, control.run_id))
@@ -0,0 +1,32 @@
+from app.core.settings import settings
+from app.services.llm.dataclasses.project_info import ProjectInfo
+from app.services.llm.prompts.builder_prompts import AGENT_PROMPT
+from app.services.sandbox.sandbox_gateway import render_project_manifest
+
+MANIFEST_HEADER = (
+    "Current project files as path, size in bytes and content hash prefix. "
+    "Use this listing instead of exploring the project with tool calls."
+)
+
+
+def assemble_agent_input(project: ProjectInfo, messages: list) -> list:
+    """
+    Build the model input so that everything before the newest message is byte-stable across turns.
+
+    The system prompt and tool schema never change and the history is append-only, so provider-side
+    prompt caching can reuse that prefix. The project manifest changes with every write, so it is
+    attached to the newest user message only and never stored in the session history.
+    """
+    if not settings.llm_settings.CONTEXT_MANIFEST_ENABLED or not messages:
+        return messages
+
+    *history, latest = messages
+    manifest = render_project_manifest(project.node_id, project.id, settings.llm_settings.CONTEXT_MANIFEST_MAX_ENTRIES)
+    content = f"<project_files>\n{MANIFEST_HEADER}\n{manifest}\n</project_files>\n\n{latest['content']}"
+    return history + [{**latest, "content": content}]
+
+
+def estimate_prefix_tokens(messages: list) -> int:
+    """Rough token count (4 characters per token) of the cacheable prefix: system prompt plus history."""
+    history_chars = sum(len(str(message.get("content", ""))) for message in messages[:-1])
+    return (len(AGENT_PROMPT) + history_chars) // 4
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import Optional
 
 
 @dataclass
@@ -6,3 +7,5 @@ class ProjectInfo:
     id: str
     name: str
     port: int
+    node_id: Optional[str] = None
+    writable_files: Optional[list[str]] = None
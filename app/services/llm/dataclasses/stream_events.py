@@ -0,0 +1,96 @@
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+
+@dataclass(slots=True)
+class RunStartedEvent:
+    run_id: str
+    type: str = field(default="run_started", init=False)
+
+
+@dataclass(slots=True)
+class RunStoppedEvent:
+    reason: str
+    partial_content: str = ""
+    type: str = field(default="run_stopped", init=False)
+
+
+@dataclass(slots=True)
+class AgentUpdatedEvent:
+    agent_name: str
+    type: str = field(default="agent_updated", init=False)
+
+
+@dataclass(slots=True)
+class ToolCallEvent:
+    tool_name: Optional[str]
+    call_id: Optional[str]
+    arguments: Optional[str]
+    raw_item: Optional[Any] = None
+    type: str = field(default="tool_call", init=False)
+
+
+@dataclass(slots=True)
+class ToolOutputEvent:
+    call_id: Optional[str]
+    output: Any
+    raw_item: Optional[Any] = None
+    type: str = field(default="tool_output", init=False)
+
+
+@dataclass(slots=True)
+class MessageOutputEvent:
+    content: str
+    type: str = field(default="message_output", init=False)
+
+
+@dataclass(slots=True)
+class UsageEvent:
+    input_tokens: int
+    output_tokens: int
+    cached_tokens: int
+    cache_hit_ratio: float
+    prefix_tokens: Optional[int] = None
+    type: str = field(default="usage", init=False)
+
+
+@dataclass(slots=True)
+class BuildPlanEvent:
+    items: list[dict]
+    type: str = field(default="build_plan", init=False)
+
+
+@dataclass(slots=True)
+class WorkItemEvent:
+    work_item: str
+    status: str
+    detail: Optional[str] = None
+    type: str = field(default="work_item", init=False)
+
+
+@dataclass(slots=True)
+class SubAgentEvent:
+    work_item: str
+    event: Any
+    type: str = field(default="sub_agent", init=False)
+
+
+@dataclass(slots=True)
+class ErrorEvent:
+    message: str
+    type: str = field(default="error", init=False)
+
+
+StreamEvent = (
+    RunStartedEvent
+    | RunStoppedEvent
+    | AgentUpdatedEvent
+    | ToolCallEvent
+    | ToolOutputEvent
+    | MessageOutputEvent
+    | UsageEvent
+    | BuildPlanEvent
+    | WorkItemEvent
+    | SubAgentEvent
+    | ErrorEvent
+)
@@ -0,0 +1,79 @@
+from typing import Iterable, List
+
+from loguru import logger
+from pydantic import BaseModel
+
+from app.services.llm.llm_config import openai_client
+
+
+class WorkItem(BaseModel):
+    id: str
+    title: str
+    instructions: str
+    files: List[str]
+
+
+class WorkItemPlan(BaseModel):
+    items: List[WorkItem]
+
+
+SYSTEM_PROMPT = """
+    You are a Tech Lead splitting a web app build into work items that separate engineers can do at the same time.
+
+    You receive the project's execution plan and the list of files that already exist.
+    Return independent work items, each with:
+    1. A short unique id (kebab-case).
+    2. A title.
+    3. Self-contained instructions: what to build, how it connects to the rest of the app (element ids, function names,
+       file names it must reference), so the engineer never needs to ask the others.
+    4. The exact list of files the item creates or modifies, relative to the project root.
+
+    Rules:
+    - Every file belongs to exactly one work item. Never list the same file in two items.
+    - Prefer splitting by file or component (e.g. markup in index.html, styles in styles.css, behaviour in app.js).
+    - Agree on shared names (ids, classes, functions) inside the instructions of every item that uses them.
+    - Do not include server.js or package.json unless the plan requires changing them.
+    - Return at most {max_items} items.
+    """
+
+
+def _unique_ids(items: List[WorkItem], reserved_ids: Iterable[str]) -> List[WorkItem]:
+    """
+    Give every work item an id of its own; ids come from the model and may repeat.
+
+    Ownership and reports are keyed by id, so two items sharing one would run at the same time
+    with the same writable files.
+    """
+    seen = set(reserved_ids)
+    unique = []
+    for item in items:
+        base_id = item.id.strip() or "item"
+        item_id, suffix = base_id, 2
+        while item_id in seen:
+            item_id, suffix = f"{base_id}-{suffix}", suffix + 1
+        if item_id != item.id:
+            logger.warning("Work item id {!r} is not unique, renamed to {!r}", item.id, item_id)
+        seen.add(item_id)
+        unique.append(item.model_copy(update={"id": item_id}))
+    return unique
+
+
+def plan_work_items(
+    execution_plan: str, manifest: str, max_items: int, reserved_ids: Iterable[str] = ()
+) -> WorkItemPlan:
+    response = openai_client.responses.parse(
+        model="openai/gpt-4o",
+        input=[
+            {
+                "role": "system",
+                "content": SYSTEM_PROMPT.replace("{max_items}", str(max_items)),
+            },
+            {
+                "role": "user",
+                "content": f"Execution plan:\n{execution_plan}\n\nExisting files:\n{manifest}",
+            },
+        ],
+        text_format=WorkItemPlan,
+    )
+    result = response.output_parsed
+    return WorkItemPlan(items=_unique_ids(result.items, reserved_ids))
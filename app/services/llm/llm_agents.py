@@ -1,45 +1,122 @@
+import asyncio
+from contextlib import nullcontext
+from typing import Any, AsyncIterator, Optional
+
 from agents import Agent, Runner
 from agents.items import ItemHelpers
 
 from app.services.llm.dataclasses.project_info import ProjectInfo
+from app.services.llm.dataclasses.stream_events import (
+    AgentUpdatedEvent,
+    MessageOutputEvent,
+    RunStoppedEvent,
+    StreamEvent,
+    ToolCallEvent,
+    ToolOutputEvent,
+    UsageEvent,
+)
 from app.services.llm.llm_config import runner_config
 from app.services.llm.mcps.mcps import get_mcp_servers_context
 from app.services.llm.prompts.builder_prompts import AGENT_PROMPT
-from app.services.llm.tools.file_system import read_file, write_file
+from app.services.llm.run_control import RunControl
+from app.services.llm.tools.file_system import read_file, read_files, search_code, write_file, write_files
+
+
+def _dump_raw_item(raw_item: Any) -> Any:
+    if hasattr(raw_item, "model_dump"):
+        return raw_item.model_dump()
+    if isinstance(raw_item, dict):
+        return raw_item
+    if hasattr(raw_item, "__dict__"):
+        return vars(raw_item)
+    return str(raw_item)
+
+
+def _get_field(raw_item: Any, name: str) -> Any:
+    if isinstance(raw_item, dict):
+        return raw_item.get(name)
+    return getattr(raw_item, name, None)
+
 
+def _usage_event(usage: Any) -> UsageEvent:
+    input_details = getattr(usage, "input_tokens_details", None)
+    cached_tokens = getattr(input_details, "cached_tokens", 0) or 0
+    input_tokens = usage.input_tokens or 0
+    return UsageEvent(
+        input_tokens=input_tokens,
+        output_tokens=usage.output_tokens or 0,
+        cached_tokens=cached_tokens,
+        cache_hit_ratio=round(cached_tokens / input_tokens, 4) if input_tokens else 0.0,
+    )
 
-async def running_agent(messages: list, project: ProjectInfo):
-    async with get_mcp_servers_context() as (active_servers, _):
-        agent = Agent[ProjectInfo](name="Assistant Agent", instructions=AGENT_PROMPT, tools=[read_file, write_file])
+
+async def running_agent(
+    messages: list,
+    project: ProjectInfo,
+    verbose: bool = False,
+    use_mcp_servers: bool = True,
+    control: Optional[RunControl] = None,
+) -> AsyncIterator[StreamEvent]:
+    """
+    Run the builder agent and yield compact stream events.
+
+    Raw SDK items are only dumped into the events when `verbose` is set. Sub-agents of a parallel
+    build pass `use_mcp_servers=False` so each of them does not spawn its own MCP processes.
+
+    When `control` stops the run (cancel request, wall-clock or token budget) the upstream stream
+    is cancelled and a `RunStoppedEvent` carries the text generated so far. Closing this generator
+    early, e.g. on client disconnect, cancels the upstream stream as well.
+    """
+    mcp_context = get_mcp_servers_context() if use_mcp_servers else nullcontext(([], None))
+    async with mcp_context as (active_servers, _):
+        agent = Agent[ProjectInfo](
+            name="Assistant Agent",
+            instructions=AGENT_PROMPT,
+            tools=[read_file, read_files, write_file, write_files, search_code],
+        )
 
         runner = Runner.run_streamed(agent, input=messages, run_config=runner_config, context=project)
+        watcher = asyncio.create_task(control.watch(runner.cancel)) if control else None
+        partial_text: list[str] = []
+
+        try:
+            async for event in runner.stream_events():
+                if event.type == "raw_response_event":
+                    if getattr(event.data, "type", None) == "response.output_text.delta":
+                        partial_text.append(event.data.delta)
+                    continue
+                elif event.type == "agent_updated_stream_event":
+                    yield AgentUpdatedEvent(agent_name=event.new_agent.name)
+                elif event.type == "run_item_stream_event":
+                    raw_item = event.item.raw_item
+                    if event.item.type == "tool_call_item":
+                        yield ToolCallEvent(
+                            tool_name=_get_field(raw_item, "name"),
+                            call_id=_get_field(raw_item, "call_id"),
+                            arguments=_get_field(raw_item, "arguments"),
+                            raw_item=_dump_raw_item(raw_item) if verbose else None,
+                        )
+                    elif event.item.type == "tool_call_output_item":
+                        yield ToolOutputEvent(
+                            call_id=_get_field(raw_item, "call_id"),
+                            output=event.item.output,
+                            raw_item=_dump_raw_item(raw_item) if verbose else None,
+                        )
+                    elif event.item.type == "message_output_item":
+                        partial_text.clear()
+                        yield MessageOutputEvent(content=ItemHelpers.text_message_output(event.item))
+                    else:
+                        pass
+
+                if control and control.check_tokens(runner.context_wrapper.usage.total_tokens or 0):
+                    runner.cancel()
+        finally:
+            if watcher:
+                watcher.cancel()
+            if not runner.is_complete:
+                runner.cancel()
+
+        if control and control.stop_reason:
+            yield RunStoppedEvent(reason=control.stop_reason, partial_content="".join(partial_text))
 
-        async for event in runner.stream_events():
-            if event.type == "raw_response_event":
-                continue
-            elif event.type == "agent_updated_stream_event":
-                yield {"type": "agent_updated", "agent_name": event.new_agent.name}
-                continue
-            elif event.type == "run_item_stream_event":
-                if event.item.type == "tool_call_item":
-                    raw_item_dict = (
-                        event.item.raw_item.model_dump()
-                        if hasattr(event.item.raw_item, "model_dump")
-                        else vars(event.item.raw_item)
-                        if hasattr(event.item.raw_item, "__dict__")
-                        else str(event.item.raw_item)
-                    )
-                    yield {"type": "tool_call", "message": "Tool was called", "raw_item": raw_item_dict}
-                elif event.item.type == "tool_call_output_item":
-                    raw_item_dict = (
-                        event.item.raw_item.model_dump()
-                        if hasattr(event.item.raw_item, "model_dump")
-                        else vars(event.item.raw_item)
-                        if hasattr(event.item.raw_item, "__dict__")
-                        else str(event.item.raw_item)
-                    )
-                    yield {"type": "tool_output", "output": event.item.output, "raw_item": raw_item_dict}
-                elif event.item.type == "message_output_item":
-                    yield {"type": "message_output", "content": ItemHelpers.text_message_output(event.item)}
-                else:
-                    pass
+        yield _usage_event(runner.context_wrapper.usage)
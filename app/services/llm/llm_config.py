@@ -1,4 +1,4 @@
-from agents import OpenAIChatCompletionsModel, RunConfig
+from agents import ModelSettings, OpenAIChatCompletionsModel, RunConfig
 from openai import AsyncOpenAI, OpenAI
 
 from app.core.settings import settings
@@ -14,4 +14,8 @@ asyncopenai_client = AsyncOpenAI(
 )
 
 model = OpenAIChatCompletionsModel(openai_client=asyncopenai_client, model="sonar")
-runner_config = RunConfig(model=model, tracing_disabled=True)
+runner_config = RunConfig(
+    model=model,
+    model_settings=ModelSettings(parallel_tool_calls=settings.llm_settings.PARALLEL_TOOL_CALLS, include_usage=True),
+    tracing_disabled=True,
+)
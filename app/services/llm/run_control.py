@@ -0,0 +1,107 @@
+import asyncio
+import time
+from typing import Callable, Optional
+
+from loguru import logger
+from redis import RedisError
+
+from app.core.settings import settings
+from app.database.redis_client import async_redis_client, redis_client
+
+worker_settings = settings.worker_settings
+
+
+def _owner_key(run_id: str) -> str:
+    return f"agent:run:{run_id}:session"
+
+
+def _cancel_key(run_id: str) -> str:
+    return f"agent:run:{run_id}:cancel"
+
+
+def resolve_budget(requested: Optional[int], limit: int) -> int:
+    """Apply the server-wide limit to a per-run budget; 0 means unlimited."""
+    if not requested:
+        return limit
+    return min(requested, limit) if limit else requested
+
+
+class RunControl:
+    """
+    Stop conditions of one agent run: explicit cancellation, a wall-clock deadline and a token budget.
+
+    Cancellation requests are stored in Redis so they reach the run wherever it executes (API
+    process or Celery worker). `stop_reason` stays None while the run may continue. A run made of
+    several agents (a parallel build) gives each agent its own control from `spawn`.
+    """
+
+    def __init__(self, run_id: str, max_seconds: int = 0, max_tokens: int = 0) -> None:
+        self.run_id = run_id
+        self.deadline = time.monotonic() + max_seconds if max_seconds else None
+        self.max_tokens = max_tokens
+        self.stop_reason: Optional[str] = None
+        self._parent: Optional[RunControl] = None
+        # Tokens used so far by each agent of the run, shared with spawned controls
+        self._tokens: dict[int, int] = {}
+
+    def spawn(self) -> "RunControl":
+        """Control for one more agent of this run, sharing its run id, deadline and token budget."""
+        child = RunControl(self.run_id, max_tokens=self.max_tokens)
+        child.deadline = self.deadline
+        child._parent = self
+        child._tokens = self._tokens
+        return child
+
+    def stop(self, reason: str) -> None:
+        if self.stop_reason is not None:
+            return
+        self.stop_reason = reason
+        if self._parent is not None:
+            self._parent.stop(reason)
+        else:
+            logger.info("Stopping agent run {}: {}", self.run_id, reason)
+
+    def check_tokens(self, total_tokens: int) -> bool:
+        """Record a stop when the run's agents together exceed the budget; returns True if this agent must stop."""
+        self._tokens[id(self)] = total_tokens
+        if self.max_tokens and sum(self._tokens.values()) > self.max_tokens:
+            self.stop("token_budget")
+        return self.stop_reason is not None
+
+    async def watch(self, on_stop: Callable[[], None]) -> None:
+        """Poll the deadline and the cancel flag until one fires, then call `on_stop`."""
+        while self.stop_reason is None:
+            await asyncio.sleep(worker_settings.AGENT_RUN_CANCEL_POLL_SECONDS)
+            if self.deadline is not None and time.monotonic() > self.deadline:
+                self.stop("wall_clock_budget")
+            elif await is_cancel_requested(self.run_id):
+                self.stop("cancelled")
+        on_stop()
+
+
+async def register_run(run_id: str, session_id: str) -> None:
+    await async_redis_client.set(_owner_key(run_id), session_id, ex=worker_settings.AGENT_STREAM_TTL_SECONDS)
+
+
+def unregister_run(run_id: str) -> None:
+    try:
+        redis_client.delete(_owner_key(run_id), _cancel_key(run_id))
+    except RedisError as e:
+        logger.warning("Failed to unregister agent run {}: {}", run_id, e)
+
+
+async def request_cancel(run_id: str, session_id: Optional[str] = None) -> bool:
+    """Flag a run for cancellation; returns False when it is unknown, finished or owned by another session."""
+    owner = await async_redis_client.get(_owner_key(run_id))
+    if owner is None or (session_id is not None and owner.decode() != session_id):
+        return False
+    await async_redis_client.set(_cancel_key(run_id), 1, ex=worker_settings.AGENT_STREAM_TTL_SECONDS)
+    return True
+
+
+async def is_cancel_requested(run_id: str) -> bool:
+    try:
+        return bool(await async_redis_client.exists(_cancel_key(run_id)))
+    except RedisError as e:
+        logger.warning("Could not check cancellation of agent run {}: {}", run_id, e)
+        return False
@@ -1,20 +1,146 @@
+import asyncio
+import os
+import re
+from typing import Optional
+
 from agents import function_tool
 from agents.run_context import RunContextWrapper
+from pydantic import BaseModel
 
+from app.core.settings import settings
 from app.services.llm.dataclasses.project_info import ProjectInfo
+from app.services.sandbox.sandbox_gateway import read_project_file, search_project, write_project_file
+from app.services.search.code_index import SearchMode
+
+
+class FileContent(BaseModel):
+    filename: str
+    content: str
+
+
+def truncate_output(text: str, limit: int) -> str:
+    """Cap a tool result at `limit` characters, keeping the head and tail and stating what was dropped."""
+    if len(text) <= limit:
+        return text
+
+    head = limit * 3 // 4
+    tail = limit - head
+    omitted = len(text) - limit
+    return f"{text[:head]}\n... [truncated {omitted} of {len(text)} characters] ...\n{text[-tail:]}"
+
+
+async def _gather_bounded(calls: list) -> list:
+    semaphore = asyncio.Semaphore(settings.llm_settings.TOOL_MAX_PARALLEL_IO)
+
+    async def run(call):
+        async with semaphore:
+            try:
+                return await asyncio.to_thread(call)
+            except Exception as e:
+                return e
+
+    return await asyncio.gather(*(run(call) for call in calls))
+
+
+def ownership_error(project: ProjectInfo, filename: str) -> Optional[str]:
+    """Sub-agents of a parallel build may only write the files their work item owns."""
+    if project.writable_files is None or os.path.normpath(filename) in project.writable_files:
+        return None
+    return f"File {filename} is owned by another work item and cannot be written; only {project.writable_files} can"
 
 
 @function_tool
-def read_file(wrapper: RunContextWrapper[ProjectInfo], filename: str) -> str:
-    with open(f"sandbox/projects/{wrapper.context.id}/{filename}", "r") as f:
-        content = f.read()
+async def read_file(wrapper: RunContextWrapper[ProjectInfo], filename: str) -> str:
+    content = await asyncio.to_thread(read_project_file, wrapper.context.node_id, wrapper.context.id, filename)
+    content = truncate_output(content, settings.llm_settings.TOOL_RESULT_MAX_CHARS)
 
     return f"File {filename} has been read, content: {content}"
 
 
 @function_tool
-def write_file(wrapper: RunContextWrapper[ProjectInfo], filename: str, content: str) -> str:
-    with open(f"sandbox/projects/{wrapper.context.id}/{filename}", "w") as f:
-        f.write(content)
+async def write_file(wrapper: RunContextWrapper[ProjectInfo], filename: str, content: str) -> str:
+    if error := ownership_error(wrapper.context, filename):
+        return error
+
+    await asyncio.to_thread(write_project_file, wrapper.context.node_id, wrapper.context.id, filename, content)
 
     return f"File {filename} has been written"
+
+
+@function_tool
+async def read_files(wrapper: RunContextWrapper[ProjectInfo], filenames: list[str]) -> str:
+    """Read several files at once.
+
+    Args:
+        filenames: Paths of the files to read, relative to the project root.
+    """
+    project = wrapper.context
+    results = await _gather_bounded(
+        [lambda filename=filename: read_project_file(project.node_id, project.id, filename) for filename in filenames]
+    )
+
+    sections = []
+    for filename, result in zip(filenames, results):
+        if isinstance(result, Exception):
+            sections.append(f"File {filename} could not be read: {result}")
+        else:
+            content = truncate_output(result, settings.llm_settings.TOOL_RESULT_MAX_CHARS)
+            sections.append(f"File {filename} has been read, content: {content}")
+
+    return truncate_output("\n\n".join(sections), settings.llm_settings.TOOL_BATCH_RESULT_MAX_CHARS)
+
+
+@function_tool
+async def write_files(wrapper: RunContextWrapper[ProjectInfo], files: list[FileContent]) -> str:
+    """Create or update several files at once.
+
+    Args:
+        files: Files to write, each with its path relative to the project root and its full content.
+    """
+    project = wrapper.context
+    rejected = {file.filename: error for file in files if (error := ownership_error(project, file.filename))}
+    if rejected:
+        return "\n".join(rejected.values())
+
+    results = await _gather_bounded(
+        [
+            lambda file=file: write_project_file(project.node_id, project.id, file.filename, file.content)
+            for file in files
+        ]
+    )
+
+    lines = [
+        f"File {file.filename} could not be written: {result}"
+        if isinstance(result, Exception)
+        else f"File {file.filename} has been written"
+        for file, result in zip(files, results)
+    ]
+    return "\n".join(lines)
+
+
+@function_tool
+async def search_code(
+    wrapper: RunContextWrapper[ProjectInfo], query: str, mode: SearchMode = "auto", limit: int = 20
+) -> str:
+    """Search the project's files through its index instead of reading them one by one.
+
+    Args:
+        query: Text to find. Literal text for grep, a regular expression for regex, or keywords for bm25.
+        mode: "grep" for case-insensitive literal matches, "regex" for regular expressions, "bm25" to rank files
+            by relevance to keywords, or "auto" to try grep and fall back to bm25.
+        limit: Maximum number of files to return.
+    """
+    project = wrapper.context
+    try:
+        used_mode, hits = await asyncio.to_thread(search_project, project.node_id, project.id, query, mode, limit)
+    except re.error as e:
+        return f"Invalid regular expression {query!r}: {e}"
+
+    if not hits:
+        return f"No results for {query!r}"
+
+    lines = [f"{len(hits)} files matched {query!r} ({used_mode}):"]
+    for hit in hits:
+        lines.append(f"{hit.path} (score {hit.score})")
+        lines.extend(f"  {match.line}: {match.text}" for match in hit.matches)
+    return truncate_output("\n".join(lines), settings.llm_settings.TOOL_BATCH_RESULT_MAX_CHARS)
@@ -0,0 +1,64 @@
+import hmac
+import random
+
+from app.core.settings import settings
+from app.services.profiling.profile_context import current_profile_id
+from app.services.profiling.profiler import save_profile, start_profiler
+from app.utils.generate_ids import generate_id
+
+profiling_settings = settings.profiling_settings
+
+
+class ProfilingMiddleware:
+    """
+    Profile whole requests on demand: when the profiling header is set or the request is sampled.
+
+    This is a plain ASGI middleware rather than a BaseHTTPMiddleware so the profile covers the
+    complete response, including every chunk of a streaming body, and so streaming is left untouched.
+    It is only installed when PROFILING_ENABLED is set; unprofiled requests pay one header lookup.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+        self.header = profiling_settings.PROFILING_HEADER.lower().encode()
+
+    def _should_profile(self, scope) -> bool:
+        headers = dict(scope["headers"])
+        if headers.get(self.header, b"").lower() in (b"1", b"true", b"yes"):
+            # The header alone would let anyone make the API burn CPU on profiling; without a token
+            # configured it is only honoured in DEBUG
+            token = profiling_settings.PROFILING_ADMIN_TOKEN
+            if not token:
+                return settings.app_settings.DEBUG
+            return hmac.compare_digest(headers.get(b"x-admin-token", b""), token.encode())
+        sample_rate = profiling_settings.PROFILING_SAMPLE_RATE
+        return sample_rate > 0 and random.random() < sample_rate
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = generate_id()
+        response_status = 0
+
+        async def send_with_profile_id(message) -> None:
+            nonlocal response_status
+            if message["type"] == "http.response.start":
+                response_status = message["status"]
+                message["headers"] = [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        token = current_profile_id.set(profile_id)
+        profiler = start_profiler()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profiler.stop()
+            current_profile_id.reset(token)
+            meta = {
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": response_status,
+            }
+            await save_profile(profiler, profile_id, meta)
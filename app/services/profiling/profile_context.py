@@ -0,0 +1,6 @@
+from contextvars import ContextVar
+from typing import Optional
+
+# Id of the profile recording the current request, so work handed to other processes can be profiled with it.
+# Kept apart from the profiler so reading it never imports pyinstrument.
+current_profile_id: ContextVar[Optional[str]] = ContextVar("current_profile_id", default=None)
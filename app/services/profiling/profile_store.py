@@ -0,0 +1,86 @@
+import os
+import tempfile
+import threading
+from typing import Optional
+
+import orjson
+
+from app.core.settings import settings
+
+
+class ProfileStore:
+    """
+    Bounded on-disk store of rendered profiles.
+
+    Each profile is an HTML report plus a small JSON metadata file. After every save the oldest
+    profiles are removed until both the count and the total size are within their limits.
+    """
+
+    def __init__(self, root: str, max_profiles: int, max_bytes: int) -> None:
+        self.root = root
+        self.max_profiles = max_profiles
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _path(self, profile_id: str, extension: str) -> str:
+        return os.path.join(self.root, f"{profile_id}.{extension}")
+
+    def _write(self, path: str, data: bytes) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.root)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def save(self, profile_id: str, meta: dict, html: str) -> None:
+        html_data = html.encode()
+        meta = {**meta, "id": profile_id, "size_bytes": len(html_data)}
+        with self._lock:
+            os.makedirs(self.root, exist_ok=True)
+            self._write(self._path(profile_id, "html"), html_data)
+            # Metadata last: a profile is only listed once its report is complete
+            self._write(self._path(profile_id, "json"), orjson.dumps(meta))
+            self._prune()
+
+    def _prune(self) -> None:
+        profiles = self._load_all()
+        total = sum(profile["size_bytes"] for profile in profiles)
+        while profiles and (len(profiles) > self.max_profiles or total > self.max_bytes):
+            oldest = profiles.pop()
+            total -= oldest["size_bytes"]
+            for extension in ("json", "html"):
+                try:
+                    os.remove(self._path(oldest["id"], extension))
+                except FileNotFoundError:
+                    pass
+
+    def _load_all(self) -> list[dict]:
+        if not os.path.isdir(self.root):
+            return []
+        profiles = []
+        for filename in os.listdir(self.root):
+            if not filename.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.root, filename), "rb") as f:
+                    profiles.append(orjson.loads(f.read()))
+            except (OSError, orjson.JSONDecodeError):
+                continue
+        return sorted(profiles, key=lambda profile: profile["created_at"], reverse=True)
+
+    def list(self) -> list[dict]:
+        """Metadata of every stored profile, newest first."""
+        with self._lock:
+            return self._load_all()
+
+    def html_path(self, profile_id: str) -> Optional[str]:
+        if not profile_id.replace("-", "").isalnum():
+            return None
+        path = self._path(profile_id, "html")
+        return path if os.path.exists(path) else None
+
+
+profile_store = ProfileStore(
+    settings.profiling_settings.PROFILING_DIR,
+    settings.profiling_settings.PROFILING_MAX_PROFILES,
+    settings.profiling_settings.PROFILING_MAX_BYTES,
+)
@@ -0,0 +1,44 @@
+import asyncio
+from datetime import datetime
+from typing import Awaitable, TypeVar
+
+from loguru import logger
+from pyinstrument import Profiler
+
+from app.core.settings import settings
+from app.services.profiling.profile_store import profile_store
+
+T = TypeVar("T")
+
+
+def start_profiler() -> Profiler:
+    """
+    Start a sampling profiler bound to the current async context.
+
+    In async mode the samples follow this context across awaits and into the tasks it spawns (such as
+    the one streaming a response body), while unrelated requests on the same loop stay out of it.
+    """
+    profiler = Profiler(interval=settings.profiling_settings.PROFILING_INTERVAL_SECONDS, async_mode="enabled")
+    profiler.start()
+    return profiler
+
+
+async def save_profile(profiler: Profiler, profile_id: str, meta: dict) -> None:
+    """Render the report off the event loop and store it; failures are logged, never raised."""
+    try:
+        html = await asyncio.to_thread(profiler.output_html)
+        meta = {**meta, "created_at": datetime.now().isoformat(), "duration_seconds": profiler.last_session.duration}
+        await asyncio.to_thread(profile_store.save, profile_id, meta, html)
+        logger.info("Stored profile {} ({:.3f}s)", profile_id, meta["duration_seconds"])
+    except Exception as e:
+        logger.warning("Failed to store profile {}: {}", profile_id, e)
+
+
+async def profile_coroutine(coro: Awaitable[T], profile_id: str, meta: dict) -> T:
+    """Await `coro` under the profiler and store the result as `profile_id`."""
+    profiler = start_profiler()
+    try:
+        return await coro
+    finally:
+        profiler.stop()
+        await save_profile(profiler, profile_id, meta)
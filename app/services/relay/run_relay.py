@@ -0,0 +1,103 @@
+import asyncio
+import time
+from typing import AsyncIterator
+
+from loguru import logger
+
+from app.core.settings import settings
+from app.database.redis_client import async_redis_client
+from app.services.llm.agent_runs import stream_agent_turn
+from app.services.llm.dataclasses.project_info import ProjectInfo
+from app.services.llm.dataclasses.stream_events import ErrorEvent, RunStartedEvent, StreamEvent
+from app.services.llm.run_control import RunControl, request_cancel
+from app.utils.serialization import dumps_line
+
+worker_settings = settings.worker_settings
+
+
+def _stream_key(run_id: str) -> str:
+    return f"agent:run:{run_id}"
+
+
+async def _append(run_id: str, fields: dict) -> None:
+    key = _stream_key(run_id)
+    pipe = async_redis_client.pipeline(transaction=False)
+    pipe.xadd(key, fields, maxlen=worker_settings.AGENT_STREAM_MAXLEN, approximate=True)
+    pipe.expire(key, worker_settings.AGENT_STREAM_TTL_SECONDS)
+    await pipe.execute()
+
+
+async def publish_event(run_id: str, event: StreamEvent) -> None:
+    await _append(run_id, {"data": dumps_line(event)})
+
+
+async def publish_end(run_id: str) -> None:
+    await _append(run_id, {"end": 1})
+
+
+async def publish_error(run_id: str, message: str) -> None:
+    await _append(run_id, {"error": message})
+
+
+async def relay_agent_run(
+    run_id: str,
+    session_id: str,
+    project: ProjectInfo,
+    messages: list,
+    verbose: bool = False,
+    max_seconds: int = 0,
+    max_tokens: int = 0,
+) -> None:
+    """Run an agent turn and append every event to the run's Redis stream."""
+    control = RunControl(run_id, max_seconds=max_seconds, max_tokens=max_tokens)
+    try:
+        await publish_event(run_id, RunStartedEvent(run_id=run_id))
+        async for event in stream_agent_turn(session_id, project, messages, verbose=verbose, control=control):
+            await publish_event(run_id, event)
+    except Exception as e:
+        logger.exception("Agent run {} failed", run_id)
+        await publish_error(run_id, str(e))
+        return
+
+    await publish_end(run_id)
+
+
+async def subscribe_run(run_id: str) -> AsyncIterator[bytes]:
+    """
+    Yield the NDJSON chunks of a run as they are appended to its stream.
+
+    Reading starts from the beginning of the stream, so chunks published before the subscriber
+    attached are not lost. Stops on the end marker, on an error, or after the idle timeout. If the
+    subscriber goes away first and AGENT_RUN_CANCEL_ON_DISCONNECT is set, the run is cancelled.
+    """
+    key = _stream_key(run_id)
+    last_id = "0-0"
+    idle_deadline = time.monotonic() + worker_settings.AGENT_RUN_IDLE_TIMEOUT_SECONDS
+    finished = False
+
+    try:
+        while True:
+            response = await async_redis_client.xread({key: last_id}, block=5000, count=100)
+            if not response:
+                if time.monotonic() > idle_deadline:
+                    finished = True
+                    yield dumps_line(ErrorEvent(message="Agent run timed out"))
+                    return
+                continue
+
+            idle_deadline = time.monotonic() + worker_settings.AGENT_RUN_IDLE_TIMEOUT_SECONDS
+            for _, entries in response:
+                for entry_id, fields in entries:
+                    last_id = entry_id
+                    if b"data" in fields:
+                        yield fields[b"data"]
+                    elif b"error" in fields:
+                        finished = True
+                        yield dumps_line(ErrorEvent(message=fields[b"error"].decode()))
+                        return
+                    else:
+                        finished = True
+                        return
+    finally:
+        if not finished and worker_settings.AGENT_RUN_CANCEL_ON_DISCONNECT:
+            await asyncio.shield(request_cancel(run_id))
@@ -0,0 +1,249 @@
+import fcntl
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import brotli
+import orjson
+from loguru import logger
+
+from app.core.settings import settings
+from app.services.sandbox.paths import ASSET_DIR, project_dir
+
+MANIFEST_NAME = "manifest.json"
+SKIPPED_DIRS = {"node_modules", ".git", ASSET_DIR}
+COMPRESSIBLE_TYPES = {
+    "application/javascript",
+    "application/json",
+    "application/manifest+json",
+    "application/wasm",
+    "application/xml",
+    "image/svg+xml",
+}
+# Matches content-hashed file names such as app.3f2a9c1b.js or chunk-5d41402abc4b.css
+HASHED_NAME_PATTERN = re.compile(r"[.-][0-9a-f]{8,}\.[A-Za-z0-9]+$")
+
+
+def content_type(path: str) -> str:
+    guessed, _ = mimetypes.guess_type(path)
+    if guessed is None:
+        return "application/octet-stream"
+    if guessed.startswith("text/") or guessed in ("application/javascript", "application/json"):
+        return f"{guessed}; charset=utf-8"
+    return guessed
+
+
+def is_compressible(mime_type: str) -> bool:
+    base_type = mime_type.split(";")[0]
+    return base_type.startswith("text/") or base_type in COMPRESSIBLE_TYPES
+
+
+class AssetPipeline:
+    """
+    Precompressed, ETag-addressed variants of the files a sandbox preview serves.
+
+    For every written file the pipeline stores gzip and brotli variants (when they are smaller)
+    under `<project>/.assets/` and records the content type, strong ETag and cache policy in
+    `.assets/manifest.json`. The preview server only reads that manifest, so it never compresses
+    or hashes anything on the request path. The manifest is always read from disk because other
+    processes (the file watcher) update it too.
+
+    The write path only builds quick drafts (`ASSET_WRITE_*` levels) so a tool call is not held up
+    by brotli at quality 11, and queues the final build at `ASSET_GZIP_LEVEL` / `ASSET_BROTLI_QUALITY`
+    on a background thread. The file watcher sees the same write; whichever gets there first builds
+    the final variants and the other finds them current.
+    """
+
+    def __init__(self) -> None:
+        self.config = settings.asset_settings
+        self._locks: dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+        self._finalizer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="asset-finalizer")
+        self._pending: set[tuple[str, str]] = set()
+
+    def _lock(self, project_id: str) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(project_id, threading.Lock())
+
+    @staticmethod
+    def _asset_dir(project_id: str) -> str:
+        return os.path.join(project_dir(project_id), ASSET_DIR)
+
+    @contextmanager
+    def _locked(self, project_id: str) -> Iterator[None]:
+        """
+        Serialize manifest updates of a project across threads and processes.
+
+        The API (or node agent) and the file watcher both update the same manifest, so the
+        in-process lock is paired with an flock on a file next to it.
+        """
+        asset_dir = self._asset_dir(project_id)
+        os.makedirs(asset_dir, exist_ok=True)
+        with self._lock(project_id), open(os.path.join(asset_dir, ".lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _load(self, project_id: str) -> dict[str, dict]:
+        manifest_path = os.path.join(self._asset_dir(project_id), MANIFEST_NAME)
+        if not os.path.exists(manifest_path):
+            return {}
+        with open(manifest_path, "rb") as f:
+            return orjson.loads(f.read())
+
+    def _persist(self, project_id: str, manifest: dict[str, dict]) -> None:
+        asset_dir = self._asset_dir(project_id)
+        os.makedirs(asset_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=asset_dir)
+        with os.fdopen(fd, "wb") as f:
+            f.write(orjson.dumps(manifest, option=orjson.OPT_SORT_KEYS))
+        os.replace(tmp_path, os.path.join(asset_dir, MANIFEST_NAME))
+
+    def _write_variant(self, project_id: str, path: str, suffix: str, data: Optional[bytes]) -> bool:
+        variant_path = os.path.join(self._asset_dir(project_id), f"{path}.{suffix}")
+        if data is None:
+            if os.path.exists(variant_path):
+                os.remove(variant_path)
+            return False
+
+        os.makedirs(os.path.dirname(variant_path), exist_ok=True)
+        tmp_path = f"{variant_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, variant_path)
+        return True
+
+    def _cache_control(self, path: str) -> str:
+        if HASHED_NAME_PATTERN.search(os.path.basename(path)):
+            return f"public, max-age={self.config.ASSET_IMMUTABLE_MAX_AGE}, immutable"
+        # Unhashed names can change under the same URL; browsers revalidate with If-None-Match
+        return "no-cache"
+
+    def _build_entry(self, project_id: str, path: str, data: bytes, previous: Optional[dict], draft: bool) -> dict:
+        digest = hashlib.sha256(data).hexdigest()
+        mime_type = content_type(path)
+        stat = os.stat(os.path.join(project_dir(project_id), path))
+        etag = f'"{digest[:32]}"'
+
+        # The same change can arrive twice (write path and file watcher); only refresh the mtime then,
+        # unless the variants are still the write path's drafts and this is the final build
+        if (
+            previous
+            and previous["etag"] == etag
+            and previous["type"] == mime_type
+            and (draft or not previous.get("draft"))
+        ):
+            return {**previous, "mtime_ms": stat.st_mtime_ns // 1_000_000}
+
+        if draft:
+            gzip_level, brotli_quality = self.config.ASSET_WRITE_GZIP_LEVEL, self.config.ASSET_WRITE_BROTLI_QUALITY
+        else:
+            gzip_level, brotli_quality = self.config.ASSET_GZIP_LEVEL, self.config.ASSET_BROTLI_QUALITY
+
+        gzip_data = brotli_data = None
+        compressed = is_compressible(mime_type) and len(data) >= self.config.ASSET_MIN_COMPRESS_BYTES
+        if compressed:
+            gzip_data = gzip.compress(data, compresslevel=gzip_level, mtime=0)
+            brotli_data = brotli.compress(data, quality=brotli_quality)
+            # A variant that does not save bytes is not worth a disk read
+            gzip_data = gzip_data if len(gzip_data) < len(data) else None
+            brotli_data = brotli_data if len(brotli_data) < len(data) else None
+
+        encodings = {}
+        if self._write_variant(project_id, path, "gz", gzip_data):
+            encodings["gzip"] = len(gzip_data)
+        if self._write_variant(project_id, path, "br", brotli_data):
+            encodings["br"] = len(brotli_data)
+
+        return {
+            "etag": etag,
+            "type": mime_type,
+            "size": len(data),
+            "mtime_ms": stat.st_mtime_ns // 1_000_000,
+            "cache_control": self._cache_control(path),
+            "encodings": encodings,
+            "draft": draft and compressed,
+        }
+
+    def process_files(self, project_id: str, files: dict[str, Optional[bytes]], draft: bool = False) -> None:
+        """
+        Rebuild the assets of `files` written to the local project directory; None removes a path.
+
+        With `draft`, variants are built at the cheap write-path levels and left for the file watcher
+        to rebuild at full strength.
+        """
+        if not self.config.ASSET_PIPELINE_ENABLED:
+            return
+
+        with self._locked(project_id):
+            manifest = self._load(project_id)
+            for path, data in files.items():
+                path = os.path.normpath(path)
+                if path.split(os.sep)[0] in SKIPPED_DIRS:
+                    continue
+                try:
+                    if data is None or len(data) > self.config.ASSET_MAX_FILE_BYTES:
+                        manifest.pop(path, None)
+                        self._write_variant(project_id, path, "gz", None)
+                        self._write_variant(project_id, path, "br", None)
+                    else:
+                        manifest[path] = self._build_entry(project_id, path, data, manifest.get(path), draft)
+                except OSError as e:
+                    manifest.pop(path, None)
+                    logger.warning("Failed to build assets for {} in project {}: {}", path, project_id, e)
+            self._persist(project_id, manifest)
+
+        if draft:
+            self._schedule_final(project_id, [path for path, entry in manifest.items() if entry.get("draft")])
+
+    def _schedule_final(self, project_id: str, paths: list[str]) -> None:
+        """Queue the full-strength build of drafted paths; a path already queued is not queued twice."""
+        with self._guard:
+            paths = [path for path in paths if (project_id, path) not in self._pending]
+            self._pending.update((project_id, path) for path in paths)
+        if paths:
+            self._finalizer.submit(self._finalize, project_id, paths)
+
+    def _finalize(self, project_id: str, paths: list[str]) -> None:
+        with self._guard:
+            self._pending.difference_update((project_id, path) for path in paths)
+        # The project may have been deleted meanwhile; building would recreate its directory
+        if not os.path.isdir(project_dir(project_id)):
+            return
+        try:
+            self.refresh_paths(project_id, paths)
+        except Exception as e:
+            logger.warning("Failed to finalize assets of project {}: {}", project_id, e)
+
+    def refresh_paths(self, project_id: str, paths: list[str]) -> None:
+        """Re-read `paths` from the local project directory; missing files are removed."""
+        root = project_dir(project_id)
+        files = {}
+        for path in paths:
+            try:
+                with open(os.path.join(root, path), "rb") as f:
+                    files[path] = f.read()
+            except FileNotFoundError:
+                files[path] = None
+        self.process_files(project_id, files)
+
+    def rebuild(self, project_id: str) -> None:
+        """Build the assets of every file in the project, e.g. right after it is created from templates."""
+        root = project_dir(project_id)
+        paths = []
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [name for name in dirnames if name not in SKIPPED_DIRS]
+            paths.extend(os.path.relpath(os.path.join(dirpath, filename), root) for filename in filenames)
+        self.refresh_paths(project_id, paths)
+
+
+asset_pipeline = AssetPipeline()
@@ -0,0 +1,34 @@
+from typing import AsyncIterator
+
+from app.core.settings import settings
+from app.database.redis_client import async_redis_client
+from app.utils.serialization import dumps
+
+
+def _channel(project_id: str) -> str:
+    return f"project:{project_id}:changes"
+
+
+async def publish_changes(project_id: str, changes: list[dict]) -> None:
+    """Announce a coalesced batch of changed paths, each {"path", "change", "hash"}."""
+    await async_redis_client.publish(_channel(project_id), dumps({"project_id": project_id, "paths": changes}))
+
+
+async def subscribe_changes(project_id: str) -> AsyncIterator[bytes]:
+    """Yield the change feed of a project as server-sent events, with comment heartbeats while idle."""
+    pubsub = async_redis_client.pubsub()
+    await pubsub.subscribe(_channel(project_id))
+    try:
+        yield b"retry: 2000\n\n"
+        while True:
+            message = await pubsub.get_message(
+                ignore_subscribe_messages=True,
+                timeout=settings.watcher_settings.CHANGE_FEED_HEARTBEAT_SECONDS,
+            )
+            if message is None:
+                yield b": ping\n\n"
+                continue
+            yield b"event: changes\ndata: " + message["data"] + b"\n\n"
+    finally:
+        await pubsub.unsubscribe()
+        await pubsub.aclose()
@@ -0,0 +1,89 @@
+import hashlib
+import os
+from typing import Optional
+
+from app.core.settings import settings
+from app.services.sandbox.paths import project_dir
+from app.services.sandbox.project_state_store import ProjectStateStore
+
+
+def is_ignored(path: str) -> bool:
+    ignored = settings.sandbox_settings.SANDBOX_MANIFEST_IGNORE
+    return any(part in ignored for part in path.split(os.sep))
+
+
+def render_manifest(manifest: dict[str, dict], max_entries: int) -> str:
+    """Deterministic text listing; identical project state always renders to identical bytes."""
+    paths = sorted(manifest)
+    lines = [f"{path}\t{manifest[path]['size']}\t{manifest[path]['hash'][:12]}" for path in paths[:max_entries]]
+    if len(paths) > max_entries:
+        lines.append(f"... {len(paths) - max_entries} more files")
+    return "\n".join(lines)
+
+
+class FileManifestStore(ProjectStateStore[dict[str, dict]]):
+    """
+    Precomputed listing of the files (path, size, content hash) of every project on this host.
+
+    Updated per write so the agent context never has to walk the project directory or spend tool
+    calls discovering its layout; persisted and shared between processes like the search index.
+    """
+
+    def _new_state(self) -> dict[str, dict]:
+        return {}
+
+    def _set_entry(self, state: dict[str, dict], key: str, entry: Optional[dict]) -> None:
+        if entry is None:
+            state.pop(key, None)
+        else:
+            state[key] = entry
+
+    def _entries(self, state: dict[str, dict]) -> dict[str, dict]:
+        return state
+
+    @staticmethod
+    def _entry(data: bytes) -> dict:
+        return {"size": len(data), "hash": hashlib.sha256(data).hexdigest()}
+
+    def _build(self, project_id: str) -> dict[str, dict]:
+        manifest = {}
+        root = project_dir(project_id)
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [name for name in dirnames if not is_ignored(name)]
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                with open(path, "rb") as f:
+                    manifest[os.path.relpath(path, root)] = self._entry(f.read())
+        return manifest
+
+    def get(self, project_id: str) -> dict[str, dict]:
+        return self.read(project_id, dict)
+
+    def update_files(self, project_id: str, files: dict[str, Optional[bytes]]) -> None:
+        """Record new contents for `files`; a None value removes the path."""
+        entries = {}
+        for path, data in files.items():
+            path = os.path.normpath(path)
+            entries[path] = None if data is None or is_ignored(path) else self._entry(data)
+
+        self.update(
+            project_id,
+            lambda manifest: {path: entry for path, entry in entries.items() if manifest.get(path) != entry},
+        )
+
+    def refresh_paths(self, project_id: str, paths: list[str]) -> None:
+        """Re-read `paths` from the local project directory; missing files are removed."""
+        root = project_dir(project_id)
+        files = {}
+        for path in paths:
+            try:
+                with open(os.path.join(root, path), "rb") as f:
+                    files[path] = f.read()
+            except FileNotFoundError:
+                files[path] = None
+        self.update_files(project_id, files)
+
+
+file_manifest = FileManifestStore(
+    settings.sandbox_settings.SANDBOX_MANIFEST_DIR, settings.sandbox_settings.SANDBOX_MANIFEST_CACHE_SIZE
+)
@@ -0,0 +1,84 @@
+import asyncio
+import hashlib
+import os
+from collections import defaultdict
+from typing import Optional
+
+from loguru import logger
+from watchfiles import Change, DefaultFilter, awatch
+
+from app.core.settings import settings
+from app.services.sandbox.asset_pipeline import asset_pipeline
+from app.services.sandbox.change_feed import publish_changes
+from app.services.sandbox.file_manifest import file_manifest
+from app.services.search.code_index import code_index
+
+CHANGE_NAMES = {Change.added: "added", Change.modified: "modified", Change.deleted: "deleted"}
+
+
+def _file_hash(path: str) -> Optional[str]:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except (FileNotFoundError, IsADirectoryError):
+        return None
+
+
+def coalesce(root: str, batch: set[tuple[Change, str]]) -> dict[str, list[dict]]:
+    """
+    Group a batch of raw events by project and reduce each path to its final state.
+
+    A burst such as create + several writes + rename of a temporary file collapses into one entry
+    per path, whose change kind and hash reflect what is on disk now.
+    """
+    kinds: dict[tuple[str, str], Change] = {}
+    for change, path in batch:
+        relative_path = os.path.relpath(path, root)
+        project_id, _, project_path = relative_path.partition(os.sep)
+        if not project_path:
+            continue
+        key = (project_id, project_path)
+        # An add anywhere in the burst wins over later modifications of the same path
+        if kinds.get(key) != Change.added:
+            kinds[key] = change
+
+    changes: dict[str, list[dict]] = defaultdict(list)
+    for (project_id, project_path), change in sorted(kinds.items()):
+        path = os.path.join(root, project_id, project_path)
+        if os.path.isdir(path):
+            continue
+        file_hash = _file_hash(path)
+        kind = "deleted" if file_hash is None else CHANGE_NAMES[change]
+        if kind == "deleted" and change == Change.added:
+            # Created and removed within the burst (temporary files): nothing to report
+            continue
+        changes[project_id].append({"path": project_path, "change": kind, "hash": file_hash})
+    return changes
+
+
+async def watch_projects() -> None:
+    """Watch every project directory on this host and publish coalesced change batches."""
+    config = settings.watcher_settings
+    root = os.path.abspath(settings.sandbox_settings.PROJECTS_DIR)
+    os.makedirs(root, exist_ok=True)
+    watch_filter = DefaultFilter(
+        ignore_dirs=config.WATCHER_IGNORE,
+        ignore_entity_patterns=(*DefaultFilter.ignore_entity_patterns, r"\.restore$", r"\.tmp$"),
+    )
+
+    logger.info("Watching sandbox projects under {}", root)
+    batches = awatch(root, watch_filter=watch_filter, debounce=config.WATCHER_DEBOUNCE_MS, step=config.WATCHER_STEP_MS)
+    async for batch in batches:
+        for project_id, changes in coalesce(root, batch).items():
+            try:
+                paths = [change["path"] for change in changes]
+                # Assets first, so a preview reloading on the event already gets the new variants
+                await asyncio.to_thread(asset_pipeline.refresh_paths, project_id, paths)
+                if config.WATCHER_ENABLED:
+                    # Done here, once per host, rather than by every process that reads the state: edits
+                    # that bypass the agent tools (restores, manual edits) reach the index and manifest too
+                    await asyncio.to_thread(code_index.refresh_paths, project_id, paths)
+                    await asyncio.to_thread(file_manifest.refresh_paths, project_id, paths)
+                await publish_changes(project_id, changes)
+            except Exception as e:
+                logger.warning("Failed to publish changes of project {}: {}", project_id, e)
@@ -0,0 +1,86 @@
+from typing import Optional
+
+import httpx
+
+from app.core.settings import settings
+from app.schema.node_schema import (
+    FileManifestResponse,
+    FileReadResponse,
+    FileWriteRequest,
+    SandboxCreateRequest,
+    SandboxCreateResponse,
+    SandboxStopRequest,
+    SandboxStopResponse,
+)
+from app.schema.search_schema import SearchHit, SearchResponse
+from app.services.sandbox.node_registry import get_node
+
+
+class NodeUnavailableError(Exception):
+    pass
+
+
+def _client(node_id: str) -> httpx.Client:
+    node = get_node(node_id)
+    if node is None:
+        raise NodeUnavailableError(f"Sandbox node {node_id} is not registered")
+
+    return httpx.Client(
+        base_url=node.url,
+        headers={"X-Node-Token": settings.sandbox_settings.NODE_AGENT_TOKEN},
+        timeout=settings.sandbox_settings.NODE_REQUEST_TIMEOUT_SECONDS,
+    )
+
+
+def create_sandbox(node_id: str, project_id: str, port: int, template: Optional[str] = None) -> SandboxCreateResponse:
+    request = SandboxCreateRequest(project_id=project_id, port=port, template=template)
+    with _client(node_id) as client:
+        response = client.post("/sandboxes", json=request.model_dump())
+        response.raise_for_status()
+        return SandboxCreateResponse(**response.json())
+
+
+def stop_sandbox(node_id: str, pid: int) -> bool:
+    with _client(node_id) as client:
+        response = client.post("/sandboxes/stop", json=SandboxStopRequest(pid=pid).model_dump())
+        response.raise_for_status()
+        return SandboxStopResponse(**response.json()).stopped
+
+
+def read_file(node_id: str, project_id: str, path: str) -> str:
+    with _client(node_id) as client:
+        response = client.get(f"/sandboxes/{project_id}/files", params={"path": path})
+        response.raise_for_status()
+        return FileReadResponse(**response.json()).content
+
+
+def write_file(node_id: str, project_id: str, path: str, content: str) -> None:
+    with _client(node_id) as client:
+        response = client.put(
+            f"/sandboxes/{project_id}/files", json=FileWriteRequest(path=path, content=content).model_dump()
+        )
+        response.raise_for_status()
+
+
+def purge_sandbox(node_id: str, project_id: str) -> None:
+    with _client(node_id) as client:
+        response = client.delete(f"/sandboxes/{project_id}")
+        response.raise_for_status()
+
+
+def get_manifest(node_id: str, project_id: str) -> dict[str, dict]:
+    with _client(node_id) as client:
+        response = client.get(f"/sandboxes/{project_id}/manifest")
+        response.raise_for_status()
+        return FileManifestResponse(**response.json()).model_dump()["files"]
+
+
+def search(node_id: str, project_id: str, query: str, mode: str, limit: Optional[int]) -> tuple[str, list[SearchHit]]:
+    params = {"q": query, "mode": mode}
+    if limit is not None:
+        params["limit"] = limit
+    with _client(node_id) as client:
+        response = client.get(f"/sandboxes/{project_id}/search", params=params)
+        response.raise_for_status()
+        result = SearchResponse(**response.json())
+        return result.mode, result.hits
@@ -0,0 +1,70 @@
+import time
+from typing import Optional
+
+import orjson
+from redis import Redis
+
+from app.core.settings import settings
+from app.database.redis_client import redis_client
+from app.schema.node_schema import NodeInfo
+
+NODES_KEY = "sandbox:nodes"
+
+# Read-modify-write of a node snapshot in one step, so concurrent API replicas never drop each other's reservations
+RESERVE_SLOT_SCRIPT = """
+local raw = redis.call('HGET', KEYS[1], ARGV[1])
+if not raw then
+    return 0
+end
+local node = cjson.decode(raw)
+node.running_sandboxes = node.running_sandboxes + 1
+node.free_ports = math.max(0, node.free_ports - 1)
+node.updated_at = tonumber(ARGV[2])
+redis.call('HSET', KEYS[1], ARGV[1], cjson.encode(node))
+return 1
+"""
+
+
+def _alive_key(node_id: str) -> str:
+    return f"sandbox:node:{node_id}:alive"
+
+
+def register_node(info: NodeInfo, client: Redis = redis_client) -> None:
+    """Publish a node's capacity snapshot and refresh its liveness key."""
+    pipe = client.pipeline(transaction=False)
+    pipe.hset(NODES_KEY, info.node_id, orjson.dumps(info.model_dump()))
+    pipe.set(_alive_key(info.node_id), 1, ex=settings.sandbox_settings.NODE_TTL_SECONDS)
+    pipe.execute()
+
+
+def mark_node_down(node_id: str, client: Redis = redis_client) -> None:
+    """Stop scheduling onto a node while keeping its address for projects it already owns."""
+    client.delete(_alive_key(node_id))
+
+
+def list_nodes(alive_only: bool = True, client: Redis = redis_client) -> list[NodeInfo]:
+    raw_nodes = client.hgetall(NODES_KEY)
+    nodes = [NodeInfo(**orjson.loads(value)) for value in raw_nodes.values()]
+    if not alive_only or not nodes:
+        return nodes
+
+    pipe = client.pipeline(transaction=False)
+    for node in nodes:
+        pipe.exists(_alive_key(node.node_id))
+    alive = pipe.execute()
+    return [node for node, is_alive in zip(nodes, alive) if is_alive]
+
+
+def get_node(node_id: str, client: Redis = redis_client) -> Optional[NodeInfo]:
+    value = client.hget(NODES_KEY, node_id)
+    return NodeInfo(**orjson.loads(value)) if value else None
+
+
+def reserve_slot(node_id: str, client: Redis = redis_client) -> None:
+    """
+    Account for a placement before the node's next heartbeat reports it.
+
+    Without this, a burst of creates between two heartbeats would all see the same free capacity
+    and land on the same node.
+    """
+    client.register_script(RESERVE_SLOT_SCRIPT)(keys=[NODES_KEY], args=[node_id, time.time()])
@@ -0,0 +1,73 @@
+import os
+import time
+from typing import Optional
+
+from redis import Redis
+
+from app.core.settings import settings
+from app.database.redis_client import redis_client
+from app.schema.node_schema import NodeInfo
+
+
+def _pids_key() -> str:
+    # Outside the agent's memory, as sandboxes run in their own session and outlive agent restarts
+    return f"sandbox:node:{settings.sandbox_settings.NODE_ID}:pids"
+
+
+def _start_time(pid: int) -> Optional[str]:
+    """Start time of a process in clock ticks since boot, which tells a sandbox apart from a reused PID."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[19]
+    except (OSError, IndexError):
+        return None
+
+
+def track_pid(pid: int, client: Redis = redis_client) -> None:
+    client.hset(_pids_key(), str(pid), _start_time(pid) or "")
+
+
+def is_tracked(pid: int, client: Redis = redis_client) -> bool:
+    recorded = client.hget(_pids_key(), str(pid))
+    return recorded is not None and recorded.decode() == _start_time(pid)
+
+
+def untrack_pid(pid: int, client: Redis = redis_client) -> None:
+    client.hdel(_pids_key(), str(pid))
+
+
+def prune_tracked_pids(client: Redis = redis_client) -> int:
+    """Forget sandboxes that exited (or whose PID now belongs to another process); returns how many remain."""
+    tracked = client.hgetall(_pids_key())
+    dead = [pid for pid, started in tracked.items() if started.decode() != _start_time(int(pid))]
+    if dead:
+        client.hdel(_pids_key(), *dead)
+    return len(tracked) - len(dead)
+
+
+def _mem_available_mb() -> int:
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // (1024 * 1024)
+
+
+def collect_node_info() -> NodeInfo:
+    """Snapshot this node's free capacity for the registry."""
+    config = settings.sandbox_settings
+    running = prune_tracked_pids()
+    port_range = config.PORT_RANGE_MAX - config.PORT_RANGE_MIN + 1
+    return NodeInfo(
+        node_id=config.NODE_ID,
+        url=config.NODE_URL,
+        running_sandboxes=running,
+        max_sandboxes=config.NODE_MAX_SANDBOXES,
+        free_ports=max(0, port_range - running),
+        mem_available_mb=_mem_available_mb(),
+        load_avg=os.getloadavg()[0],
+        updated_at=time.time(),
+    )
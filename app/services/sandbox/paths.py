@@ -0,0 +1,42 @@
+import os
+import re
+import tempfile
+
+from app.core.settings import settings
+from app.utils.generate_ids import ID_PATTERN
+
+# Precompressed variants and the asset manifest live here; the template server.js reads the same name
+ASSET_DIR = ".assets"
+
+
+def project_dir(project_id: str) -> str:
+    # Project directories are removed recursively, so an id like ".." must never reach a path
+    if not re.fullmatch(ID_PATTERN, project_id):
+        raise ValueError(f"Invalid project id {project_id!r}")
+    return os.path.join(settings.sandbox_settings.PROJECTS_DIR, project_id)
+
+
+def project_file(project_id: str, filename: str) -> str:
+    """Resolve `filename` inside the project directory, rejecting paths that escape it."""
+    root = os.path.realpath(project_dir(project_id))
+    path = os.path.realpath(os.path.join(root, filename))
+    if os.path.commonpath([root, path]) != root:
+        raise ValueError(f"Path {filename} is outside of the project directory")
+    return path
+
+
+def replace_file(path: str, data: bytes) -> None:
+    """
+    Write a project file by replacing it rather than writing into it.
+
+    The rename is atomic, so the preview server and the file watcher never read a half-written file.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
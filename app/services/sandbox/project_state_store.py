@@ -0,0 +1,191 @@
+import fcntl
+import glob
+import os
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Generic, Iterator, Optional, TypeVar
+
+import orjson
+
+StateT = TypeVar("StateT")
+ResultT = TypeVar("ResultT")
+
+# The journal is folded into a new snapshot once it outgrows both the snapshot and this size
+COMPACT_MIN_BYTES = 256 * 1024
+
+
+@dataclass
+class _Loaded(Generic[StateT]):
+    state: StateT
+    generation: int
+    snapshot_key: tuple[int, int]
+    snapshot_size: int
+    journal_offset: int = 0
+
+
+class ProjectStateStore(ABC, Generic[StateT]):
+    """
+    Per-project derived state (JSON entries keyed by file path) shared by every process on the host.
+
+    Each project is persisted as a snapshot `<id>.json` plus an append-only journal
+    `<id>.<generation>.log` of changed entries, so an update costs one appended line rather than a
+    rewrite of the whole state; the journal is folded into the next generation's snapshot once it
+    outgrows it. Every access holds an flock on the project and first catches up with whatever other
+    processes (API workers, Celery workers, the file watcher) changed, so no process serves a stale
+    copy. Only the `cache_size` most recently used projects are kept in memory.
+
+    Subclasses define the in-memory state through `_new_state`, `_set_entry` and `_entries`, and
+    how to build it for a project that has no persisted state yet through `_build`.
+    """
+
+    def __init__(self, state_dir: str, cache_size: int) -> None:
+        self.state_dir = state_dir
+        self.cache_size = cache_size
+        self._cache: OrderedDict[str, _Loaded[StateT]] = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    @abstractmethod
+    def _new_state(self) -> StateT: ...
+
+    @abstractmethod
+    def _set_entry(self, state: StateT, key: str, entry: Optional[Any]) -> None:
+        """Apply one entry to the state; None removes the key."""
+
+    @abstractmethod
+    def _entries(self, state: StateT) -> dict[str, Any]: ...
+
+    def _build(self, project_id: str) -> dict[str, Any]:
+        return {}
+
+    def _snapshot_path(self, project_id: str) -> str:
+        return os.path.join(self.state_dir, f"{project_id}.json")
+
+    def _journal_path(self, project_id: str, generation: int) -> str:
+        return os.path.join(self.state_dir, f"{project_id}.{generation}.log")
+
+    @contextmanager
+    def _locked(self, project_id: str) -> Iterator[None]:
+        # flock also excludes other threads of this process, as each call opens its own file description
+        os.makedirs(self.state_dir, exist_ok=True)
+        with open(os.path.join(self.state_dir, f"{project_id}.lock"), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _remember(self, project_id: str, loaded: _Loaded[StateT]) -> None:
+        with self._cache_lock:
+            self._cache[project_id] = loaded
+            self._cache.move_to_end(project_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _write_snapshot(self, project_id: str, state: StateT, generation: int) -> _Loaded[StateT]:
+        data = orjson.dumps({"generation": generation, "entries": self._entries(state)})
+        fd, tmp_path = tempfile.mkstemp(dir=self.state_dir)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        snapshot_path = self._snapshot_path(project_id)
+        os.replace(tmp_path, snapshot_path)
+        stat = os.stat(snapshot_path)
+        return _Loaded(state, generation, (stat.st_ino, stat.st_mtime_ns), len(data))
+
+    def _read_snapshot(self, project_id: str, stat: os.stat_result) -> Optional[_Loaded[StateT]]:
+        with open(self._snapshot_path(project_id), "rb") as f:
+            data = orjson.loads(f.read())
+        if "generation" not in data:
+            # Written before state was journaled; rebuilt from the project files instead
+            return None
+        state = self._new_state()
+        for key, entry in data["entries"].items():
+            self._set_entry(state, key, entry)
+        return _Loaded(state, data["generation"], (stat.st_ino, stat.st_mtime_ns), stat.st_size)
+
+    def _replay(self, project_id: str, loaded: _Loaded[StateT]) -> None:
+        """Apply journal lines appended since `loaded` was last brought up to date."""
+        try:
+            with open(self._journal_path(project_id, loaded.generation), "rb") as f:
+                f.seek(loaded.journal_offset)
+                data = f.read()
+        except FileNotFoundError:
+            return
+
+        # A line cut short by a crash mid-append is ignored
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            key, entry = orjson.loads(line)
+            self._set_entry(loaded.state, key, entry)
+        loaded.journal_offset += end
+
+    def _rebuild(self, project_id: str) -> _Loaded[StateT]:
+        state = self._new_state()
+        for key, entry in self._build(project_id).items():
+            self._set_entry(state, key, entry)
+        return self._write_snapshot(project_id, state, 1)
+
+    def _sync(self, project_id: str) -> _Loaded[StateT]:
+        """Bring the project's state up to date with disk; must be called with the project locked."""
+        try:
+            stat = os.stat(self._snapshot_path(project_id))
+        except FileNotFoundError:
+            loaded = self._rebuild(project_id)
+            self._remember(project_id, loaded)
+            return loaded
+
+        with self._cache_lock:
+            loaded = self._cache.get(project_id)
+        if loaded is None or loaded.snapshot_key != (stat.st_ino, stat.st_mtime_ns):
+            loaded = self._read_snapshot(project_id, stat) or self._rebuild(project_id)
+        self._replay(project_id, loaded)
+        self._remember(project_id, loaded)
+        return loaded
+
+    def read(self, project_id: str, reader: Callable[[StateT], ResultT]) -> ResultT:
+        """Run `reader` on the current state; it must not keep references to the state."""
+        with self._locked(project_id):
+            return reader(self._sync(project_id).state)
+
+    def update(self, project_id: str, diff: Callable[[StateT], dict[str, Optional[Any]]]) -> None:
+        """
+        Apply the entries `diff` computes from the current state (None removes a key).
+
+        Only the returned entries are written, appended to the journal; `diff` should leave out
+        entries that are already current so unchanged files cost nothing.
+        """
+        with self._locked(project_id):
+            loaded = self._sync(project_id)
+            changes = diff(loaded.state)
+            if not changes:
+                return
+
+            for key, entry in changes.items():
+                self._set_entry(loaded.state, key, entry)
+            journal = b"".join(orjson.dumps([key, entry]) + b"\n" for key, entry in changes.items())
+            with open(self._journal_path(project_id, loaded.generation), "ab") as f:
+                # Drops a line left half-written by a crash, which replay already skipped
+                f.truncate(loaded.journal_offset)
+                f.write(journal)
+            loaded.journal_offset += len(journal)
+
+            if loaded.journal_offset > max(loaded.snapshot_size, COMPACT_MIN_BYTES):
+                compacted = self._write_snapshot(project_id, loaded.state, loaded.generation + 1)
+                os.remove(self._journal_path(project_id, loaded.generation))
+                self._remember(project_id, compacted)
+
+    def drop(self, project_id: str) -> None:
+        """Forget a project's state in memory and on disk."""
+        with self._locked(project_id):
+            with self._cache_lock:
+                self._cache.pop(project_id, None)
+            journals = glob.glob(os.path.join(self.state_dir, f"{project_id}.*.log"))
+            lock_path = os.path.join(self.state_dir, f"{project_id}.lock")
+            for path in [self._snapshot_path(project_id), *journals, lock_path]:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,235 @@
+import os
+import resource
+import threading
+from typing import Optional
+
+from loguru import logger
+
+from app.core.settings import settings
+
+resource_settings = settings.resource_settings
+
+CONTROLLERS = ("cpu", "memory", "pids", "io")
+CPU_PERIOD_USEC = 100_000
+MB = 1024 * 1024
+# Niceness given to sandboxes over their CPU share when cgroups are unavailable
+THROTTLED_NICENESS = 19
+
+_cgroups_ready: Optional[bool] = None
+_cgroups_lock = threading.Lock()
+
+
+def _write(path: str, value: str) -> None:
+    with open(path, "w") as f:
+        f.write(value)
+
+
+def _read_keyed(path: str) -> dict[str, int]:
+    """Parse a flat-keyed cgroup file such as cpu.stat or memory.events."""
+    values = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                key, _, value = line.partition(" ")
+                values[key] = int(value)
+    except (OSError, ValueError):
+        pass
+    return values
+
+
+def _read_int(path: str) -> Optional[int]:
+    try:
+        with open(path) as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def cgroups_available() -> bool:
+    """
+    Whether sandboxes can get their own cgroup: SANDBOX_CGROUP_ROOT must be on cgroup v2, writable,
+    and able to hand the cpu, memory, pids and io controllers to its children. Checked once per process.
+    """
+    global _cgroups_ready
+    with _cgroups_lock:
+        if _cgroups_ready is None:
+            _cgroups_ready = resource_settings.SANDBOX_CGROUP_ENABLED and _prepare_cgroup_root()
+        return _cgroups_ready
+
+
+def _prepare_cgroup_root() -> bool:
+    root = resource_settings.SANDBOX_CGROUP_ROOT
+    try:
+        os.makedirs(root, exist_ok=True)
+        with open(os.path.join(root, "cgroup.controllers")) as f:
+            available = set(f.read().split())
+        missing = [name for name in CONTROLLERS if name not in available]
+        if missing:
+            logger.warning("cgroup {} lacks controllers {}, falling back to rlimits", root, missing)
+            return False
+        _write(os.path.join(root, "cgroup.subtree_control"), " ".join(f"+{name}" for name in CONTROLLERS))
+        return True
+    except OSError as e:
+        logger.warning("cgroup v2 is not usable at {} ({}), falling back to rlimits", root, e)
+        return False
+
+
+def cgroup_path(project_id: str) -> str:
+    return os.path.join(resource_settings.SANDBOX_CGROUP_ROOT, project_id)
+
+
+def _limit(value_mb: int) -> str:
+    return str(value_mb * MB) if value_mb else "max"
+
+
+def _create_cgroup(project_id: str) -> str:
+    path = cgroup_path(project_id)
+    os.makedirs(path, exist_ok=True)
+    cpu_quota = resource_settings.SANDBOX_CPU_MAX_PERCENT * CPU_PERIOD_USEC // 100
+    _write(os.path.join(path, "cpu.weight"), str(resource_settings.SANDBOX_CPU_WEIGHT))
+    _write(os.path.join(path, "cpu.max"), f"{cpu_quota or 'max'} {CPU_PERIOD_USEC}")
+    _write(os.path.join(path, "memory.high"), _limit(resource_settings.SANDBOX_MEMORY_HIGH_MB))
+    _write(os.path.join(path, "memory.max"), _limit(resource_settings.SANDBOX_MEMORY_MAX_MB))
+    _write(os.path.join(path, "pids.max"), str(resource_settings.SANDBOX_PIDS_MAX or "max"))
+    # An OOM kill takes down the whole sandbox, so the monitor restarts it from a clean state
+    _write(os.path.join(path, "memory.oom.group"), "1")
+    return path
+
+
+def _apply_rlimits(pid: int) -> None:
+    if resource_settings.SANDBOX_MEMORY_MAX_MB:
+        limit = resource_settings.SANDBOX_MEMORY_MAX_MB * MB
+        resource.prlimit(pid, resource.RLIMIT_DATA, (limit, limit))
+
+
+def apply_limits(project_id: str, pid: int) -> Optional[str]:
+    """
+    Confine a freshly started sandbox process, returning the mechanism used ("cgroup", "rlimit") or None.
+
+    The process is moved into its own cgroup right after spawning, before it has started any children.
+    Without cgroup v2 the memory limit becomes an RLIMIT_DATA and the CPU share is enforced by the
+    monitor lowering the priority of sandboxes that exceed it.
+    """
+    try:
+        if cgroups_available():
+            _write(os.path.join(_create_cgroup(project_id), "cgroup.procs"), str(pid))
+            return "cgroup"
+        _apply_rlimits(pid)
+        return "rlimit"
+    except (OSError, ValueError) as e:
+        logger.error("Could not apply resource limits to sandbox {} (PID {}): {}", project_id, pid, e)
+        return None
+
+
+def remove_cgroup(project_id: str) -> None:
+    """Kill anything left in a sandbox's cgroup and remove it."""
+    path = cgroup_path(project_id)
+    if not os.path.isdir(path):
+        return
+    try:
+        kill_file = os.path.join(path, "cgroup.kill")
+        if os.path.exists(kill_file):
+            _write(kill_file, "1")
+        os.rmdir(path)
+    except OSError as e:
+        logger.warning("Could not remove cgroup of sandbox {}: {}", project_id, e)
+
+
+def _io_bytes(path: str) -> tuple[int, int]:
+    read_bytes = write_bytes = 0
+    try:
+        with open(path) as f:
+            for line in f:
+                for field in line.split()[1:]:
+                    key, _, value = field.partition("=")
+                    if key == "rbytes":
+                        read_bytes += int(value)
+                    elif key == "wbytes":
+                        write_bytes += int(value)
+    except (OSError, ValueError):
+        pass
+    return read_bytes, write_bytes
+
+
+def _sample_cgroup(path: str) -> dict:
+    cpu = _read_keyed(os.path.join(path, "cpu.stat"))
+    events = _read_keyed(os.path.join(path, "memory.events"))
+    read_bytes, write_bytes = _io_bytes(os.path.join(path, "io.stat"))
+    return {
+        "source": "cgroup",
+        "cpu_usec": cpu.get("usage_usec", 0),
+        "cpu_throttled_usec": cpu.get("throttled_usec", 0),
+        "memory_bytes": _read_int(os.path.join(path, "memory.current")) or 0,
+        "memory_high_events": events.get("high", 0),
+        "oom_kills": events.get("oom_kill", 0),
+        "pids": _read_int(os.path.join(path, "pids.current")) or 0,
+        "io_read_bytes": read_bytes,
+        "io_write_bytes": write_bytes,
+    }
+
+
+def _read_status(pid: int) -> dict[str, str]:
+    values = {}
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            values[key] = value.strip()
+    return values
+
+
+def _sample_process(pid: int) -> Optional[dict]:
+    """Usage of the sandbox's main process from /proc, for hosts without cgroups."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # Fields after the parenthesised command name; utime and stime are the 12th and 13th
+            fields = f.read().rsplit(")", 1)[1].split()
+        ticks = os.sysconf("SC_CLK_TCK")
+        cpu_usec = (int(fields[11]) + int(fields[12])) * 1_000_000 // ticks
+        memory_bytes = int(_read_status(pid).get("VmRSS", "0 kB").split()[0]) * 1024
+    except (OSError, IndexError, ValueError):
+        return None
+
+    io = {}
+    try:
+        with open(f"/proc/{pid}/io") as f:
+            io = {key: int(value) for key, value in (line.split(": ") for line in f)}
+    except (OSError, ValueError):
+        pass
+    return {
+        "source": "process",
+        "cpu_usec": cpu_usec,
+        "memory_bytes": memory_bytes,
+        "pids": 1,
+        "io_read_bytes": io.get("read_bytes", 0),
+        "io_write_bytes": io.get("write_bytes", 0),
+    }
+
+
+def sample_usage(project_id: str, pid: int) -> Optional[dict]:
+    """Cumulative CPU, memory, pids and I/O counters of a sandbox; None when it is not running."""
+    path = cgroup_path(project_id)
+    if cgroups_available() and os.path.isdir(path):
+        return _sample_cgroup(path)
+    return _sample_process(pid)
+
+
+def process_running(pid: int) -> bool:
+    """Whether `pid` is alive; zombies count as exited and are reaped when they are our children."""
+    try:
+        os.waitpid(pid, os.WNOHANG)
+    except ChildProcessError:
+        pass
+    try:
+        return _read_status(pid).get("State", "").split()[0] not in ("Z", "X")
+    except (OSError, IndexError):
+        return False
+
+
+def throttle_process(pid: int) -> bool:
+    """Drop a sandbox to the lowest CPU priority; unprivileged processes cannot raise it again."""
+    try:
+        os.setpriority(os.PRIO_PROCESS, pid, THROTTLED_NICENESS)
+        return True
+    except OSError as e:
+        logger.warning("Could not throttle sandbox process {}: {}", pid, e)
+        return False
@@ -0,0 +1,227 @@
+import asyncio
+import os
+import time
+from typing import Optional
+
+import orjson
+from loguru import logger
+from redis import RedisError
+from sqlalchemy import cast, func, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlmodel import Session, select
+
+from app.core.settings import settings
+from app.database.engine import engine
+from app.database.models import Project
+from app.database.redis_client import redis_client
+from app.services.cache.entity_cache import project_cache
+from app.services.sandbox.resource_limits import (
+    MB,
+    cgroup_path,
+    cgroups_available,
+    process_running,
+    remove_cgroup,
+    sample_usage,
+    throttle_process,
+)
+from app.services.sandbox.sandbox_manager import setup_sandbox
+from app.services.sandbox.server_manager import stop_server
+
+resource_settings = settings.resource_settings
+
+
+def _claim_sweep() -> bool:
+    """One sweep per host and interval, however many API worker processes run the monitor."""
+    key = f"sandbox:monitor:{settings.sandbox_settings.NODE_ID}"
+    ttl = max(1, resource_settings.SANDBOX_MONITOR_INTERVAL_SECONDS - 1)
+    try:
+        return bool(redis_client.set(key, os.getpid(), nx=True, ex=ttl))
+    except RedisError as e:
+        logger.warning("Could not claim sandbox monitor sweep: {}", e)
+        return False
+
+
+def _usage_key(project_id: str) -> str:
+    return f"sandbox:usage:{project_id}"
+
+
+def get_usage(project_id: str) -> Optional[dict]:
+    """Latest usage sample of a locally hosted sandbox, if it was sampled recently."""
+    data = redis_client.get(_usage_key(project_id))
+    return orjson.loads(data) if data else None
+
+
+def _load_samples(project_ids: list[str]) -> dict[str, dict]:
+    if not project_ids:
+        return {}
+    try:
+        values = redis_client.mget([_usage_key(project_id) for project_id in project_ids])
+    except RedisError as e:
+        logger.warning("Could not load sandbox usage samples: {}", e)
+        return {}
+    return {project_id: orjson.loads(value) for project_id, value in zip(project_ids, values) if value}
+
+
+def _store_samples(samples: dict[str, Optional[dict]]) -> None:
+    """Store the new samples; None drops a sandbox's sample, e.g. after a restart."""
+    # Samples of sandboxes that stopped being sampled expire after a few missed sweeps
+    ttl = resource_settings.SANDBOX_MONITOR_INTERVAL_SECONDS * 3
+    pipe = redis_client.pipeline(transaction=False)
+    for project_id, usage in samples.items():
+        if usage is None:
+            pipe.delete(_usage_key(project_id))
+        else:
+            pipe.set(_usage_key(project_id), orjson.dumps(usage), ex=ttl)
+    try:
+        pipe.execute()
+    except RedisError as e:
+        logger.warning("Could not store sandbox usage samples: {}", e)
+
+
+def _cpu_percent(usage: dict, previous: Optional[dict]) -> Optional[float]:
+    if not previous or "cpu_usec" not in previous or usage["cpu_usec"] < previous["cpu_usec"]:
+        return None
+    elapsed = usage["sampled_at"] - previous["sampled_at"]
+    if elapsed <= 0:
+        return None
+    return round((usage["cpu_usec"] - previous["cpu_usec"]) / (elapsed * 10_000), 1)
+
+
+def _limit_reason(usage: dict) -> Optional[str]:
+    """Why a running sandbox must be restarted, if it must; only needed without cgroups to enforce limits."""
+    if usage["source"] != "process":
+        return None
+    if resource_settings.SANDBOX_MEMORY_MAX_MB and usage["memory_bytes"] > resource_settings.SANDBOX_MEMORY_MAX_MB * MB:
+        return "memory_limit"
+    return None
+
+
+def _restart(session: Session, project: Project, reason: str) -> None:
+    metadata = project.project_metadata or {}
+    restarts = metadata.get("restarts", 0)
+    if process_running(project.server_pid):
+        stop_server(project.server_pid)
+    remove_cgroup(project.id)
+
+    if restarts >= resource_settings.SANDBOX_MAX_RESTARTS:
+        logger.error("Sandbox {} stopped ({}) after {} restarts, giving up", project.id, reason, restarts)
+        pid = None
+        patch = {"sandbox_status": "crashed", "sandbox_error": f"Stopped ({reason}) after {restarts} restarts"}
+    else:
+        logger.warning("Restarting sandbox {} ({})", project.id, reason)
+        message, pid = setup_sandbox(project.id, project.port, metadata.get("template"))
+        patch = {
+            "restarts": restarts + 1,
+            "sandbox_status": "initialized" if pid else "failed",
+            "sandbox_error": message,
+        }
+    patch["last_restart_reason"] = reason
+
+    # Merged in SQL so metadata written concurrently by the API is kept
+    merged = func.coalesce(Project.project_metadata, cast({}, JSONB)).op("||")(cast(patch, JSONB))
+    session.execute(update(Project).where(Project.id == project.id).values(server_pid=pid, project_metadata=merged))
+    session.commit()
+    # Reflects the new process for the sweep without leaving the row dirty for the next flush
+    set_committed_value(project, "server_pid", pid)
+
+
+def _check(session: Session, project: Project, previous: Optional[dict]) -> Optional[dict]:
+    """Sample one sandbox and act on it; returns the new sample, or None when the sandbox was restarted."""
+    usage = sample_usage(project.id, project.server_pid) if process_running(project.server_pid) else None
+
+    if usage is None:
+        _restart(session, project, "oom_killed" if _was_oom_killed(project.id, previous) else "exited")
+        return None
+
+    usage["sampled_at"] = time.time()
+    usage["cpu_percent"] = _cpu_percent(usage, previous)
+    usage["throttled"] = bool(previous and previous.get("throttled"))
+
+    reason = _limit_reason(usage)
+    if reason:
+        _restart(session, project, reason)
+        return None
+
+    # Without cgroups CPU quotas cannot be enforced; a sandbox over its share is deprioritised instead
+    cpu_max = resource_settings.SANDBOX_CPU_MAX_PERCENT
+    if usage["source"] == "process" and cpu_max and (usage["cpu_percent"] or 0) > cpu_max and not usage["throttled"]:
+        usage["throttled"] = throttle_process(project.server_pid)
+        logger.warning("Sandbox {} used {}% CPU, lowered its priority", project.id, usage["cpu_percent"])
+
+    return usage
+
+
+def _was_oom_killed(project_id: str, previous: Optional[dict]) -> bool:
+    """Whether the kernel OOM-killed the sandbox since its last sample; the cgroup outlives its processes."""
+    try:
+        with open(os.path.join(cgroup_path(project_id), "memory.events")) as f:
+            events = dict(line.split() for line in f)
+        return int(events.get("oom_kill", 0)) > (previous or {}).get("oom_kills", 0)
+    except (OSError, ValueError):
+        return False
+
+
+def _remove_stale_cgroups(running: set[str]) -> None:
+    """Remove the empty cgroups of stopped sandboxes; rmdir fails on any that still hold processes."""
+    root = resource_settings.SANDBOX_CGROUP_ROOT
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        if name in running or not os.path.isdir(path):
+            continue
+        try:
+            os.rmdir(path)
+        except OSError:
+            pass
+
+
+def sweep() -> None:
+    """
+    Sample every locally hosted sandbox and act on what it finds.
+
+    Usage (CPU, memory, pids, I/O counters plus the CPU share since the last sample) is kept in Redis,
+    so a sweep writes no rows for healthy sandboxes. Sandboxes whose process is gone (an OOM kill takes
+    the whole cgroup down) are restarted up to SANDBOX_MAX_RESTARTS times, then marked crashed; only
+    those rows are updated.
+    """
+    if not _claim_sweep():
+        return
+
+    with Session(engine, expire_on_commit=False) as session:
+        projects = session.exec(
+            select(Project).where(
+                Project.is_deleted == False,  # noqa: E712
+                Project.node_id == None,  # noqa: E711
+                Project.server_pid != None,  # noqa: E711
+            )
+        ).all()
+        project_ids = [project.id for project in projects]
+        previous_samples = _load_samples(project_ids)
+        samples: dict[str, Optional[dict]] = {}
+        running: set[str] = set()
+        for project_id, project in zip(project_ids, projects):
+            try:
+                samples[project_id] = _check(session, project, previous_samples.get(project_id))
+                if project.server_pid:
+                    running.add(project_id)
+            except Exception as e:
+                session.rollback()
+                running.add(project_id)
+                logger.warning("Failed to check sandbox {}: {}", project_id, e)
+        restarted = [project_id for project_id, usage in samples.items() if usage is None]
+        if restarted:
+            project_cache.invalidate(restarted)
+
+    _store_samples(samples)
+
+    if cgroups_available():
+        _remove_stale_cgroups(running)
+
+
+async def monitor_sandboxes() -> None:
+    while True:
+        await asyncio.sleep(resource_settings.SANDBOX_MONITOR_INTERVAL_SECONDS)
+        try:
+            await asyncio.to_thread(sweep)
+        except Exception as e:
+            logger.warning("Sandbox monitor sweep failed: {}", e)
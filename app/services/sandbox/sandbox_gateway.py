@@ -0,0 +1,119 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from loguru import logger
+
+from app.core.settings import settings
+from app.schema.search_schema import SearchHit
+from app.services.sandbox import node_client
+from app.services.sandbox.asset_pipeline import asset_pipeline
+from app.services.sandbox.file_manifest import file_manifest, render_manifest
+from app.services.sandbox.paths import project_file, replace_file
+from app.services.sandbox.sandbox_manager import purge_sandbox, setup_sandbox
+from app.services.sandbox.scheduler import pick_node
+from app.services.sandbox.server_manager import stop_server
+from app.services.search.code_index import SearchMode, code_index
+
+
+def provision_sandbox(
+    project_id: str, port: int, template: Optional[str] = None
+) -> tuple[str, Optional[int], Optional[str]]:
+    """
+    Create and start a sandbox, returning (message, pid, node_id).
+
+    In local mode the sandbox runs on this host and node_id is None; in cluster mode the scheduler
+    picks a node and the call is forwarded to its node agent.
+    """
+    if settings.sandbox_settings.SANDBOX_MODE == "local":
+        message, pid = setup_sandbox(project_id, port, template)
+        return message, pid, None
+
+    node = pick_node()
+    if node is None:
+        return "No sandbox node with free capacity", None, None
+
+    result = node_client.create_sandbox(node.node_id, project_id, port, template)
+    return result.message, result.pid, node.node_id
+
+
+def teardown_sandbox(node_id: Optional[str], pid: int) -> bool:
+    if node_id is None:
+        return stop_server(pid)
+
+    try:
+        return node_client.stop_sandbox(node_id, pid)
+    except Exception as e:
+        logger.error("Failed to stop process {} on node {}: {}", pid, node_id, e)
+        return False
+
+
+def teardown_sandboxes(
+    targets: list[tuple[Optional[str], int]], max_workers: int = 16
+) -> dict[tuple[Optional[str], int], bool]:
+    """Stop several sandboxes concurrently, returning the result per (node_id, pid)."""
+    if not targets:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(targets))) as executor:
+        return dict(zip(targets, executor.map(lambda target: teardown_sandbox(*target), targets)))
+
+
+def purge_sandbox_files(node_id: Optional[str], project_id: str) -> None:
+    """Remove a project's files and the derived per-project state kept for it."""
+    if node_id is not None:
+        # The node agent drops the derived state it keeps for the project
+        node_client.purge_sandbox(node_id, project_id)
+        return
+
+    purge_sandbox(project_id)
+    code_index.drop(project_id)
+    file_manifest.drop(project_id)
+
+
+def read_project_file(node_id: Optional[str], project_id: str, path: str) -> str:
+    if node_id is not None:
+        return node_client.read_file(node_id, project_id, path)
+
+    with open(project_file(project_id, path), "r") as f:
+        return f.read()
+
+
+def write_project_file(node_id: Optional[str], project_id: str, path: str, content: str) -> None:
+    if node_id is not None:
+        # The node agent writes through this same function, keeping its derived state current
+        node_client.write_file(node_id, project_id, path, content)
+        return
+
+    data = content.encode()
+    replace_file(project_file(project_id, path), data)
+    # Quick drafts only; the full-strength variants are built off the write path
+    asset_pipeline.process_files(project_id, {path: data}, draft=True)
+    record_write(project_id, path, content)
+
+
+def record_write(project_id: str, path: str, content: str) -> None:
+    """Propagate a local file write to the derived per-project state (search index, file manifest)."""
+    try:
+        code_index.update_files(project_id, {path: content})
+        file_manifest.update_files(project_id, {path: content.encode()})
+    except Exception as e:
+        logger.warning("Failed to update derived state for {} in project {}: {}", path, project_id, e)
+
+
+def search_project(
+    node_id: Optional[str], project_id: str, query: str, mode: SearchMode = "auto", limit: Optional[int] = None
+) -> tuple[str, list[SearchHit]]:
+    """Search a project through the index kept on the host that holds its files; see CodeIndexManager.search."""
+    if mode == "regex":
+        # Invalid patterns raise re.error here, whether the project is local or on a node
+        re.compile(query)
+    if node_id is not None:
+        return node_client.search(node_id, project_id, query, mode, limit)
+    return code_index.search(project_id, query, lambda path: read_project_file(None, project_id, path), mode, limit)
+
+
+def render_project_manifest(node_id: Optional[str], project_id: str, max_entries: int) -> str:
+    """The file listing of a project, taken from the manifest kept on the host that holds its files."""
+    manifest = node_client.get_manifest(node_id, project_id) if node_id is not None else file_manifest.get(project_id)
+    return render_manifest(manifest, max_entries)
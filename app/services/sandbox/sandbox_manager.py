@@ -1,62 +1,64 @@
 import os
+import shutil
 import subprocess
 import time
+from typing import Optional
 
 from loguru import logger
 
+from app.core.settings import settings
+from app.services.sandbox.asset_pipeline import asset_pipeline
+from app.services.sandbox.paths import project_dir
+from app.services.sandbox.resource_limits import apply_limits, remove_cgroup
+from app.services.sandbox.template_registry import template_registry
 
-def setup_sandbox(project_id: str, port: int) -> tuple[str, None] | tuple[str, int]:
+
+def setup_sandbox(project_id: str, port: int, template: Optional[str] = None) -> tuple[str, None] | tuple[str, int]:
     """
-    Setup package.json and bun.js server to serve HTML files in the sandbox.
+    Materialise a project template in the sandbox and start its Bun server in the background.
 
-    This function creates:
-    1. A package.json file with bun configuration
-    2. A server.js file that serves HTML files using Bun
-    3. Starts the server in the background
+    Template files are linked from the template store (see TemplateRegistry.materialize) and only
+    when missing, so a directory that already holds a project (an import, a restart) keeps its own
+    files. The port is passed in the PORT environment variable; nothing is rewritten per project.
 
     Returns:
         tuple: (message, pid) - A message indicating the success and the server PID, or (error_message, None) on failure.
     """
-    os.makedirs(f"sandbox/projects/{project_id}", exist_ok=True)
+    directory = project_dir(project_id)
+    os.makedirs(directory, exist_ok=True)
 
     try:
-        logger.info("Setting up sandbox with package.json and Bun server")
-
-        with open("sandbox/templates/package.json", "r") as f:
-            package_json = f.read()
-
-        with open(f"sandbox/projects/{project_id}/package.json", "w+") as f:
-            f.write(package_json)
-        logger.info("Created package.json")
-
-        with open("sandbox/templates/server.js", "r") as f:
-            server_js = f.read().replace("{PORT}", str(port))
+        logger.info("Setting up sandbox for project {}", project_id)
 
-        with open(f"sandbox/projects/{project_id}/server.js", "w+") as f:
-            f.write(server_js)
-        logger.info("Created server.js")
+        project_template = template_registry.get(template)
+        counts = template_registry.materialize(project_template, directory)
+        logger.debug("Materialised template {} for project {}: {}", project_template.ref, project_id, counts)
 
-        with open("sandbox/templates/index.html", "r") as f:
-            index_html = f.read()
+        asset_pipeline.rebuild(project_id)
 
-        with open(f"sandbox/projects/{project_id}/index.html", "w+") as f:
-            f.write(index_html)
-
-        logger.info("Starting Bun server in background")
+        logger.debug("Starting Bun server in background")
+        command = ["bun", "run", "server.js"]
+        env = {**os.environ, "PORT": str(port)}
+        if settings.watcher_settings.LIVE_RELOAD_ENABLED:
+            command.append("--live")
+            env["LIVE_RELOAD_URL"] = f"{settings.watcher_settings.LIVE_RELOAD_API_URL}/projects/{project_id}/changes/"
         process = subprocess.Popen(
-            ["bun", "run", "server.js"],
-            cwd=f"sandbox/projects/{project_id}",
+            command,
+            cwd=directory,
+            env=env,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             start_new_session=True,
         )
-        logger.info(f"Server process created with PID: {process.pid}")
+        logger.debug("Server process created with PID: {}", process.pid)
+        limits = apply_limits(project_id, process.pid)
+        logger.debug("Resource limits of sandbox {}: {}", project_id, limits or "none")
 
         time.sleep(1)
         if process.poll() is not None:
             _, stderr = process.communicate()
             error_msg = stderr.decode()
-            logger.error(f"Server failed to start: {error_msg}")
+            logger.error("Server failed to start: {}", error_msg)
             return f"Error starting server: {error_msg}", None
 
         result = f"Sandbox setup complete! Server running at http://localhost:{port}, PID: {process.pid}"
@@ -64,5 +66,16 @@ def setup_sandbox(project_id: str, port: int) -> tuple[str, None] | tuple[str, i
         return result, process.pid
 
     except Exception as e:
-        logger.error(f"Error setting up sandbox: {e}")
+        logger.error("Error setting up sandbox: {}", e)
         return f"Error setting up sandbox: {e}", None
+
+
+def purge_sandbox(project_id: str) -> bool:
+    """Remove a project's directory from this host; returns False when there was nothing to remove."""
+    directory = project_dir(project_id)
+    remove_cgroup(project_id)
+    if not os.path.isdir(directory):
+        return False
+    shutil.rmtree(directory)
+    logger.info("Purged sandbox directory of project {}", project_id)
+    return True
@@ -0,0 +1,36 @@
+from typing import Optional
+
+from loguru import logger
+
+from app.core.settings import settings
+from app.schema.node_schema import NodeInfo
+from app.services.sandbox.node_registry import list_nodes, reserve_slot
+
+
+def node_has_capacity(node: NodeInfo) -> bool:
+    return (
+        node.running_sandboxes < node.max_sandboxes
+        and node.free_ports > 0
+        and node.mem_available_mb >= settings.sandbox_settings.NODE_MIN_FREE_MEMORY_MB
+    )
+
+
+def node_score(node: NodeInfo) -> float:
+    """Higher is better: the tightest of process slots, ports and memory headroom decides."""
+    slot_headroom = 1 - node.running_sandboxes / max(node.max_sandboxes, 1)
+    port_headroom = node.free_ports / max(node.max_sandboxes, 1)
+    memory_headroom = node.mem_available_mb / (node.mem_available_mb + 1024)
+    return min(slot_headroom, port_headroom, memory_headroom)
+
+
+def pick_node() -> Optional[NodeInfo]:
+    """Choose the live node with the most free capacity and reserve a slot on it."""
+    candidates = [node for node in list_nodes() if node_has_capacity(node)]
+    if not candidates:
+        logger.error("No sandbox node with free capacity")
+        return None
+
+    node = max(candidates, key=node_score)
+    reserve_slot(node.node_id)
+    logger.info("Placed sandbox on node {}", node.node_id)
+    return node
@@ -15,17 +15,17 @@ def stop_server(pid: int) -> bool:
             os.kill(pid, 0)
             # Process still exists, force kill
             os.kill(pid, signal.SIGKILL)
-            logger.warning(f"Force killed server process {pid}")
+            logger.warning("Force killed server process {}", pid)
         except ProcessLookupError:
             # Process already terminated
             pass
 
-        logger.info(f"Server process {pid} stopped")
+        logger.info("Server process {} stopped", pid)
         return True
 
     except ProcessLookupError:
-        logger.warning(f"Process {pid} not found")
+        logger.warning("Process {} not found", pid)
         return False
     except Exception as e:
-        logger.error(f"Error stopping server process {pid}: {e}")
+        logger.error("Error stopping server process {}: {}", pid, e)
         return False
@@ -0,0 +1,222 @@
+import errno
+import fcntl
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+import orjson
+from loguru import logger
+
+from app.core.settings import settings
+
+TEMPLATE_MANIFEST = "template.json"
+# ioctl that makes the destination share the source's extents (btrfs, xfs, bcachefs): a true copy-on-write clone
+FICLONE = 0x40049409
+# Errors meaning the filesystem (or this pair of paths) cannot reflink at all, rather than a one-off failure
+REFLINK_UNSUPPORTED = {errno.EOPNOTSUPP, errno.EXDEV, errno.EINVAL}
+
+
+class TemplateNotFoundError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class Template:
+    name: str
+    version: str
+    description: str
+    files: dict[str, bytes]
+    digest: str
+
+    @property
+    def ref(self) -> str:
+        return f"{self.name}@{self.version}"
+
+
+def _version_key(version: str) -> tuple[int, ...]:
+    return tuple(int(part) for part in version.split("."))
+
+
+class TemplateRegistry:
+    """
+    Named, versioned project templates, loaded once per process and kept in memory.
+
+    Templates live in `<SANDBOX_TEMPLATES_DIR>/<name>/<version>/`; an optional template.json gives a
+    description and a `base` template whose files are inherited. Every template version is written
+    once, read-only, into a store directory keyed by its content digest, and projects are
+    materialised from there by reflink where the filesystem supports it, so unchanged template files
+    cost no disk space and no copying, and by plain copy otherwise. Files are never hardlinked: the
+    store's read-only mode does not stop root, and any in-place write to a linked file would change
+    the template for every project.
+    """
+
+    def __init__(self, templates_dir: str, store_dir: str) -> None:
+        self.templates_dir = templates_dir
+        self.store_dir = store_dir
+        self._templates: Optional[dict[str, dict[str, Template]]] = None
+        self._stored: set[str] = set()
+        self._reflink_supported: Optional[bool] = None
+        self._lock = threading.Lock()
+
+    def _read_tree(self, root: str) -> dict[str, bytes]:
+        files = {}
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                relative_path = os.path.relpath(path, root)
+                if relative_path == TEMPLATE_MANIFEST:
+                    continue
+                with open(path, "rb") as f:
+                    files[relative_path] = f.read()
+        return files
+
+    def _load_version(self, name: str, version: str, sources: dict, loaded: dict, stack: tuple) -> Template:
+        ref = f"{name}@{version}"
+        if ref in loaded:
+            return loaded[ref]
+        if ref in stack:
+            raise TemplateNotFoundError(f"Template {ref} inherits from itself")
+
+        manifest, files = sources[ref]
+        merged: dict[str, bytes] = {}
+        if base_ref := manifest.get("base"):
+            base_name, _, base_version = base_ref.partition("@")
+            if f"{base_name}@{base_version}" not in sources:
+                raise TemplateNotFoundError(f"Base template {base_ref} of {ref} not found")
+            merged.update(self._load_version(base_name, base_version, sources, loaded, (*stack, ref)).files)
+        merged.update(files)
+
+        digest = hashlib.sha256()
+        for path in sorted(merged):
+            digest.update(path.encode() + b"\0" + hashlib.sha256(merged[path]).digest())
+        template = Template(name, version, manifest.get("description", ""), merged, digest.hexdigest()[:16])
+        loaded[ref] = template
+        return template
+
+    def _load(self) -> dict[str, dict[str, Template]]:
+        sources = {}
+        for name in sorted(os.listdir(self.templates_dir)):
+            name_dir = os.path.join(self.templates_dir, name)
+            if not os.path.isdir(name_dir):
+                continue
+            for version in os.listdir(name_dir):
+                version_dir = os.path.join(name_dir, version)
+                try:
+                    _version_key(version)
+                except ValueError:
+                    logger.warning("Ignoring template {} with non-numeric version {}", name, version)
+                    continue
+                manifest_path = os.path.join(version_dir, TEMPLATE_MANIFEST)
+                manifest = {}
+                if os.path.exists(manifest_path):
+                    with open(manifest_path, "rb") as f:
+                        manifest = orjson.loads(f.read())
+                sources[f"{name}@{version}"] = (manifest, self._read_tree(version_dir))
+
+        loaded: dict[str, Template] = {}
+        templates: dict[str, dict[str, Template]] = {}
+        for ref in sources:
+            name, _, version = ref.partition("@")
+            templates.setdefault(name, {})[version] = self._load_version(name, version, sources, loaded, ())
+        logger.info("Loaded {} sandbox templates: {}", len(loaded), ", ".join(sorted(loaded)))
+        return templates
+
+    def _all(self) -> dict[str, dict[str, Template]]:
+        with self._lock:
+            if self._templates is None:
+                self._templates = self._load()
+            return self._templates
+
+    def list(self) -> list[Template]:
+        return [
+            template
+            for versions in self._all().values()
+            for _, template in sorted(versions.items(), key=lambda item: _version_key(item[0]))
+        ]
+
+    def get(self, ref: Optional[str] = None) -> Template:
+        """Resolve `name@version`, or `name` for its latest version; None means the default template."""
+        name, _, version = (ref or settings.sandbox_settings.SANDBOX_DEFAULT_TEMPLATE).partition("@")
+        versions = self._all().get(name)
+        if not versions:
+            raise TemplateNotFoundError(f"Template {name} not found")
+        if not version:
+            version = max(versions, key=_version_key)
+        if version not in versions:
+            raise TemplateNotFoundError(f"Template {name}@{version} not found")
+        return versions[version]
+
+    def _store_path(self, template: Template) -> str:
+        # Keyed by content, so editing a template without bumping its version never alters linked projects
+        return os.path.join(self.store_dir, template.name, f"{template.version}-{template.digest}")
+
+    def _ensure_stored(self, template: Template) -> str:
+        path = self._store_path(template)
+        with self._lock:
+            if path in self._stored or os.path.isdir(path):
+                self._stored.add(path)
+                return path
+
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            staging = tempfile.mkdtemp(dir=os.path.dirname(path))
+            for relative_path, data in template.files.items():
+                file_path = os.path.join(staging, relative_path)
+                os.makedirs(os.path.dirname(file_path), exist_ok=True)
+                with open(file_path, "wb") as f:
+                    f.write(data)
+                os.chmod(file_path, 0o444)
+            try:
+                os.rename(staging, path)
+            except OSError:
+                # Another process stored the same version first
+                shutil.rmtree(staging, ignore_errors=True)
+            self._stored.add(path)
+            return path
+
+    def _reflink(self, source: str, destination: str) -> bool:
+        if self._reflink_supported is False:
+            return False
+        try:
+            with open(source, "rb") as src, open(destination, "wb") as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            self._reflink_supported = True
+            return True
+        except OSError as e:
+            if e.errno in REFLINK_UNSUPPORTED:
+                self._reflink_supported = False
+            else:
+                logger.warning("Reflink of {} failed, copying it instead: {}", source, e)
+            if os.path.exists(destination):
+                os.remove(destination)
+            return False
+
+    def _clone(self, source: str, destination: str) -> str:
+        if settings.sandbox_settings.SANDBOX_TEMPLATE_LINK_MODE == "auto" and self._reflink(source, destination):
+            return "reflink"
+        shutil.copyfile(source, destination)
+        return "copy"
+
+    def materialize(self, template: Template, directory: str) -> dict[str, int]:
+        """
+        Populate `directory` with the template's files that it does not have yet, returning how many
+        files were reflinked or copied. Existing files (imports, restored projects) are kept.
+        """
+        store_path = self._ensure_stored(template)
+        counts = {"reflink": 0, "copy": 0}
+        for relative_path in template.files:
+            destination = os.path.join(directory, relative_path)
+            if os.path.exists(destination):
+                continue
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            counts[self._clone(os.path.join(store_path, relative_path), destination)] += 1
+        return counts
+
+
+template_registry = TemplateRegistry(
+    settings.sandbox_settings.SANDBOX_TEMPLATES_DIR,
+    settings.sandbox_settings.SANDBOX_TEMPLATE_STORE_DIR,
+)
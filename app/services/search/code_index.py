@@ -0,0 +1,277 @@
+import hashlib
+import math
+import os
+import re
+from collections import Counter
+from typing import Callable, Literal, Optional
+
+from loguru import logger
+
+from app.core.settings import settings
+from app.schema.search_schema import SearchHit, SearchMatch
+from app.services.sandbox.paths import project_dir
+from app.services.sandbox.project_state_store import ProjectStateStore
+
+SearchMode = Literal["auto", "grep", "regex", "bm25"]
+
+TOKEN_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|\d+")
+SUBWORD_PATTERN = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+")
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def tokenize(text: str) -> list[str]:
+    """Split code into lowercase identifiers plus their camelCase/snake_case parts."""
+    tokens = []
+    for word in TOKEN_PATTERN.findall(text):
+        tokens.append(word.lower())
+        parts = SUBWORD_PATTERN.findall(word)
+        if len(parts) > 1:
+            tokens.extend(part.lower() for part in parts)
+    return tokens
+
+
+def trigrams(text: str) -> set[str]:
+    lower = text.lower()
+    return {lower[i : i + 3] for i in range(len(lower) - 2)}
+
+
+def is_ignored(path: str) -> bool:
+    ignored = settings.search_settings.SEARCH_IGNORE
+    return any(part in ignored for part in path.split(os.sep))
+
+
+class ProjectIndex:
+    """
+    In-memory inverted index of one project.
+
+    Each document keeps its term frequencies and trigram set so it can be removed from the postings
+    when the file changes; only `docs` is persisted and the postings are rebuilt on load.
+    """
+
+    def __init__(self) -> None:
+        self.docs: dict[str, dict] = {}
+        self.term_postings: dict[str, dict[str, int]] = {}
+        self.trigram_postings: dict[str, set[str]] = {}
+        self.total_length = 0
+
+    @staticmethod
+    def build_doc(content: str, content_hash: str) -> dict:
+        terms = Counter(tokenize(content))
+        return {
+            "hash": content_hash,
+            "length": sum(terms.values()),
+            "terms": dict(terms),
+            "trigrams": sorted(trigrams(content)),
+        }
+
+    def put(self, path: str, doc: dict) -> None:
+        self.remove(path)
+        self.docs[path] = doc
+        self.total_length += doc["length"]
+        for term, count in doc["terms"].items():
+            self.term_postings.setdefault(term, {})[path] = count
+        for trigram in doc["trigrams"]:
+            self.trigram_postings.setdefault(trigram, set()).add(path)
+
+    def remove(self, path: str) -> bool:
+        doc = self.docs.pop(path, None)
+        if doc is None:
+            return False
+
+        self.total_length -= doc["length"]
+        for term in doc["terms"]:
+            postings = self.term_postings.get(term)
+            if postings is not None:
+                postings.pop(path, None)
+                if not postings:
+                    del self.term_postings[term]
+        for trigram in doc["trigrams"]:
+            postings = self.trigram_postings.get(trigram)
+            if postings is not None:
+                postings.discard(path)
+                if not postings:
+                    del self.trigram_postings[trigram]
+        return True
+
+    def grep_candidates(self, literal: str) -> set[str]:
+        """Files that contain every trigram of `literal` (a superset of the files containing it)."""
+        query_trigrams = trigrams(literal)
+        if not query_trigrams:
+            return set(self.docs)
+
+        postings = sorted((self.trigram_postings.get(trigram, set()) for trigram in query_trigrams), key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+            if not candidates:
+                break
+        return candidates
+
+    def bm25(self, query: str, limit: int) -> list[tuple[str, float]]:
+        terms = set(tokenize(query))
+        if not terms or not self.docs:
+            return []
+
+        doc_count = len(self.docs)
+        average_length = self.total_length / doc_count or 1
+        scores: Counter[str] = Counter()
+        for term in terms:
+            postings = self.term_postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for path, frequency in postings.items():
+                length_norm = 1 - BM25_B + BM25_B * self.docs[path]["length"] / average_length
+                scores[path] += idf * frequency * (BM25_K1 + 1) / (frequency + BM25_K1 * length_norm)
+
+        return scores.most_common(limit)
+
+
+class CodeIndexManager(ProjectStateStore[ProjectIndex]):
+    """
+    Loads, incrementally updates and persists the search indexes of the projects on this host.
+
+    The documents of an index are the persisted entries of a ProjectStateStore, so every process
+    searches the same, current index and a write appends only the changed documents.
+    """
+
+    def _new_state(self) -> ProjectIndex:
+        return ProjectIndex()
+
+    def _set_entry(self, state: ProjectIndex, key: str, entry: Optional[dict]) -> None:
+        if entry is None:
+            state.remove(key)
+        else:
+            state.put(key, entry)
+
+    def _entries(self, state: ProjectIndex) -> dict[str, dict]:
+        return state.docs
+
+    def _build(self, project_id: str) -> dict[str, dict]:
+        docs = {}
+        root = project_dir(project_id)
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [name for name in dirnames if not is_ignored(name)]
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                content = self._read_text(path)
+                if content is not None:
+                    content_hash = hashlib.sha256(content.encode()).hexdigest()
+                    docs[os.path.relpath(path, root)] = ProjectIndex.build_doc(content, content_hash)
+        return docs
+
+    @staticmethod
+    def _read_text(path: str) -> Optional[str]:
+        try:
+            if os.path.getsize(path) > settings.search_settings.SEARCH_MAX_FILE_BYTES:
+                return None
+            with open(path, "r") as f:
+                return f.read()
+        except (OSError, UnicodeDecodeError):
+            return None
+
+    def update_files(self, project_id: str, files: dict[str, Optional[str]]) -> None:
+        """Apply changed files to the index; a None content removes the path."""
+        hashed: dict[str, Optional[tuple[str, str]]] = {}
+        for path, content in files.items():
+            path = os.path.normpath(path)
+            data = content.encode() if content is not None else None
+            if data is None or is_ignored(path) or len(data) > settings.search_settings.SEARCH_MAX_FILE_BYTES:
+                hashed[path] = None
+            else:
+                hashed[path] = (content, hashlib.sha256(data).hexdigest())
+
+        def diff(index: ProjectIndex) -> dict[str, Optional[dict]]:
+            changes = {}
+            for path, item in hashed.items():
+                current = index.docs.get(path)
+                if item is None:
+                    if current is not None:
+                        changes[path] = None
+                elif current is None or current["hash"] != item[1]:
+                    changes[path] = ProjectIndex.build_doc(*item)
+            return changes
+
+        self.update(project_id, diff)
+
+    def refresh_paths(self, project_id: str, paths: list[str]) -> None:
+        """Re-read `paths` from the local project directory and update the index."""
+        root = project_dir(project_id)
+        self.update_files(project_id, {path: self._read_text(os.path.join(root, path)) for path in paths})
+
+    def search(
+        self,
+        project_id: str,
+        query: str,
+        read: Callable[[str], str],
+        mode: SearchMode = "auto",
+        limit: Optional[int] = None,
+    ) -> tuple[str, list[SearchHit]]:
+        """
+        Search a project, returning the mode that produced the hits and the hits themselves.
+
+        `grep` is a case-insensitive literal search narrowed by the trigram index, `regex` runs a
+        regular expression over every indexed file, and `bm25` ranks files by term relevance.
+        `auto` tries grep first and falls back to bm25 when nothing matches literally.
+        """
+        limit = limit or settings.search_settings.SEARCH_MAX_RESULTS
+
+        def lookup(index: ProjectIndex) -> tuple[list[str], list[tuple[str, float]]]:
+            if mode in ("auto", "grep"):
+                candidates = sorted(index.grep_candidates(query))
+            elif mode == "regex":
+                candidates = sorted(index.docs)
+            else:
+                candidates = []
+            return candidates, index.bm25(query, limit) if mode in ("auto", "bm25") else []
+
+        candidates, ranked = self.read(project_id, lookup)
+
+        if mode in ("auto", "grep", "regex"):
+            pattern = re.compile(query if mode == "regex" else re.escape(query), re.IGNORECASE)
+            hits = self._match_lines(candidates, pattern, read, limit)
+            if hits or mode != "auto":
+                return ("regex" if mode == "regex" else "grep"), hits
+
+        terms = set(tokenize(query))
+        pattern = re.compile("|".join(re.escape(term) for term in terms), re.IGNORECASE) if terms else None
+        hits = []
+        for path, score in ranked:
+            matches = self._lines(read, path, pattern) if pattern else []
+            hits.append(SearchHit(path=path, score=round(score, 4), matches=matches))
+        return "bm25", hits
+
+    def _match_lines(
+        self, candidates: list[str], pattern: re.Pattern, read: Callable[[str], str], limit: int
+    ) -> list[SearchHit]:
+        hits = []
+        for path in candidates:
+            matches = self._lines(read, path, pattern)
+            if matches:
+                hits.append(SearchHit(path=path, score=float(len(matches)), matches=matches))
+                if len(hits) >= limit:
+                    break
+        return hits
+
+    @staticmethod
+    def _lines(read: Callable[[str], str], path: str, pattern: re.Pattern) -> list[SearchMatch]:
+        try:
+            content = read(path)
+        except Exception as e:
+            logger.warning("Search could not read {}: {}", path, e)
+            return []
+
+        matches = []
+        for number, line in enumerate(content.splitlines(), start=1):
+            if pattern.search(line):
+                matches.append(SearchMatch(line=number, text=line.strip()[:300]))
+                if len(matches) >= settings.search_settings.SEARCH_MAX_MATCHES_PER_FILE:
+                    break
+        return matches
+
+
+code_index = CodeIndexManager(
+    settings.search_settings.SEARCH_INDEX_DIR, settings.search_settings.SEARCH_INDEX_CACHE_SIZE
+)
@@ -0,0 +1,79 @@
+import hashlib
+import os
+import tempfile
+import threading
+
+import zstandard
+
+from app.core.settings import settings
+
+
+class ContentStore:
+    """
+    Content-addressed object store on the local filesystem.
+
+    Objects are zstd-compressed and stored under their SHA-256 digest, so identical content is kept
+    once no matter how many files, turns or projects reference it. Files are split into fixed-size
+    chunks so an edit to a large file only stores the chunks that changed.
+    """
+
+    def __init__(self, root: str, chunk_size: int, level: int) -> None:
+        self.root = root
+        self.chunk_size = chunk_size
+        self.level = level
+        self._local = threading.local()
+
+    def _compressor(self) -> zstandard.ZstdCompressor:
+        if not hasattr(self._local, "compressor"):
+            self._local.compressor = zstandard.ZstdCompressor(level=self.level)
+            self._local.decompressor = zstandard.ZstdDecompressor()
+        return self._local.compressor
+
+    def _decompressor(self) -> zstandard.ZstdDecompressor:
+        self._compressor()
+        return self._local.decompressor
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest[2:])
+
+    def has(self, digest: str) -> bool:
+        return os.path.exists(self._object_path(digest))
+
+    def put_bytes(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if os.path.exists(path):
+            return digest
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(self._compressor().compress(data))
+        os.replace(tmp_path, path)
+        return digest
+
+    def get_bytes(self, digest: str) -> bytes:
+        with open(self._object_path(digest), "rb") as f:
+            return self._decompressor().decompress(f.read())
+
+    def put_file(self, path: str) -> tuple[str, list[str], int]:
+        """Store a file, returning (content digest, chunk digests, size)."""
+        file_hash = hashlib.sha256()
+        chunks = []
+        size = 0
+        with open(path, "rb") as f:
+            while chunk := f.read(self.chunk_size):
+                file_hash.update(chunk)
+                chunks.append(self.put_bytes(chunk))
+                size += len(chunk)
+        return file_hash.hexdigest(), chunks, size
+
+    def read_chunks(self, chunks: list[str]) -> bytes:
+        return b"".join(self.get_bytes(digest) for digest in chunks)
+
+
+content_store = ContentStore(
+    root=settings.snapshot_settings.SNAPSHOT_STORE_DIR,
+    chunk_size=settings.snapshot_settings.SNAPSHOT_CHUNK_SIZE,
+    level=settings.snapshot_settings.SNAPSHOT_ZSTD_LEVEL,
+)
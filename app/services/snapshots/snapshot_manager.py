@@ -0,0 +1,177 @@
+import difflib
+import os
+from typing import Optional
+
+import orjson
+from loguru import logger
+from sqlmodel import Session, func, select
+
+from app.core.settings import settings
+from app.database.engine import engine
+from app.database.models import Snapshot
+from app.services.sandbox.asset_pipeline import asset_pipeline
+from app.services.sandbox.file_manifest import file_manifest
+from app.services.sandbox.paths import project_dir
+from app.services.search.code_index import code_index
+from app.services.snapshots.content_store import ContentStore, content_store
+
+# A manifest maps each relative path to {"hash", "size", "mtime_ns", "chunks"}.
+Manifest = dict[str, dict]
+
+
+def scan_project(project_id: str, base: Optional[Manifest] = None, store: ContentStore = content_store) -> Manifest:
+    """
+    Build the manifest of a project directory, storing any new content.
+
+    Files whose size and mtime match the `base` manifest reuse its entry without being read, so a
+    scan costs O(changed files) of I/O on top of a directory walk.
+    """
+    base = base or {}
+    root = project_dir(project_id)
+    ignored = set(settings.snapshot_settings.SNAPSHOT_IGNORE)
+    manifest: Manifest = {}
+
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [name for name in dirnames if name not in ignored]
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            relative_path = os.path.relpath(path, root)
+            stat = os.stat(path)
+
+            previous = base.get(relative_path)
+            if previous and previous["size"] == stat.st_size and previous["mtime_ns"] == stat.st_mtime_ns:
+                manifest[relative_path] = previous
+                continue
+
+            file_hash, chunks, size = store.put_file(path)
+            manifest[relative_path] = {
+                "hash": file_hash,
+                "size": size,
+                "mtime_ns": stat.st_mtime_ns,
+                "chunks": chunks,
+            }
+
+    return manifest
+
+
+def load_manifest(manifest_hash: str, store: ContentStore = content_store) -> Manifest:
+    return orjson.loads(store.get_bytes(manifest_hash))
+
+
+def latest_snapshot(session: Session, project_id: str) -> Optional[Snapshot]:
+    statement = (
+        select(Snapshot)
+        .where(Snapshot.project_id == project_id, Snapshot.is_deleted == False)  # noqa: E712
+        .order_by(Snapshot.created_at.desc())
+    )
+    return session.exec(statement).first()
+
+
+def create_snapshot(session: Session, project_id: str, session_id: Optional[str] = None) -> Snapshot:
+    """Record a snapshot of the project's current files, deduplicated against everything already stored."""
+    parent = latest_snapshot(session, project_id)
+    base = load_manifest(parent.manifest_hash) if parent else None
+    manifest = scan_project(project_id, base)
+    manifest_hash = content_store.put_bytes(orjson.dumps(manifest, option=orjson.OPT_SORT_KEYS))
+
+    turn = 0
+    if session_id:
+        turn = session.exec(
+            select(func.count())
+            .select_from(Snapshot)
+            .where(Snapshot.session_id == session_id, Snapshot.is_deleted == False)  # noqa: E712
+        ).one()
+
+    snapshot = Snapshot(
+        project_id=project_id,
+        session_id=session_id,
+        parent_id=parent.id if parent else None,
+        turn=turn,
+        manifest_hash=manifest_hash,
+        file_count=len(manifest),
+        total_size=sum(entry["size"] for entry in manifest.values()),
+    )
+    session.add(snapshot)
+    session.commit()
+    session.refresh(snapshot)
+    logger.info("Recorded snapshot {} for project {} ({} files)", snapshot.id, project_id, snapshot.file_count)
+    return snapshot
+
+
+def record_turn_snapshot(project_id: str, session_id: str) -> None:
+    """Snapshot a project after an agent turn; failures are logged and never fail the turn."""
+    try:
+        with Session(engine) as session:
+            create_snapshot(session, project_id, session_id)
+    except Exception as e:
+        logger.error("Failed to snapshot project {}: {}", project_id, e)
+
+
+def diff_manifests(old: Manifest, new: Manifest) -> dict[str, list[str]]:
+    added = sorted(path for path in new if path not in old)
+    removed = sorted(path for path in old if path not in new)
+    modified = sorted(path for path in new if path in old and new[path]["hash"] != old[path]["hash"])
+    return {"added": added, "removed": removed, "modified": modified}
+
+
+def unified_patch(old: Manifest, new: Manifest, changes: dict[str, list[str]]) -> dict[str, str]:
+    """Text diffs for every changed path; binary content is reported without a patch body."""
+    patches = {}
+    for path in changes["added"] + changes["removed"] + changes["modified"]:
+        try:
+            before = content_store.read_chunks(old[path]["chunks"]).decode() if path in old else ""
+            after = content_store.read_chunks(new[path]["chunks"]).decode() if path in new else ""
+        except UnicodeDecodeError:
+            patches[path] = "Binary files differ"
+            continue
+        patches[path] = "".join(
+            difflib.unified_diff(
+                before.splitlines(keepends=True),
+                after.splitlines(keepends=True),
+                fromfile=f"a/{path}",
+                tofile=f"b/{path}",
+            )
+        )
+    return patches
+
+
+def restore_snapshot(session: Session, snapshot: Snapshot) -> dict[str, list[str]]:
+    """
+    Bring the project directory back to `snapshot`, touching only the files that differ.
+
+    The current state is scanned against the latest snapshot (so unchanged files are not read), then
+    only added/modified paths are rewritten and extra paths removed. Restored files get the snapshot's
+    mtime so the next scan recognises them without rehashing.
+    """
+    target = load_manifest(snapshot.manifest_hash)
+    latest = latest_snapshot(session, snapshot.project_id)
+    current = scan_project(snapshot.project_id, load_manifest(latest.manifest_hash) if latest else None)
+    changes = diff_manifests(current, target)
+    root = project_dir(snapshot.project_id)
+
+    for relative_path in changes["removed"]:
+        os.remove(os.path.join(root, relative_path))
+
+    for relative_path in changes["added"] + changes["modified"]:
+        entry = target[relative_path]
+        path = os.path.join(root, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.restore"
+        with open(tmp_path, "wb") as f:
+            f.write(content_store.read_chunks(entry["chunks"]))
+        os.replace(tmp_path, path)
+        os.utime(path, ns=(entry["mtime_ns"], entry["mtime_ns"]))
+
+    changed_paths = changes["added"] + changes["modified"] + changes["removed"]
+    code_index.refresh_paths(snapshot.project_id, changed_paths)
+    file_manifest.refresh_paths(snapshot.project_id, changed_paths)
+    asset_pipeline.refresh_paths(snapshot.project_id, changed_paths)
+
+    logger.info(
+        "Restored project {} to snapshot {}: {} written, {} removed",
+        snapshot.project_id,
+        snapshot.id,
+        len(changes["added"]) + len(changes["modified"]),
+        len(changes["removed"]),
+    )
+    return changes
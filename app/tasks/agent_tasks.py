@@ -0,0 +1,43 @@
+from typing import Optional
+
+from loguru import logger
+
+from app.celery import app
+from app.services.llm.dataclasses.project_info import ProjectInfo
+from app.services.relay.run_relay import relay_agent_run
+from app.utils.event_loop import run_in_background_loop
+
+
+@app.task(name="agent.run", ignore_result=True)
+def run_agent_task(
+    run_id: str,
+    session_id: str,
+    project: dict,
+    messages: list,
+    verbose: bool = False,
+    max_seconds: int = 0,
+    max_tokens: int = 0,
+    profile_id: Optional[str] = None,
+) -> None:
+    """
+    Execute an agent turn on a worker and relay its events through Redis.
+
+    Worker threads only block on the result; every run shares the process-wide event loop, so a
+    single worker process multiplexes many concurrent LLM streams. When the request that queued the
+    run was profiled, the run is profiled too and stored as `<profile_id>-worker` on this host.
+    """
+    logger.info("Starting agent run {} for session {}", run_id, session_id)
+    run = relay_agent_run(
+        run_id,
+        session_id,
+        ProjectInfo(**project),
+        messages,
+        verbose=verbose,
+        max_seconds=max_seconds,
+        max_tokens=max_tokens,
+    )
+    if profile_id:
+        from app.services.profiling.profiler import profile_coroutine
+
+        run = profile_coroutine(run, f"{profile_id}-worker", {"task": "agent.run", "run_id": run_id})
+    run_in_background_loop(run)
@@ -0,0 +1,24 @@
+from loguru import logger
+
+from app.celery import app
+from app.core.settings import settings
+from app.database.engine import engine
+from app.database.partitions import ensure_monthly_partitions
+from app.services.archive.archiver import compact
+
+
+@app.task(name="maintenance.compact_archive", ignore_result=True)
+def compact_archive_task() -> None:
+    """Move deleted and long-inactive data to cold storage."""
+    if not settings.archive_settings.ARCHIVE_ENABLED:
+        return
+    compact()
+
+
+@app.task(name="maintenance.ensure_partitions", ignore_result=True)
+def ensure_partitions_task() -> None:
+    """Create the upcoming monthly partitions of the session table ahead of time."""
+    with engine.begin() as connection:
+        created = ensure_monthly_partitions(connection, "session", settings.archive_settings.PARTITION_MONTHS_AHEAD)
+    if created:
+        logger.info("Created session partitions: {}", created)
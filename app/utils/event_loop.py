@@ -0,0 +1,21 @@
+import asyncio
+import threading
+from typing import Any, Coroutine
+
+_loop: asyncio.AbstractEventLoop | None = None
+_lock = threading.Lock()
+
+
+def get_background_loop() -> asyncio.AbstractEventLoop:
+    """Return a process-wide event loop running in a daemon thread, starting it on first use."""
+    global _loop
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="background-event-loop", daemon=True).start()
+        return _loop
+
+
+def run_in_background_loop(coro: Coroutine[Any, Any, Any]) -> Any:
+    """Run `coro` on the shared background loop and block the calling thread until it finishes."""
+    return asyncio.run_coroutine_threadsafe(coro, get_background_loop()).result()
@@ -1,5 +1,8 @@
 import bson
 
+# Shape of the ids generate_id returns, for validating ids that arrive from outside
+ID_PATTERN = r"^[0-9a-f]{24}$"
+
 
 def generate_id():
     return str(bson.ObjectId())
@@ -0,0 +1,82 @@
+import json
+import random
+import threading
+import time
+import traceback
+
+
+def json_formatter(record: dict) -> str:
+    """Render a loguru record as a single compact JSON line."""
+    payload = {
+        "time": record["time"].isoformat(),
+        "level": record["level"].name,
+        "logger": record["name"],
+        "function": record["function"],
+        "line": record["line"],
+        "message": record["message"],
+    }
+
+    extra = {key: value for key, value in record["extra"].items() if key != "_json"}
+    if extra:
+        payload["extra"] = extra
+
+    if record["exception"] is not None:
+        exc_type, exc_value, exc_tb = record["exception"]
+        payload["exception"] = "".join(traceback.format_exception(exc_type, exc_value, exc_tb))
+
+    record["extra"]["_json"] = json.dumps(payload, default=str, separators=(",", ":"))
+    return "{extra[_json]}\n"
+
+
+class HotPathSampler:
+    """
+    Loguru filter that rate limits and samples messages from hot-path loggers.
+
+    Records from loggers in `logger_names` at or below `max_level_no` go through a per-logger
+    token bucket (`rate_limit` messages per second) and are then sampled at `sample_rate`.
+    Warnings and errors always pass. One sampler is shared by all sinks so that a message is
+    either written everywhere or dropped everywhere.
+    """
+
+    def __init__(
+        self,
+        logger_names: list[str],
+        rate_limit: float,
+        sample_rate: float = 1.0,
+        max_level_no: int = 20,
+    ) -> None:
+        self.logger_names = set(logger_names)
+        self.rate_limit = rate_limit
+        self.sample_rate = sample_rate
+        self.max_level_no = max_level_no
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _take_token(self, name: str) -> bool:
+        if self.rate_limit <= 0:
+            return True
+
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(name, (self.rate_limit, now))
+            tokens = min(self.rate_limit, tokens + (now - last) * self.rate_limit)
+            if tokens < 1:
+                self._buckets[name] = (tokens, now)
+                return False
+            self._buckets[name] = (tokens - 1, now)
+            return True
+
+    def __call__(self, record: dict) -> bool:
+        name = record["name"]
+        if name not in self.logger_names or record["level"].no > self.max_level_no:
+            return True
+
+        # Every sink's filter sees the same record, so decide once per log call and reuse it for the others
+        last = getattr(self._local, "last", None)
+        if last is not None and last[0] is record:
+            return last[1]
+
+        keep = self._take_token(name) and (self.sample_rate >= 1 or random.random() < self.sample_rate)
+        self._local.last = (record, keep)
+        return keep
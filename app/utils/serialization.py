@@ -0,0 +1,19 @@
+from typing import Any
+
+import orjson
+
+
+def _default(obj: Any) -> Any:
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    return str(obj)
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize to JSON bytes with orjson, falling back to `model_dump`/`str` for unknown types."""
+    return orjson.dumps(obj, default=_default)
+
+
+def dumps_line(obj: Any) -> bytes:
+    """Serialize a single newline-delimited JSON chunk."""
+    return orjson.dumps(obj, default=_default, option=orjson.OPT_APPEND_NEWLINE)
@@ -0,0 +1,97 @@
+"""
+Measure per-request logging overhead of the legacy and current logger configurations.
+
+A simulated request emits the same INFO messages as the sandbox services on the request path.
+The legacy profile reproduces the previous defaults (synchronous `print` console sink, synchronous
+file sink, `diagnose=True`); the current profile uses `LoggerSettings` as configured today.
+
+Usage:
+    uv run python -m benchmarks.logging_overhead --requests 5000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from loguru import logger
+
+from app.core.extended_settings.logger_settings import LoggerSettings
+
+MESSAGES_PER_REQUEST = 5
+
+
+def _legacy_setup(log_path: str, console_path: str) -> None:
+    console = open(console_path, "w")
+    logger.remove()
+    logger.add(
+        log_path,
+        level="INFO",
+        format=LoggerSettings().format_file,
+        backtrace=True,
+        diagnose=True,
+        enqueue=False,
+    )
+    logger.add(
+        lambda msg: print(msg, end="", file=console),
+        level="INFO",
+        format=LoggerSettings().format_console,
+        colorize=True,
+        backtrace=True,
+        diagnose=True,
+        enqueue=False,
+    )
+
+
+def _current_setup(log_path: str, console_path: str, json_lines: bool) -> None:
+    logger.remove()
+    config = LoggerSettings(file_path=log_path, file_json=json_lines, console_json=json_lines)
+
+    file_config = config.get_file_config()
+    logger.add(**file_config)
+
+    console_config = config.get_console_config()
+    console_config["sink"] = open(console_path, "w")
+    logger.add(**console_config)
+
+
+def _simulate_request(index: int) -> None:
+    hot_logger = logger.patch(lambda record: record.update(name="app.services.sandbox.port_manager"))
+    hot_logger.info("Generated available port: {}", 3000 + index % 1000)
+    hot_logger.info("Port {} is {}", 3000 + index % 1000, "available")
+    for _ in range(MESSAGES_PER_REQUEST - 2):
+        hot_logger.info("Server process {} stopped", index)
+
+
+def _run(requests: int) -> float:
+    start = time.perf_counter()
+    for index in range(requests):
+        _simulate_request(index)
+    return (time.perf_counter() - start) / requests * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "app.log")
+        console_path = os.path.join(tmp, "console.log")
+
+        profiles = [
+            ("legacy (sync, diagnose)", lambda: _legacy_setup(log_path, console_path)),
+            ("current (enqueue, sampled)", lambda: _current_setup(log_path, console_path, json_lines=False)),
+            ("current (enqueue, sampled, json)", lambda: _current_setup(log_path, console_path, json_lines=True)),
+        ]
+
+        for label, setup in profiles:
+            setup()
+            per_request = _run(args.requests)
+            logger.complete()
+            logger.remove()
+            print(f"{label:<36} {per_request:8.2f} us/request")
+
+
+if __name__ == "__main__":
+    main()
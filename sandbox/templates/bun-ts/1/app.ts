@@ -0,0 +1,5 @@
+const app = document.querySelector<HTMLDivElement>("#app");
+
+if (app) {
+  app.textContent = "Hello from TypeScript";
+}
@@ -0,0 +1,264 @@
+import { brotliCompressSync, gzipSync } from "node:zlib";
+
+const ASSET_DIR = ".assets";
+
+// Runtime settings come from the environment so this file is identical for every project
+const PORT = Number(process.env.PORT ?? 3000);
+
+// With --live (see the "dev" script) HTML pages get a client that follows the project's change feed
+const LIVE_RELOAD_URL = process.argv.includes("--live") ? process.env.LIVE_RELOAD_URL : null;
+const LIVE_CLIENT = LIVE_RELOAD_URL
+  ? `<script>(${liveReloadClient.toString()})(${JSON.stringify(LIVE_RELOAD_URL)});</script>`
+  : "";
+// Part of the ETag of live pages, so a page cached with a different client is not revalidated as current
+const LIVE_CLIENT_VERSION = Bun.hash(LIVE_CLIENT).toString(36);
+// Live pages with the client injected and compressed, built once per page version rather than per request
+const livePages = new Map();
+
+// Asset manifest written by the builder on every file write: content type, ETag, cache policy
+// and available precompressed variants per path. Reloaded whenever the file changes.
+let manifest = {};
+let manifestModified = 0;
+
+async function loadManifest() {
+  const file = Bun.file(`${ASSET_DIR}/manifest.json`);
+  try {
+    if (file.lastModified !== manifestModified) {
+      manifest = await file.json();
+      manifestModified = file.lastModified;
+    }
+  } catch (error) {
+    manifest = {};
+  }
+  return manifest;
+}
+
+const server = Bun.serve({
+  port: PORT,
+  async fetch(req) {
+    const url = new URL(req.url);
+    const path = url.pathname;
+
+    // Serve index.html for root path
+    const filePath = path === "/" ? "index.html" : path.slice(1); // Remove leading slash
+    if (filePath.startsWith(ASSET_DIR)) {
+      return new Response("Not Found", { status: 404 });
+    }
+
+    try {
+      const file = Bun.file(filePath);
+
+      // Check if file exists
+      if (!(await file.exists())) {
+        return new Response(path === "/" ? "index.html not found" : "Not Found", { status: 404 });
+      }
+
+      if (/\.tsx?$/.test(filePath)) {
+        return serveTypeScript(filePath, file);
+      }
+
+      let entry = (await loadManifest())[filePath];
+      if (!entry || entry.size !== file.size || entry.mtime_ms !== Math.floor(file.lastModified)) {
+        // Not in the manifest or changed behind the builder's back
+        entry = null;
+      }
+
+      if (LIVE_RELOAD_URL && filePath.endsWith(".html")) {
+        return serveLiveHtml(req, filePath, file, entry);
+      }
+
+      if (entry) {
+        return serveAsset(req, filePath, file, entry);
+      }
+
+      return new Response(file, {
+        headers: {
+          "Content-Type": getContentType(filePath),
+          "Cache-Control": "no-cache",
+        },
+      });
+    } catch (error) {
+      // File doesn't exist, continue to 404
+    }
+
+    return new Response("Not Found", { status: 404 });
+  },
+});
+
+function serveAsset(req, filePath, file, entry) {
+  const headers = {
+    "Content-Type": entry.type,
+    "Cache-Control": entry.cache_control,
+    ETag: entry.etag,
+    Vary: "Accept-Encoding",
+  };
+
+  if (matchesETag(req.headers.get("If-None-Match"), entry.etag)) {
+    return new Response(null, { status: 304, headers });
+  }
+
+  const encoding = negotiateEncoding(req.headers.get("Accept-Encoding"), entry.encodings);
+  if (encoding) {
+    const suffix = encoding === "br" ? "br" : "gz";
+    headers["Content-Encoding"] = encoding;
+    return new Response(Bun.file(`${ASSET_DIR}/${filePath}.${suffix}`), { headers });
+  }
+
+  return new Response(file, { headers });
+}
+
+const transpilers = {
+  ts: new Bun.Transpiler({ loader: "ts" }),
+  tsx: new Bun.Transpiler({ loader: "tsx" }),
+};
+
+// TypeScript modules are transpiled per request so projects need no build step
+async function serveTypeScript(filePath, file) {
+  const transpiler = filePath.endsWith(".tsx") ? transpilers.tsx : transpilers.ts;
+  return new Response(transpiler.transformSync(await file.text()), {
+    headers: {
+      "Content-Type": "application/javascript; charset=utf-8",
+      "Cache-Control": "no-cache",
+    },
+  });
+}
+
+function injectLiveClient(html) {
+  return html.includes("</body>") ? html.replace("</body>", `${LIVE_CLIENT}</body>`) : html + LIVE_CLIENT;
+}
+
+// Same caching as serveAsset, with an ETag and variants that cover the injected client too
+async function serveLiveHtml(req, filePath, file, entry) {
+  if (!entry) {
+    return new Response(injectLiveClient(await file.text()), {
+      headers: {
+        "Content-Type": "text/html; charset=utf-8",
+        "Cache-Control": "no-cache",
+      },
+    });
+  }
+
+  const etag = entry.etag.replace(/"$/, `-live.${LIVE_CLIENT_VERSION}"`);
+  const headers = {
+    "Content-Type": entry.type,
+    "Cache-Control": entry.cache_control,
+    ETag: etag,
+    Vary: "Accept-Encoding",
+  };
+
+  if (matchesETag(req.headers.get("If-None-Match"), etag)) {
+    return new Response(null, { status: 304, headers });
+  }
+
+  let page = livePages.get(filePath);
+  if (!page || page.etag !== etag) {
+    const body = Buffer.from(injectLiveClient(await file.text()));
+    // Only the encodings the builder found worthwhile for this page
+    page = {
+      etag,
+      body,
+      br: entry.encodings?.br ? brotliCompressSync(body) : null,
+      gzip: entry.encodings?.gzip ? gzipSync(body) : null,
+    };
+    livePages.set(filePath, page);
+  }
+
+  const encoding = negotiateEncoding(req.headers.get("Accept-Encoding"), entry.encodings);
+  if (encoding) {
+    headers["Content-Encoding"] = encoding;
+    return new Response(page[encoding], { headers });
+  }
+
+  return new Response(page.body, { headers });
+}
+
+// Runs in the browser: swaps changed stylesheets and images in place, reloads for anything else
+function liveReloadClient(feedUrl) {
+  const ignored = new Set(["/server.js", "/package.json"]);
+  const bust = (element, attribute, path, hash) => {
+    const url = new URL(element[attribute], location.href);
+    if (url.origin !== location.origin || url.pathname !== path) return false;
+    url.searchParams.set("v", hash || Date.now());
+    element[attribute] = url.href;
+    return true;
+  };
+
+  const source = new EventSource(feedUrl);
+  source.addEventListener("changes", (event) => {
+    let reload = false;
+    for (const change of JSON.parse(event.data).paths) {
+      const path = "/" + change.path;
+      if (ignored.has(path)) continue;
+      if (path.endsWith(".css")) {
+        document.querySelectorAll('link[rel="stylesheet"]').forEach((link) => bust(link, "href", path, change.hash));
+      } else if (/\.(png|jpe?g|gif|svg|webp|ico)$/i.test(path)) {
+        document.querySelectorAll("img").forEach((img) => bust(img, "src", path, change.hash));
+      } else {
+        reload = true;
+      }
+    }
+    if (reload) location.reload();
+  });
+}
+
+function matchesETag(header, etag) {
+  if (!header) return false;
+  return header
+    .split(",")
+    .map((value) => value.trim().replace(/^W\//, ""))
+    .some((value) => value === "*" || value === etag);
+}
+
+function negotiateEncoding(header, encodings) {
+  if (!header || !encodings) return null;
+
+  const accepted = {};
+  for (const part of header.split(",")) {
+    const [name, ...params] = part.trim().toLowerCase().split(";");
+    const q = params.find((param) => param.trim().startsWith("q="));
+    accepted[name] = q ? parseFloat(q.trim().slice(2)) : 1;
+  }
+
+  const acceptable = (name) => (accepted[name] ?? accepted["*"] ?? 0) > 0;
+  if (encodings.br && acceptable("br")) return "br";
+  if (encodings.gzip && acceptable("gzip")) return "gzip";
+  return null;
+}
+
+function getContentType(filePath) {
+  const ext = filePath.split(".").pop()?.toLowerCase();
+  switch (ext) {
+    case "html":
+      return "text/html; charset=utf-8";
+    case "css":
+      return "text/css; charset=utf-8";
+    case "js":
+    case "mjs":
+      return "application/javascript; charset=utf-8";
+    case "json":
+      return "application/json; charset=utf-8";
+    case "txt":
+      return "text/plain; charset=utf-8";
+    case "png":
+      return "image/png";
+    case "jpg":
+    case "jpeg":
+      return "image/jpeg";
+    case "gif":
+      return "image/gif";
+    case "svg":
+      return "image/svg+xml";
+    case "webp":
+      return "image/webp";
+    case "ico":
+      return "image/x-icon";
+    case "woff2":
+      return "font/woff2";
+    case "wasm":
+      return "application/wasm";
+    default:
+      return "application/octet-stream";
+  }
+}
+
+console.log(`Server running at http://localhost:${server.port}`);